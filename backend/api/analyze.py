@@ -1,17 +1,31 @@
 # backend/api/analyze.py
 import os
+import json
+import uuid
+import html
+import asyncio
 import base64
 import logging
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
 
 import pandas as pd
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
 
-from backend.services.llm_service import smart_agent
+from backend.services.llm_service import batch_agent, smart_agent
 from backend.services.report_service import generate_report
 from backend.services.cleaning_service import clean_df
-from backend.models.schemas import AnalysisRequest
+from backend.services import dataset_registry
+from backend.services.llm_cache import llm_cache
+from backend.services.conversation import conversations
+from backend.utils import dataset_store
+from backend.utils.df_cache import df_cache
+from backend.utils.executors import admission, run_in_stage
+from backend.utils.cancellation import CancellationToken, cancel_on_disconnect
+from backend.models.schemas import AnalysisRequest, BatchAnalysisRequest
 from backend.config import settings
 
 logger = logging.getLogger(__name__)
@@ -59,85 +73,333 @@ def validate_clean_file(file_path: str) -> Path:
         raise HTTPException(status_code=404, detail=f"Fichier nettoyé introuvable : {p}")
     return p
 
-def read_input(file_path: Path) -> pd.DataFrame:
-    if file_path.suffix.lower() == ".csv":
-        return pd.read_csv(file_path)
-    elif file_path.suffix.lower() in [".xls", ".xlsx"]:
-        return pd.read_excel(file_path)
-    else:
+def resolve_dataset(req: Union[AnalysisRequest, BatchAnalysisRequest]) -> Tuple[Path, Optional[str]]:
+    """Fichier nettoyé à analyser et dataset_id éventuel (prioritaire sur clean_file_path)."""
+    if req.dataset_id:
+        record = dataset_registry.get_dataset(req.dataset_id)
+        if record is None:
+            raise HTTPException(status_code=404, detail=f"Dataset introuvable : {req.dataset_id}")
+        return validate_clean_file(record["path"]), req.dataset_id
+    if req.clean_file_path:
+        return validate_clean_file(req.clean_file_path), None
+    raise HTTPException(status_code=400, detail="dataset_id ou clean_file_path requis")
+
+def read_input(file_path: Path, max_cols: int = MAX_COLS) -> pd.DataFrame:
+    if file_path.suffix.lower() not in dataset_store.SUPPORTED_SUFFIXES:
         raise HTTPException(status_code=400, detail="Format de fichier non supporté")
+    # Projection : seules les MAX_COLS premières colonnes sont lues
+    columns = dataset_store.read_columns(file_path)[:max_cols]
+    return dataset_store.read_dataset(file_path, columns=columns)
+
+def prepare_dataframe(clean_file: Path) -> pd.DataFrame:
+    """Lecture + nettoyage minimal + échantillonnage + conversions (résultat mis en cache)."""
+    df = read_input(clean_file)
+    logger.info(f"Analyse lancée sur fichier nettoyé : {clean_file}, shape={df.shape}")
+
+    # Nettoyage minimal
+    df = clean_df(df)
+    logger.info(f"DataFrame après nettoyage minimal : shape={df.shape}, colonnes={list(df.columns)}")
+
+    # Échantillonnage et limitation des colonnes
+    if len(df) > MAX_ROWS:
+        df = df.sample(MAX_ROWS, random_state=42)
+        logger.info(f"Dataset échantillonné à {MAX_ROWS} lignes")
+    if df.shape[1] > MAX_COLS:
+        df = df.iloc[:, :MAX_COLS]
+        logger.info(f"Dataset limité à {MAX_COLS} colonnes")
+
+    # Conversion intelligente pour LLM
+    for col in df.select_dtypes(include="object").columns:
+        df[col] = df[col].fillna("N/A") if df[col].nunique() < 50 else df[col].astype(str).fillna("")
+    for col in df.select_dtypes(include="datetime").columns:
+        df[col] = pd.to_datetime(df[col], errors="coerce")
+    return df
+
+@router.get("/analyze/cache")
+def analyze_cache_stats():
+    """Compteurs des caches : DataFrames préparés (octets, évictions), réponses LLM (hits, misses), conversations."""
+    return {"dataframes": df_cache.stats(), "llm": llm_cache.stats(), "conversations": conversations.stats()}
+
+@router.get("/analyze/sessions/{session_id}")
+def session_history(session_id: str):
+    """Tours mémorisés d'une conversation (question, question effective, filtres, résumé)."""
+    return {"session_id": session_id, "turns": conversations.history(session_id)}
+
+def run_agent(clean_file: Path, question: str, dataset_id: Optional[str] = None,
+              token: Optional[CancellationToken] = None,
+              on_event: Optional[Callable[[str, Any], None]] = None,
+              session_id: Optional[str] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Étape bloquante : DataFrame préparé (cache) + agent IA (avec la mémoire de la session éventuelle)."""
+    df = df_cache.get_or_load(clean_file, prepare_dataframe)
+    if not session_id:
+        # Copie : le DataFrame en cache ne doit pas être modifié par l'agent
+        df = df.copy()
+        return df, smart_agent(df, question, dataset_id=dataset_id, token=token, on_event=on_event)
+
+    dataset_key = dataset_id or str(clean_file)
+    turn = conversations.prepare(session_id, dataset_key, df, question)
+    results = smart_agent(turn.df, turn.question, dataset_id=None if turn.filters else dataset_id, token=token,
+                          on_event=on_event, history=turn.history, reuse=turn.reuse)
+    conversations.record(session_id, dataset_key, turn, question, results)
+    results["conversation"] = turn.describe()
+    return turn.df, results
+
+def render_report(question: str, df: pd.DataFrame, analysis_results: Dict[str, Any],
+                  filename: Optional[str] = None) -> Dict[str, Optional[str]]:
+    """Étape bloquante : rapport HTML/PDF (wkhtmltopdf) dans REPORT_DIR."""
+    cleanup_old_reports(REPORT_DIR)
+    chart_jsons = [c.get("fig_json") for c in analysis_results.get("charts", []) if c.get("fig_json")]
+    return generate_report(
+        question=question,
+        response=analysis_results,
+        df=df,
+        chart_jsons=chart_jsons,
+        stats=analysis_results.get("stats", {}),
+        summary_interpretation=analysis_results.get("llm", ""),
+        recommendations=analysis_results.get("insights", ""),
+        output_dir=REPORT_DIR,
+        filename=filename
+    )
+
+def build_response(question: str, df: pd.DataFrame, analysis_results: Dict[str, Any]) -> Dict[str, Any]:
+    """Étape bloquante : rapport HTML/PDF (wkhtmltopdf) et réponse finale."""
+    chart_jsons = [c.get("fig_json") for c in analysis_results.get("charts", []) if c.get("fig_json")]
+    report = render_report(question, df, analysis_results)
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    html_path = os.path.join(REPORT_DIR, f"report_{timestamp}.html")
+    with open(html_path, "w", encoding="utf-8") as f:
+        f.write(report["html_content"])
+
+    pdf_path = report.get("pdf")
+    html_b64 = encode_file_base64(html_path)
+    pdf_b64 = encode_file_base64(pdf_path)
+
+    logger.info(f"Analyse terminée avec succès: HTML + PDF générés")
+
+    return {
+        "status": "success",
+        "analysis": {
+            "summary": analysis_results.get("llm", ""),
+            "recommendations": analysis_results.get("insights", ""),
+            "stats": analysis_results.get("stats", {}),
+            "charts": chart_jsons,
+            "partial": analysis_results.get("partial", False),
+            "timeouts": analysis_results.get("timeouts", []),
+            "usage": analysis_results.get("usage", {}),
+            "structured": analysis_results.get("structured"),
+            "conversation": analysis_results.get("conversation")
+        },
+        "report_html": html_b64,
+        "report_pdf": pdf_b64
+    }
 
 @router.post("/analyze")
-async def analyze_endpoint(req: AnalysisRequest):
+async def analyze_endpoint(req: AnalysisRequest, request: Request):
+    # Échéance globale + annulation coopérative si le client se déconnecte
+    token = CancellationToken(settings.ANALYSIS_TIMEOUT)
+    watcher = asyncio.create_task(cancel_on_disconnect(request, token))
     try:
-        cleanup_old_reports(REPORT_DIR)
-
-        clean_file = validate_clean_file(req.clean_file_path)
-        df = read_input(clean_file)
-        logger.info(f"Analyse lancée sur fichier nettoyé : {clean_file}, shape={df.shape}")
-
-        # Nettoyage minimal
-        df = clean_df(df)
-        logger.info(f"DataFrame après nettoyage minimal : shape={df.shape}, colonnes={list(df.columns)}")
-
-        # Échantillonnage et limitation des colonnes
-        if len(df) > MAX_ROWS:
-            df = df.sample(MAX_ROWS, random_state=42)
-            logger.info(f"Dataset échantillonné à {MAX_ROWS} lignes")
-        if df.shape[1] > MAX_COLS:
-            df = df.iloc[:, :MAX_COLS]
-            logger.info(f"Dataset limité à {MAX_COLS} colonnes")
-
-        # Conversion intelligente pour LLM
-        for col in df.select_dtypes(include="object").columns:
-            df[col] = df[col].fillna("N/A") if df[col].nunique() < 50 else df[col].astype(str).fillna("")
-        for col in df.select_dtypes(include="datetime").columns:
-            df[col] = pd.to_datetime(df[col], errors="coerce")
-
-        # Appel de l'agent IA
-        analysis_results = smart_agent(df, req.question)
-        if "error" in analysis_results:
-            raise HTTPException(status_code=400, detail=analysis_results["error"])
-
-        # Charts
-        chart_jsons = [c.get("fig_json") for c in analysis_results.get("charts", []) if c.get("fig_json")]
-
-        # Génération du rapport
-        report = generate_report(
-            question=req.question,
-            response=analysis_results,
-            df=df,
-            chart_jsons=chart_jsons,
-            stats=analysis_results.get("stats", {}),
-            summary_interpretation=analysis_results.get("llm", ""),
-            recommendations=analysis_results.get("insights", "")
-        )
+        clean_file, dataset_id = resolve_dataset(req)
 
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        html_path = os.path.join(REPORT_DIR, f"report_{timestamp}.html")
-        with open(html_path, "w", encoding="utf-8") as f:
-            f.write(report["html_content"])
+        # pandas, LLM et wkhtmltopdf tournent dans des pools dédiés : la boucle reste libre
+        async with admission("analyze"):
+            df, analysis_results = await run_in_stage(
+                "analyze", run_agent, clean_file, req.question, dataset_id, token, None, req.session_id
+            )
+            if "error" in analysis_results:
+                raise HTTPException(status_code=400, detail=analysis_results["error"])
+            if await request.is_disconnected():
+                # Personne pour lire la réponse : pas de rapport HTML/PDF
+                raise HTTPException(status_code=499, detail="Client déconnecté")
+            return await run_in_stage("report", build_response, req.question, df, analysis_results)
 
-        pdf_path = report.get("pdf")
-        html_b64 = encode_file_base64(html_path)
-        pdf_b64 = encode_file_base64(pdf_path)
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.exception("Erreur pendant l'analyse")
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        watcher.cancel()
 
-        logger.info(f"Analyse terminée avec succès: HTML + PDF générés")
+# -----------------------------
+# Analyse par lot
+# -----------------------------
+BATCH_RESULT_KEYS = ("partial", "timeouts", "usage", "structured", "error")
 
-        return {
-            "status": "success",
-            "analysis": {
-                "summary": analysis_results.get("llm", ""),
-                "recommendations": analysis_results.get("insights", ""),
-                "stats": analysis_results.get("stats", {}),
-                "charts": chart_jsons
-            },
-            "report_html": html_b64,
-            "report_pdf": pdf_b64
-        }
+def run_batch(clean_file: Path, questions: List[str], dataset_id: Optional[str] = None,
+              token: Optional[CancellationToken] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Étape bloquante : DataFrame préparé une seule fois (cache) + agent par lot."""
+    df = df_cache.get_or_load(clean_file, prepare_dataframe).copy()
+    return df, batch_agent(df, questions, dataset_id=dataset_id, token=token)
+
+def combined_report_sections(results: List[Dict[str, Any]]) -> Tuple[str, str]:
+    """Analyses et recommandations de toutes les questions, une section par question (HTML échappé)."""
+    def section(i: int, res: Dict[str, Any], key: str) -> str:
+        body = res.get("error") or res.get(key) or ""
+        text = html.escape(str(body)).replace("\n", "<br>")
+        return f"<h3>{i}. {html.escape(res['question'])}</h3><p>{text}</p>"
+    summaries = "".join(section(i, r, "llm") for i, r in enumerate(results, 1))
+    recommendations = "".join(section(i, r, "insights") for i, r in enumerate(results, 1) if "error" not in r)
+    return summaries, recommendations
+
+def build_batch_response(df: pd.DataFrame, batch: Dict[str, Any]) -> Dict[str, Any]:
+    """Étape bloquante : un rapport HTML/PDF commun au lot et les réponses par question."""
+    cleanup_old_reports(REPORT_DIR)
+    results = batch["results"]
+    summaries, recommendations = combined_report_sections(results)
+    chart_jsons = [c.get("fig_json") for c in batch.get("charts", []) if c.get("fig_json")]
+    filename = f"report_batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+    report = generate_report(
+        question=f"{len(results)} questions", response=summaries, df=df, chart_jsons=chart_jsons,
+        stats=batch.get("stats", {}), summary_interpretation=summaries, recommendations=recommendations,
+        output_dir=REPORT_DIR, filename=filename
+    )
+    return {
+        "status": "success",
+        "results": [{
+            "question": r["question"],
+            "summary": r.get("llm", ""),
+            "recommendations": r.get("insights", ""),
+            **{k: r[k] for k in BATCH_RESULT_KEYS if k in r},
+        } for r in results],
+        "stats": batch.get("stats", {}),
+        "charts": chart_jsons,
+        "usage": batch.get("usage", {}),
+        "shared": batch.get("shared", {}),
+        "report_html": report.get("html_base64"),
+        "report_pdf": report.get("pdf_base64"),
+        "report": report_links(report),
+    }
+
+@router.post("/analyze/batch")
+async def analyze_batch_endpoint(req: BatchAnalysisRequest, request: Request):
+    """
+    Plusieurs questions sur un dataset en une requête : lecture, nettoyage et profilage faits
+    une fois, artefacts partagés entre questions, appels LLM en parallèle (bornés), un rapport commun.
+    """
+    token = CancellationToken(settings.BATCH_TIMEOUT)
+    watcher = asyncio.create_task(cancel_on_disconnect(request, token))
+    try:
+        clean_file, dataset_id = resolve_dataset(req)
+        async with admission("analyze"):
+            df, batch = await run_in_stage("analyze", run_batch, clean_file, req.questions, dataset_id, token)
+            if "error" in batch:
+                raise HTTPException(status_code=400, detail=batch["error"])
+            if await request.is_disconnected():
+                raise HTTPException(status_code=499, detail="Client déconnecté")
+            return await run_in_stage("report", build_batch_response, df, batch)
 
     except HTTPException as he:
         raise he
     except Exception as e:
-        logger.exception("Erreur pendant l'analyse")
+        logger.exception("Erreur pendant l'analyse par lot")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        watcher.cancel()
+
+# -----------------------------
+# Analyse en streaming (SSE / NDJSON)
+# -----------------------------
+def format_event(kind: str, data: Any, fmt: str) -> str:
+    """Un événement : SSE (`event:` + `data:`) ou une ligne NDJSON {"event", "data"}."""
+    if fmt == "ndjson":
+        return json.dumps({"event": kind, "data": data}, default=str, ensure_ascii=False) + "\n"
+    return f"event: {kind}\ndata: {json.dumps(data, default=str, ensure_ascii=False)}\n\n"
+
+def report_links(report: Dict[str, Optional[str]]) -> Dict[str, Optional[str]]:
+    links = {}
+    for key in ("html", "pdf"):
+        path = report.get(key)
+        links[key] = f"/api/analyze/reports/{os.path.basename(path)}" if path and os.path.exists(path) else None
+    return links
+
+@router.post("/analyze/stream")
+async def analyze_stream_endpoint(req: AnalysisRequest, request: Request, format: str = "sse"):
+    """
+    Variante streaming de /analyze : les résultats sont envoyés dès qu'ils sont prêts.
+    Événements : "stats", "token" (fragments de l'analyse LLM), "insights", "chart",
+    "done" (résumé final), "report" (liens HTML/PDF), "error".
+    `format` : "sse" (text/event-stream, défaut) ou "ndjson".
+    """
+    if format not in ("sse", "ndjson"):
+        raise HTTPException(status_code=400, detail="format doit être 'sse' ou 'ndjson'")
+    clean_file, dataset_id = resolve_dataset(req)
+
+    # Admission avant la réponse : une file pleine donne toujours un 503 + Retry-After
+    slot = admission("analyze")
+    await slot.__aenter__()
+    released = False
+
+    async def release() -> None:
+        # Appelé en fin de flux, et en tâche de fond si le flux n'a jamais démarré
+        nonlocal released
+        if not released:
+            released = True
+            token.cancel("flux terminé")
+            await slot.__aexit__(None, None, None)
+
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    token = CancellationToken(settings.ANALYSIS_TIMEOUT)
+
+    def on_event(kind: str, data: Any) -> None:
+        # Appelé depuis les threads de l'agent / du client LLM
+        if kind == "chart":
+            data = data.get("fig_json")
+        loop.call_soon_threadsafe(queue.put_nowait, (kind, data))
+
+    async def events() -> AsyncIterator[str]:
+        agent = asyncio.ensure_future(
+            run_in_stage("analyze", run_agent, clean_file, req.question, dataset_id, token, on_event,
+                         req.session_id)
+        )
+        try:
+            while True:
+                getter = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait({getter, agent}, return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    kind, data = getter.result()
+                    yield format_event(kind, data, format)
+                    continue
+                getter.cancel()
+                break
+            # Événements publiés juste avant la fin de l'agent
+            while not queue.empty():
+                kind, data = queue.get_nowait()
+                yield format_event(kind, data, format)
+
+            df, analysis_results = agent.result()
+            if "error" in analysis_results:
+                yield format_event("error", analysis_results["error"], format)
+                return
+            yield format_event("done", {
+                "summary": analysis_results.get("llm", ""),
+                "recommendations": analysis_results.get("insights", ""),
+                "partial": analysis_results.get("partial", False),
+                "timeouts": analysis_results.get("timeouts", []),
+                "usage": analysis_results.get("usage", {}),
+                "conversation": analysis_results.get("conversation"),
+            }, format)
+
+            filename = f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+            report = await run_in_stage("report", render_report, req.question, df, analysis_results, filename)
+            yield format_event("report", report_links(report), format)
+        except Exception as e:
+            logger.exception("Erreur pendant l'analyse en streaming")
+            yield format_event("error", str(e), format)
+        finally:
+            # Client parti ou flux terminé : arrêter l'agent et libérer la place
+            await release()
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/event-stream"
+    return StreamingResponse(events(), media_type=media_type, background=BackgroundTask(release),
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.get("/analyze/reports/{filename}")
+def download_report(filename: str):
+    """Rapport HTML/PDF généré (liens de l'événement "report")."""
+    path = Path(REPORT_DIR, filename).resolve()
+    if path.parent != Path(REPORT_DIR).resolve() or path.suffix not in (".html", ".pdf") or not path.is_file():
+        raise HTTPException(status_code=404, detail="Rapport introuvable")
+    return FileResponse(path)
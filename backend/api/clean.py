@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from backend.services.cleaning_service import clean_data
+from backend.utils.executors import admission, run_in_stage
 
 router = APIRouter()
 
@@ -16,8 +17,12 @@ async def clean_endpoint(payload: CleanRequest):
         raise HTTPException(status_code=400, detail="file_path requis")
 
     try:
-        clean_path = clean_data(payload.file_path)
+        # Nettoyage pandas CPU-bound : pool de processus dédié
+        async with admission("clean"):
+            clean_path = await run_in_stage("clean", clean_data, payload.file_path)
         return {"clean_path": clean_path}
+    except HTTPException:
+        raise
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Fichier introuvable : {payload.file_path}")
     except ValueError as e:
@@ -0,0 +1,60 @@
+# backend/api/datasets.py
+import logging
+from fastapi import APIRouter, HTTPException
+
+from backend.api.analyze import validate_clean_file
+from backend.models.schemas import DatasetRegisterRequest
+from backend.services import dataset_registry
+from backend.utils.executors import admission, run_in_stage
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+@router.post("/datasets")
+async def register_dataset_endpoint(req: DatasetRegisterRequest):
+    """
+    Enregistre un fichier nettoyé et retourne son `dataset_id`
+    (empreinte, schéma, nombre de lignes, artefacts déjà calculés).
+    """
+    clean_file = validate_clean_file(req.clean_file_path)
+    try:
+        # Empreinte et lecture du fichier : même contrôle d'admission et même pool que l'analyse
+        async with admission("analyze"):
+            return await run_in_stage("analyze", dataset_registry.register_dataset, str(clean_file))
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception("Erreur pendant l'enregistrement du dataset")
+        raise HTTPException(status_code=500, detail=f"Erreur interne : {str(e)}")
+
+
+@router.get("/datasets")
+def list_datasets_endpoint():
+    return {"datasets": dataset_registry.list_datasets()}
+
+
+def check_dataset_id(dataset_id: str) -> None:
+    if not dataset_registry.is_valid_dataset_id(dataset_id):
+        raise HTTPException(status_code=400, detail=f"Identifiant de dataset invalide : {dataset_id}")
+
+
+@router.get("/datasets/{dataset_id}")
+def get_dataset_endpoint(dataset_id: str):
+    """Entrée du registre, avec ses artefacts et ses sorties EDA mémorisées."""
+    check_dataset_id(dataset_id)
+    record = dataset_registry.get_dataset(dataset_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Dataset introuvable : {dataset_id}")
+    return record
+
+
+@router.delete("/datasets/{dataset_id}")
+def delete_dataset_endpoint(dataset_id: str):
+    """Supprime l'entrée, ses artefacts et ses sorties EDA (le fichier nettoyé est conservé)."""
+    check_dataset_id(dataset_id)
+    if not dataset_registry.delete_dataset(dataset_id):
+        raise HTTPException(status_code=404, detail=f"Dataset introuvable : {dataset_id}")
+    return {"status": "deleted", "dataset_id": dataset_id}
@@ -2,6 +2,7 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from starlette.responses import JSONResponse
 from backend.utils.file_handler import save_upload_file
+from backend.utils.executors import admission
 
 router = APIRouter()
 
@@ -9,16 +10,20 @@ router = APIRouter()
 async def upload_file(file: UploadFile = File(...)):
     """
     Endpoint pour uploader un fichier.
-    Stocke le fichier original dans settings.DATA_DIR.
+    Stocke le fichier original dans settings.DATA_DIR, sous son empreinte SHA-256
+    (un contenu déjà envoyé renvoie le chemin existant).
     """
     if not file:
         raise HTTPException(status_code=400, detail="Aucun fichier envoyé")
 
     try:
-        saved_path = await save_upload_file(file)
+        async with admission("upload"):
+            saved_path = await save_upload_file(file)
         return JSONResponse({
             "status": "success",
             "file_path": saved_path
         })
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur lors de la sauvegarde du fichier : {str(e)}")
@@ -1,5 +1,6 @@
 # backend/config.py
 import os
+import json
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -9,6 +10,67 @@ class Settings:
     MODEL_NAME: str = os.getenv("MODEL_NAME", "gpt-4.1")  # Nom du modèle GitHub
     DATA_DIR: str = os.getenv("DATA_DIR", "data")
     CLEAN_DIR: str = os.getenv("CLEAN_DIR", "data/cleaned")
+    CLEAN_FORMAT: str = os.getenv("CLEAN_FORMAT", "parquet")  # parquet | arrow | source (format d'origine)
+    DF_CACHE_MAX_BYTES: int = int(os.getenv("DF_CACHE_MAX_BYTES", 512 * 1024 * 1024))  # Budget du cache de DataFrames
     CHAT_DB: str = os.getenv("CHAT_DB", "data/chat_history.db")
+    # Mémoire de conversation (session_id) : sessions en mémoire, tours résumés dans le prompt
+    CONVERSATION_MAX_SESSIONS: int = int(os.getenv("CONVERSATION_MAX_SESSIONS", 100))
+    CONVERSATION_TTL: float = float(os.getenv("CONVERSATION_TTL", 3600))
+    CONVERSATION_HISTORY_TURNS: int = int(os.getenv("CONVERSATION_HISTORY_TURNS", 3))
+    CONVERSATION_MAX_ARTIFACTS: int = int(os.getenv("CONVERSATION_MAX_ARTIFACTS", 8))  # frames/stats/graphiques par session
+    # Concurrence par étape et admission (503 + Retry-After au-delà)
+    ANALYZE_CONCURRENCY: int = int(os.getenv("ANALYZE_CONCURRENCY", 4))
+    REPORT_CONCURRENCY: int = int(os.getenv("REPORT_CONCURRENCY", 2))
+    CLEAN_CONCURRENCY: int = int(os.getenv("CLEAN_CONCURRENCY", 2))
+    UPLOAD_CONCURRENCY: int = int(os.getenv("UPLOAD_CONCURRENCY", 8))
+    # Échéances : globale par analyse (< timeout httpx du frontend) et par étape (JSON, ex. {"eda": 120})
+    ANALYSIS_TIMEOUT: float = float(os.getenv("ANALYSIS_TIMEOUT", 240))
+    STAGE_TIMEOUTS: dict = json.loads(os.getenv("STAGE_TIMEOUTS", "{}"))
+    AGENT_CONCURRENCY: int = int(os.getenv("AGENT_CONCURRENCY", 8))
+    # Analyse par lot : questions traitées en parallèle (tous lots confondus), taille et échéance d'un lot
+    BATCH_CONCURRENCY: int = int(os.getenv("BATCH_CONCURRENCY", 4))
+    BATCH_MAX_QUESTIONS: int = int(os.getenv("BATCH_MAX_QUESTIONS", 50))
+    BATCH_TIMEOUT: float = float(os.getenv("BATCH_TIMEOUT", 1800))
+    ENGINE_CONCURRENCY: int = int(os.getenv("ENGINE_CONCURRENCY", 3))
+    ADMISSION_QUEUE_SIZE: int = int(os.getenv("ADMISSION_QUEUE_SIZE", 8))
+    RETRY_AFTER_SECONDS: int = int(os.getenv("RETRY_AFTER_SECONDS", 10))
+    # Exécution des moteurs EDA / graphiques : "thread" ou "process" (workers préchauffés)
+    EXECUTION_MODE: str = os.getenv("EXECUTION_MODE", "thread")
+    EDA_PROCESS_WORKERS: int = int(os.getenv("EDA_PROCESS_WORKERS", os.cpu_count() or 2))
+    SHARED_FRAME_DIR: str = os.getenv("SHARED_FRAME_DIR", "")  # Arrow IPC partagé (défaut : /dev/shm)
+    # Backend LLM : "remote" (endpoint GitHub Models) ou "stub" (simulé, hors réseau)
+    LLM_BACKEND: str = os.getenv("LLM_BACKEND", "remote")
+    LLM_ENDPOINT: str = os.getenv("GITHUB_ENDPOINT", "https://models.github.ai/inference")
+    LLM_STUB_LATENCY: float = float(os.getenv("LLM_STUB_LATENCY", 0.2))  # secondes avant le 1er token
+    LLM_STUB_TOKENS_PER_SECOND: float = float(os.getenv("LLM_STUB_TOKENS_PER_SECOND", 50))  # 0 : instantané
+    LLM_STUB_FAILURE_RATE: float = float(os.getenv("LLM_STUB_FAILURE_RATE", 0))  # part des appels en échec
+    LLM_STUB_FAILURE_STATUS: int = int(os.getenv("LLM_STUB_FAILURE_STATUS", 503))
+    LLM_STUB_RESPONSE_TOKENS: int = int(os.getenv("LLM_STUB_RESPONSE_TOKENS", 60))
+    LLM_STUB_SEED: int = int(os.getenv("LLM_STUB_SEED", 0))
+    # Client LLM : appels simultanés, retries avec backoff, disjoncteur
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", 4))
+    LLM_TIMEOUT: float = float(os.getenv("LLM_TIMEOUT", 60))
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", 3))
+    LLM_BACKOFF_BASE: float = float(os.getenv("LLM_BACKOFF_BASE", 1.0))
+    LLM_BACKOFF_MAX: float = float(os.getenv("LLM_BACKOFF_MAX", 30))
+    LLM_BREAKER_THRESHOLD: int = int(os.getenv("LLM_BREAKER_THRESHOLD", 5))
+    LLM_BREAKER_RESET: float = float(os.getenv("LLM_BREAKER_RESET", 30))
+    # Prompts : budget de tokens du contexte dataset, chiffres significatifs des nombres
+    PROMPT_TOKEN_BUDGET: int = int(os.getenv("PROMPT_TOKEN_BUDGET", 1500))
+    PROMPT_SIGNIFICANT_DIGITS: int = int(os.getenv("PROMPT_SIGNIFICANT_DIGITS", 4))
+    # Un seul appel LLM structuré (JSON validé) au lieu d'analyse + insights séparés
+    LLM_STRUCTURED_OUTPUT: bool = os.getenv("LLM_STRUCTURED_OUTPUT", "true").lower() == "true"
+    # Cache persistant des réponses LLM
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_DB: str = os.getenv("LLM_CACHE_DB", "data/llm_cache.db")
+    LLM_CACHE_TTL: float = float(os.getenv("LLM_CACHE_TTL", 7 * 24 * 3600))
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 5000))
+    DATASET_DB: str = os.getenv("DATASET_DB", "data/datasets.db")  # Registre des datasets
+    EDA_CACHE_DIR: str = os.getenv("EDA_CACHE_DIR", "data/eda_cache")  # Résultats EDA par empreinte dataset
+    # Profil complet (une lecture par blocs) des datasets enregistrés : stats sur toutes les lignes
+    FULL_DATA_PROFILE: bool = os.getenv("FULL_DATA_PROFILE", "true").lower() == "true"
+    PROFILE_BATCH_ROWS: int = int(os.getenv("PROFILE_BATCH_ROWS", 100_000))
+    ARTIFACT_DIR: str = os.getenv("ARTIFACT_DIR", "data/artifacts")  # Artefacts dérivés par dataset
+    UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", 1024 * 1024))  # Taille des morceaux d'upload (octets)
 
 settings = Settings()
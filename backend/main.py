@@ -1,21 +1,37 @@
 # backend/main.py
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from backend.api import upload, clean, analyze
+from backend.api import upload, clean, analyze, datasets
 from backend.config import settings
+from backend.services import llm_service
+from backend.utils.executors import executor_stats, start_executors, shutdown_executors
 
 # ==================== INITIALISATION DES DOSSIERS ====================
 os.makedirs(settings.DATA_DIR, exist_ok=True)
 os.makedirs(settings.CLEAN_DIR, exist_ok=True)
 os.makedirs("backend/reports", exist_ok=True)  # dossier pour rapports HTML/PDF
 
+# ==================== LIFESPAN (STARTUP/SHUTDOWN) ====================
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Exécuteurs partagés créés une fois (pool EDA préchauffé en mode processus)
+    start_executors()
+    print("✅ AI Data Analyst Agent API démarrée")
+    yield
+    # Fermer connexions, nettoyer ressources
+    shutdown_executors()
+    llm_service.client.close()
+    print("🛑 AI Data Analyst Agent API arrêtée")
+
 # ==================== APPLICATION FASTAPI ====================
 app = FastAPI(
     title="AI Data Analyst Agent API",
     description="API pour un agent IA capable d'analyser tout type de dataset tabulaire",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # ==================== CORS ====================
@@ -31,6 +47,7 @@ app.add_middleware(
 app.include_router(upload.router, prefix="/api", tags=["Upload"])
 app.include_router(clean.router, prefix="/api", tags=["Cleaning"])
 app.include_router(analyze.router, prefix="/api", tags=["Analysis"])  
+app.include_router(datasets.router, prefix="/api", tags=["Datasets"])
 
 # ==================== ENDPOINT DE SANTÉ ====================
 @app.get("/", tags=["Health"])
@@ -38,15 +55,5 @@ def health():
     """
     Vérifie que le service fonctionne.
     """
-    return {"status": "ok", "service": "AI Data Analyst Agent API"}
-
-# ==================== STARTUP/SHUTDOWN EVENTS ====================
-@app.on_event("startup")
-async def startup_event():
-    # Ici tu peux initialiser des connexions LLM, logs, cache, etc.
-    print("✅ AI Data Analyst Agent API démarrée")
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    # Fermer connexions, nettoyer ressources si besoin
-    print("🛑 AI Data Analyst Agent API arrêtée")
+    return {"status": "ok", "service": "AI Data Analyst Agent API", "queues": executor_stats(),
+            "llm": llm_service.client.stats()}
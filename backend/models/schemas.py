@@ -1,5 +1,8 @@
 # backend/models/schemas.py
-from pydantic import BaseModel
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+from backend.config import settings
 
 class CleanRequest(BaseModel):
     """
@@ -10,7 +13,34 @@ class CleanRequest(BaseModel):
 class AnalysisRequest(BaseModel):
     """
     Requête pour l'analyse.
-    Le champ `clean_file_path` correspond au chemin du fichier nettoyé à analyser.
+    Le dataset est désigné soit par `dataset_id` (dataset enregistré via /api/datasets),
+    soit par `clean_file_path`, le chemin du fichier nettoyé à analyser.
+    Avec `session_id`, la question peut préciser les précédentes ("Et pour Lyon seulement ?").
     """
     question: str
-    clean_file_path: str  # chemin vers le fichier nettoyé CSV/Excel dans CLEAN_DIR
+    clean_file_path: Optional[str] = None  # chemin vers le fichier nettoyé dans CLEAN_DIR
+    dataset_id: Optional[str] = None  # identifiant retourné par POST /api/datasets
+    session_id: Optional[str] = None  # conversation choisie par le client (mémoire des tours précédents)
+
+class BatchAnalysisRequest(BaseModel):
+    """
+    Requête d'analyse par lot : plusieurs questions sur un même dataset, désigné comme
+    pour AnalysisRequest (`dataset_id` ou `clean_file_path`).
+    """
+    questions: List[str] = Field(min_length=1, max_length=settings.BATCH_MAX_QUESTIONS)
+    clean_file_path: Optional[str] = None
+    dataset_id: Optional[str] = None
+
+class DatasetRegisterRequest(BaseModel):
+    """
+    Requête d'enregistrement d'un fichier nettoyé dans le registre des datasets.
+    """
+    clean_file_path: str  # chemin vers le fichier nettoyé dans CLEAN_DIR
+
+class StructuredAnalysis(BaseModel):
+    """
+    Réponse LLM structurée : synthèse, insights et recommandations en un seul appel.
+    """
+    summary: str = Field(min_length=1)
+    insights: List[str] = Field(default_factory=list)
+    recommendations: List[str] = Field(default_factory=list)
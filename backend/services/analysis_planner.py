@@ -0,0 +1,202 @@
+# backend/services/analysis_planner.py
+import logging
+import threading
+from dataclasses import dataclass, field
+from concurrent.futures import wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.config import settings
+from backend.utils.cancellation import CancellationToken
+from backend.utils.executors import ManagedExecutor, get_executor
+
+logger = logging.getLogger(__name__)
+
+# Mots-clés déclenchant chaque étape optionnelle
+REPL_TRIGGERS = ["moyenne", "écart-type", "variance", "corrélation", "statistique", "résumé"]
+PLOT_TRIGGERS = ["graphique", "plot", "visualisation", "nuage de points", "courbe", "diagramme",
+                 "heatmap", "barres", "boxplot", "line chart", "scatter", "tendance", "série temporelle"]
+EDA_TRIGGERS = ["profil", "eda", "exploratoire", "rapport complet", "rapport détaillé"]
+EDA_ENGINE_TRIGGERS = {"ydata": ["ydata", "profiling"], "sweetviz": ["sweetviz"], "autoviz": ["autoviz"]}
+
+# Dépendances entre étapes (une dépendance absente du plan est ignorée)
+STAGE_DEPENDENCIES: Dict[str, Tuple[str, ...]] = {
+    "schema": (),
+    "stats": (),
+    "repl": (),
+    "plot": ("schema",),
+    "eda": (),
+    "llm": ("stats",),
+}
+
+# Échéance par étape (secondes), surchargeable via settings.STAGE_TIMEOUTS
+STAGE_TIMEOUTS: Dict[str, float] = {
+    "schema": 10, "stats": 30, "repl": 30, "plot": 60, "eda": 180, "llm": 120,
+    **settings.STAGE_TIMEOUTS,
+}
+CANCEL_POLL_INTERVAL = 0.5
+
+
+@dataclass
+class AnalysisPlan:
+    """Étapes nécessaires pour répondre à une question (toujours : schema, stats, llm)."""
+    stages: List[str]
+    eda_engine: str = "ydata"
+
+    def __contains__(self, stage: str) -> bool:
+        return stage in self.stages
+
+
+@dataclass
+class Stage:
+    """
+    Étape exécutable : `run(results, token)` reçoit les résultats partagés des étapes
+    déjà terminées et un jeton d'annulation à consulter entre deux unités de travail.
+    """
+    name: str
+    run: Callable[[Dict[str, Any], CancellationToken], Any]
+    deps: Tuple[str, ...] = field(default_factory=tuple)
+    timeout: Optional[float] = None
+
+
+class SharedArtifacts:
+    """
+    Résultats d'étapes indépendants de la question (stats, graphiques, REPL, EDA), calculés
+    une seule fois et partagés entre analyses : questions d'un lot, tours d'une conversation.
+    Le premier demandeur calcule, les suivants attendent son résultat ; un résultat refusé
+    par `cacheable` (ex. calcul interrompu) n'est pas mémorisé.
+    """
+
+    def __init__(self, initial: Optional[Dict[str, Any]] = None):
+        self._values: Dict[str, Any] = {k: v for k, v in (initial or {}).items() if v is not None}
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.computed = 0
+
+    def __contains__(self, name: str) -> bool:
+        with self._lock:
+            return name in self._values
+
+    def get(self, name: str, default: Any = None) -> Any:
+        with self._lock:
+            return self._values.get(name, default)
+
+    def get_or_compute(self, name: str, compute: Callable[[], Any],
+                       cacheable: Optional[Callable[[Any], bool]] = None) -> Any:
+        with self._lock:
+            if name in self._values:
+                self.hits += 1
+                return self._values[name]
+            key_lock = self._key_locks.setdefault(name, threading.Lock())
+        with key_lock:
+            with self._lock:
+                if name in self._values:
+                    self.hits += 1
+                    return self._values[name]
+            value = compute()
+            with self._lock:
+                self.computed += 1
+                if cacheable is None or cacheable(value):
+                    self._values[name] = value
+            return value
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"computed": self.computed, "hits": self.hits}
+
+
+def build_plan(question: str) -> AnalysisPlan:
+    """Sélectionne les étapes selon la question ; EDA lourde uniquement si demandée."""
+    q = (question or "").lower()
+    stages = ["schema", "stats"]
+    if any(w in q for w in REPL_TRIGGERS):
+        stages.append("repl")
+    if any(w in q for w in PLOT_TRIGGERS):
+        stages.append("plot")
+
+    engines = [eng for eng, words in EDA_ENGINE_TRIGGERS.items() if any(w in q for w in words)]
+    if engines or any(w in q for w in EDA_TRIGGERS):
+        stages.append("eda")
+    stages.append("llm")
+
+    # Un moteur nommé => ce moteur ; plusieurs => tous ; sinon ydata seul
+    if len(engines) == 1:
+        eda_engine = engines[0]
+    elif len(engines) > 1:
+        eda_engine = "all"
+    else:
+        eda_engine = "ydata"
+    return AnalysisPlan(stages=stages, eda_engine=eda_engine)
+
+
+def execute_plan(stages: List[Stage], executor: Optional[ManagedExecutor] = None,
+                 token: Optional[CancellationToken] = None) -> Tuple[Dict[str, Any], Dict[str, str], List[str]]:
+    """
+    Exécute le graphe d'étapes : chaque étape démarre dès que ses dépendances sont terminées,
+    les étapes indépendantes tournent en parallèle dans l'exécuteur partagé "agent".
+    Une étape en échec n'arrête pas les autres.
+
+    Chaque étape reçoit un jeton enfant de `token` borné par son `timeout` : une étape qui
+    dépasse son échéance est annulée (coopérativement) et le plan continue sans elle ;
+    si `token` est annulé (client déconnecté, échéance globale), on rend les résultats partiels.
+    Retourne (résultats par étape, erreurs par étape, étapes hors délai ou annulées).
+    """
+    token = token or CancellationToken()
+    names = {s.name for s in stages}
+    pending = {s.name: s for s in stages}
+    results: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+    timed_out: List[str] = []
+    running: Dict[Any, Tuple[str, CancellationToken]] = {}
+    executor = executor or get_executor("agent")
+
+    while pending or running:
+        if token.cancelled:
+            for fut, (name, stage_token) in running.items():
+                stage_token.cancel(token.reason)
+                fut.cancel()
+                errors[name] = token.reason
+                timed_out.append(name)
+            for name in pending:
+                errors[name] = token.reason
+                timed_out.append(name)
+            logger.warning(f"Plan interrompu ({token.reason}) : résultats partiels")
+            break
+
+        for name, stage in list(pending.items()):
+            deps = [d for d in stage.deps if d in names]
+            if all(d in results or d in errors for d in deps):
+                stage_token = token.child(stage.timeout)
+                running[executor.submit(stage.run, results, stage_token)] = (name, stage_token)
+                del pending[name]
+
+        if not running:
+            raise ValueError(f"Dépendances circulaires entre étapes : {sorted(pending)}")
+
+        # Réveil au plus tard à la prochaine échéance, et régulièrement pour voir une annulation
+        deadlines = [t.remaining() for _, t in running.values() if t.remaining() is not None]
+        done, _ = wait(list(running), timeout=min(deadlines + [CANCEL_POLL_INTERVAL]), return_when=FIRST_COMPLETED)
+        for fut in done:
+            name, stage_token = running.pop(fut)
+            try:
+                results[name] = fut.result()
+            except Exception as e:
+                errors[name] = str(e)
+                if stage_token.cancelled:
+                    # Étape interrompue d'elle-même à son échéance (OperationCancelled)
+                    timed_out.append(name)
+                    logger.warning(f"Étape {name} hors délai, poursuite sans son résultat")
+                else:
+                    logger.error(f"Erreur étape {name}: {e}")
+
+        # Étapes ayant dépassé leur échéance : abandonnées, le plan continue
+        for fut, (name, stage_token) in list(running.items()):
+            if stage_token.expired:
+                stage_token.cancel("délai dépassé")
+                fut.cancel()
+                running.pop(fut)
+                errors[name] = "délai dépassé"
+                timed_out.append(name)
+                logger.warning(f"Étape {name} hors délai, poursuite sans son résultat")
+
+    return results, errors, timed_out
@@ -6,6 +6,7 @@ from datetime import datetime
 import pandas as pd
 
 from backend.config import settings
+from backend.utils import dataset_store
 
 # ----------------- Logging -----------------
 logger = logging.getLogger(__name__)
@@ -45,12 +46,13 @@ def _read_input(file_path: Path, sample_limit: int = 100_000) -> pd.DataFrame:
     else:
         raise ValueError("Format non supporté (CSV/Excel uniquement).")
 
-def _unique_clean_path(original: Path) -> Path:
+def _unique_clean_path(original: Path, suffix: str = None) -> Path:
+    suffix = suffix or original.suffix
     ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    candidate = CLEAN_DIR / f"{original.stem}_clean_{ts}{original.suffix}"
+    candidate = CLEAN_DIR / f"{original.stem}_clean_{ts}{suffix}"
     i = 1
     while candidate.exists():
-        candidate = CLEAN_DIR / f"{original.stem}_clean_{ts}_{i}{original.suffix}"
+        candidate = CLEAN_DIR / f"{original.stem}_clean_{ts}_{i}{suffix}"
         i += 1
     return candidate
 
@@ -61,12 +63,9 @@ def clean_data(file_path: str) -> str:
 
     df = _read_input(p)
     df_cleaned = clean_df(df)
-    out_path = _unique_clean_path(p)
-
-    if out_path.suffix.lower() in [".xlsx", ".xls"]:
-        df_cleaned.to_excel(out_path, index=False)
-    else:
-        df_cleaned.to_csv(out_path, index=False)
+    # Stockage colonnaire (Parquet/Arrow) : dtypes conservés, relu sans re-parsing
+    out_path = _unique_clean_path(p, dataset_store.clean_suffix(settings.CLEAN_FORMAT, p.suffix))
+    out_path = dataset_store.write_dataset(df_cleaned, out_path)
 
     logger.info(f"[clean_data] Fichier nettoyé sauvegardé : {out_path}")
     return str(out_path)
@@ -0,0 +1,266 @@
+# backend/services/conversation.py
+import re
+import json
+import time
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.config import settings
+from backend.utils.chat_logger import get_session_history, log_interaction
+
+logger = logging.getLogger(__name__)
+
+# Question qui précise la précédente ("Et pour Lyon seulement ?", "Uniquement en 2023")
+FOLLOW_UP_STARTS = ("et ", "et,", "pour ", "seulement", "uniquement", "maintenant", "idem", "meme chose",
+                    "pareil", "and ", "what about", "only", "now ")
+FOLLOW_UP_WORDS = ("seulement", "uniquement", "only", "plutot", "a la place", "instead")
+# Reprise explicite de la question précédente dans une question courte ("Lyon aussi ?")
+ANAPHORA_WORDS = ("aussi", "egalement", "pareil", "idem", "meme chose", "meme question", "de meme",
+                  "also", "too", "same", "again")
+# Question qui restreint elle-même son périmètre ("Salaire moyen à Paris uniquement")
+SCOPE_WORDS = ("seulement", "uniquement", "only", "filtre", "filtrer", "filtrant", "filter", "filtered",
+               "restreint", "limite a", "limited to")
+SHORT_QUESTION_WORDS = 6
+MAX_FILTER_CARDINALITY = 200
+SUMMARY_CHARS = 300
+TURN_ROLE = "assistant"
+FOLLOW_UP_SEPARATOR = " Précision : "
+
+
+def _normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", str(text).lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def _contains(haystack: str, needle: str) -> bool:
+    return re.search(rf"(?<![a-z0-9]){re.escape(needle)}(?![a-z0-9])", haystack) is not None
+
+
+def detect_filters(question: str, df: pd.DataFrame) -> Dict[str, List[str]]:
+    """Valeurs de colonnes catégorielles citées dans la question, ex. {"ville": ["Lyon"]}."""
+    q = _normalize(question)
+    filters: Dict[str, List[str]] = {}
+    for col in df.select_dtypes(include=["object", "category"]).columns:
+        values = df[col].dropna().unique()
+        if len(values) > MAX_FILTER_CARDINALITY:
+            continue
+        hits = [str(v) for v in values if len(str(v)) > 1 and _contains(q, _normalize(v))]
+        if hits:
+            filters[str(col)] = sorted(hits)
+    return filters
+
+
+def is_follow_up(question: str, names_values: bool = False) -> bool:
+    """
+    Question formulée comme une précision de la précédente : tournure de relance, ou
+    question courte citant des valeurs du dataset (`names_values`) avec une reprise explicite,
+    ex. "Lyon aussi ?". "Prix moyen à Paris ?" reste une nouvelle question.
+    """
+    q = _normalize(question).strip(" ?!.")
+    if q.startswith(FOLLOW_UP_STARTS) or any(_contains(q, w) for w in FOLLOW_UP_WORDS):
+        return True
+    return (names_values and len(q.split()) <= SHORT_QUESTION_WORDS
+            and any(_contains(q, w) for w in ANAPHORA_WORDS + SCOPE_WORDS))
+
+
+def is_scope_restriction(question: str) -> bool:
+    """Question qui demande explicitement de se limiter aux valeurs citées."""
+    q = _normalize(question)
+    return any(_contains(q, w) for w in SCOPE_WORDS)
+
+
+def filter_positions(df: pd.DataFrame, filters: Dict[str, List[str]]) -> np.ndarray:
+    """Positions des lignes dont chaque colonne filtrée prend une des valeurs retenues."""
+    mask = np.ones(len(df), dtype=bool)
+    for col, values in filters.items():
+        if col in df.columns:
+            mask &= df[col].astype(str).isin(values).to_numpy()
+    return np.flatnonzero(mask)
+
+
+def apply_filters(df: pd.DataFrame, filters: Dict[str, List[str]]) -> pd.DataFrame:
+    """Lignes dont chaque colonne filtrée prend une des valeurs retenues."""
+    return df.iloc[filter_positions(df, filters)]
+
+
+@dataclass
+class Turn:
+    """Tour de conversation résumé : question, question effective, filtres et début de réponse."""
+    question: str
+    effective_question: str
+    dataset_key: str
+    filters: Dict[str, List[str]] = field(default_factory=dict)
+    summary: str = ""
+
+
+@dataclass
+class Session:
+    session_id: str
+    turns: List[Turn] = field(default_factory=list)
+    # Clé : dataset + filtres ; valeur : {"positions", "source_rows", "stats", "charts"} déjà calculés
+    artifacts: "OrderedDict[str, Dict[str, Any]]" = field(default_factory=OrderedDict)
+    last_access: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class TurnContext:
+    """Entrées de l'agent pour une question dans une session (cf. ConversationStore.prepare)."""
+    df: pd.DataFrame
+    question: str
+    history: str
+    filters: Dict[str, List[str]]
+    follow_up: bool
+    artifact_key: str
+    reuse: Dict[str, Any] = field(default_factory=dict)
+    # Lignes du périmètre dans le DataFrame complet (None : pas de filtre)
+    positions: Optional[np.ndarray] = None
+    source_rows: int = 0
+
+    def describe(self) -> Dict[str, Any]:
+        return {"follow_up": self.follow_up, "effective_question": self.question,
+                "filters": self.filters, "rows": len(self.df), "reused": sorted(self.reuse)}
+
+
+def format_history(turns: List[Turn], limit: int) -> str:
+    """Résumé compact des derniers tours, du plus ancien au plus récent."""
+    lines = []
+    for turn in turns[-limit:]:
+        scope = ", ".join(f"{c}={'/'.join(v)}" for c, v in turn.filters.items())
+        summary = " ".join(turn.summary.split())[:SUMMARY_CHARS]
+        lines.append(f"- Q: {turn.question}" + (f" [{scope}]" if scope else "") + (f" → R: {summary}" if summary else ""))
+    return "Échanges précédents :\n" + "\n".join(lines) if lines else ""
+
+
+class ConversationStore:
+    """
+    Mémoire des sessions de conversation. Les tours sont journalisés dans chat_history
+    (session_id) et rechargés après un redémarrage ; les artefacts calculés (positions des
+    lignes du périmètre filtré, stats, graphiques) restent en mémoire, bornés par session et par
+    nombre de sessions. Le DataFrame complet n'est pas copié : il reste dans df_cache.
+    """
+
+    def __init__(self, max_sessions: int, ttl: float, history_turns: int, max_artifacts: int):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.history_turns = history_turns
+        self.max_artifacts = max_artifacts
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.follow_ups = 0
+        self.artifact_hits = 0
+
+    def _load(self, session_id: str) -> Session:
+        session = Session(session_id)
+        for row in get_session_history(session_id, role=TURN_ROLE, limit=self.history_turns):
+            try:
+                session.turns.append(Turn(**json.loads(row["response"])))
+            except (TypeError, ValueError):
+                continue
+        return session
+
+    def _session(self, session_id: str) -> Session:
+        now = time.monotonic()
+        with self._lock:
+            for sid in [sid for sid, s in self._sessions.items() if now - s.last_access > self.ttl]:
+                del self._sessions[sid]
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+                session.last_access = now
+                return session
+        session = self._load(session_id)
+        with self._lock:
+            session = self._sessions.setdefault(session_id, session)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session
+
+    @staticmethod
+    def _artifact_key(dataset_key: str, filters: Dict[str, List[str]]) -> str:
+        return json.dumps([dataset_key, filters], sort_keys=True)
+
+    def prepare(self, session_id: str, dataset_key: str, df: pd.DataFrame, question: str) -> TurnContext:
+        """
+        Question effective, périmètre et historique pour ce tour. Les valeurs citées ne filtrent
+        les lignes que pour une précision d'une question précédente sur le même dataset (qui hérite
+        de sa question et de ses filtres ; un filtre sur la même colonne remplace l'ancien) ou pour
+        une restriction explicite ("uniquement") ; "Comparer Paris et Lyon" garde toutes les lignes.
+        Lignes et stats déjà calculées pour ce périmètre sont réutilisées.
+        """
+        session = self._session(session_id)
+        previous = session.turns[-1] if session.turns else None
+        filters = detect_filters(question, df)
+        follow_up = previous is not None and previous.dataset_key == dataset_key and is_follow_up(question, bool(filters))
+        if not follow_up and not is_scope_restriction(question):
+            filters = {}
+        effective = question
+        if follow_up:
+            filters = {**previous.filters, **filters}
+            # Question d'origine + dernière précision (pas d'accumulation au fil des relances)
+            root = previous.effective_question.split(FOLLOW_UP_SEPARATOR)[0]
+            effective = f"{root}{FOLLOW_UP_SEPARATOR}{question}"
+
+        key = self._artifact_key(dataset_key, filters)
+        with self._lock:
+            cached = session.artifacts.get(key)
+            if cached is not None:
+                session.artifacts.move_to_end(key)
+                self.artifact_hits += 1
+            self.follow_ups += follow_up
+        positions = None
+        if filters:
+            # Positions mémorisées valables tant que le DataFrame complet a le même nombre de lignes
+            known = cached is not None and cached.get("source_rows") == len(df)
+            positions = cached["positions"] if known else filter_positions(df, filters)
+            frame = df.iloc[positions]
+            logger.info(f"Session {session_id} : périmètre {filters} ({len(frame)} lignes)")
+        else:
+            frame = df
+        reuse = {k: cached[k] for k in ("stats", "charts") if cached and cached.get(k)}
+        return TurnContext(df=frame.copy(), question=effective, history=format_history(session.turns, self.history_turns),
+                           filters=filters, follow_up=follow_up, artifact_key=key, reuse=reuse,
+                           positions=positions, source_rows=len(df))
+
+    def record(self, session_id: str, dataset_key: str, context: TurnContext, question: str,
+               results: Dict[str, Any]) -> None:
+        """Mémorise le tour (résumé + artefacts) et le journalise dans chat_history."""
+        if "error" in results:
+            return
+        session = self._session(session_id)
+        turn = Turn(question=question, effective_question=context.question, dataset_key=dataset_key,
+                    filters=context.filters, summary=str(results.get("llm", ""))[:SUMMARY_CHARS])
+        with self._lock:
+            session.turns = (session.turns + [turn])[-self.history_turns:]
+            entry = session.artifacts.pop(context.artifact_key, {})
+            if context.positions is not None:
+                entry.update(positions=context.positions, source_rows=context.source_rows)
+            entry["stats"] = results.get("stats") or entry.get("stats")
+            entry["charts"] = results.get("charts") or entry.get("charts")
+            session.artifacts[context.artifact_key] = entry
+            while len(session.artifacts) > self.max_artifacts:
+                session.artifacts.popitem(last=False)
+        log_interaction(TURN_ROLE, question, json.dumps(turn.__dict__, ensure_ascii=False), session_id=session_id)
+
+    def history(self, session_id: str) -> List[Dict[str, Any]]:
+        return [turn.__dict__ for turn in self._session(session_id).turns]
+
+    def clear(self, session_id: str) -> bool:
+        """Libère la session en mémoire (l'historique journalisé dans chat_history est conservé)."""
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"sessions": len(self._sessions), "max_sessions": self.max_sessions,
+                    "follow_ups": self.follow_ups, "artifact_hits": self.artifact_hits}
+
+
+conversations = ConversationStore(settings.CONVERSATION_MAX_SESSIONS, settings.CONVERSATION_TTL,
+                                  settings.CONVERSATION_HISTORY_TURNS, settings.CONVERSATION_MAX_ARTIFACTS)
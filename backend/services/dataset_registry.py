@@ -0,0 +1,188 @@
+# backend/services/dataset_registry.py
+import os
+import re
+import json
+import pickle
+import shutil
+import sqlite3
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.config import settings
+from backend.services.eda_cache import eda_cache
+from backend.utils import dataset_store
+from backend.utils.file_handler import hash_file
+
+logger = logging.getLogger(__name__)
+DB_PATH = settings.DATASET_DB
+ARTIFACT_DIR = Path(settings.ARTIFACT_DIR)
+os.makedirs(os.path.dirname(DB_PATH) or ".", exist_ok=True)
+ARTIFACT_DIR.mkdir(parents=True, exist_ok=True)
+
+# L'identifiant dérive de l'empreinte du contenu : même fichier => même dataset_id,
+# quel que soit le worker uvicorn qui l'enregistre.
+DATASET_ID_LENGTH = 16
+DATASET_ID_PATTERN = re.compile(rf"[0-9a-f]{{{DATASET_ID_LENGTH}}}")
+
+
+def init_db():
+    """Initialisation de la table des datasets enregistrés"""
+    conn = sqlite3.connect(DB_PATH)
+    cur = conn.cursor()
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS datasets (
+        dataset_id TEXT PRIMARY KEY,
+        path TEXT,
+        fingerprint TEXT,
+        schema TEXT,
+        row_count INTEGER,
+        created_at TEXT
+    )
+    """)
+    conn.commit()
+    conn.close()
+
+
+def is_valid_dataset_id(dataset_id: Any) -> bool:
+    """Identifiant au format du registre (début hexadécimal de l'empreinte)."""
+    return isinstance(dataset_id, str) and DATASET_ID_PATTERN.fullmatch(dataset_id) is not None
+
+
+def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+    record = dict(row)
+    record["schema"] = json.loads(record["schema"] or "{}")
+    record["artifacts"] = list_artifacts(record["dataset_id"])
+    # Sorties EDA mémorisées pour ce dataset (cache EDA, clé : dataset_id)
+    record["eda_cache"] = eda_cache.list_entries(record["dataset_id"])
+    return record
+
+
+def register_dataset(path: str) -> Dict[str, Any]:
+    """
+    Enregistre un fichier nettoyé : empreinte, schéma et nombre de lignes.
+    Idempotent : ré-enregistrer le même contenu renvoie le dataset existant.
+    """
+    p = Path(path).resolve()
+    fingerprint = hash_file(str(p))
+    dataset_id = fingerprint[:DATASET_ID_LENGTH]
+
+    existing = get_dataset(dataset_id)
+    if existing and Path(existing["path"]).exists():
+        return existing
+
+    schema, row_count = dataset_store.describe_file(p)
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute(
+        "INSERT OR REPLACE INTO datasets (dataset_id, path, fingerprint, schema, row_count, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (dataset_id, str(p), fingerprint, json.dumps(schema), row_count, datetime.utcnow().isoformat())
+    )
+    conn.commit()
+    conn.close()
+    logger.info(f"Dataset enregistré : {dataset_id} ({p}, {row_count} lignes)")
+    return get_dataset(dataset_id)
+
+
+def get_dataset(dataset_id: str) -> Optional[Dict[str, Any]]:
+    if not is_valid_dataset_id(dataset_id):
+        return None
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    row = conn.execute("SELECT * FROM datasets WHERE dataset_id = ?", (dataset_id,)).fetchone()
+    conn.close()
+    return _row_to_dict(row) if row else None
+
+
+def list_datasets() -> List[Dict[str, Any]]:
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    rows = conn.execute("SELECT * FROM datasets ORDER BY created_at DESC").fetchall()
+    conn.close()
+    return [_row_to_dict(r) for r in rows]
+
+
+def delete_dataset(dataset_id: str) -> bool:
+    """
+    Supprime l'entrée, ses artefacts et ses sorties EDA (le fichier nettoyé est conservé).
+    ValueError si l'identifiant n'a pas le format du registre.
+    """
+    directory = _artifact_dir(dataset_id)
+    conn = sqlite3.connect(DB_PATH)
+    cur = conn.execute("DELETE FROM datasets WHERE dataset_id = ?", (dataset_id,))
+    conn.commit()
+    conn.close()
+    if cur.rowcount == 0:
+        return False
+    shutil.rmtree(directory, ignore_errors=True)
+    purged = eda_cache.purge(dataset_id)
+    logger.info(f"Dataset supprimé : {dataset_id} ({purged} entrée(s) EDA)")
+    return True
+
+
+# -----------------------------
+# Artefacts dérivés (stats, types, sorties EDA...)
+# -----------------------------
+def _artifact_dir(dataset_id: str) -> Path:
+    """Dossier des artefacts du dataset, toujours sous ARTIFACT_DIR (ValueError sinon)."""
+    if not is_valid_dataset_id(dataset_id):
+        raise ValueError(f"Identifiant de dataset invalide : {dataset_id!r}")
+    root = ARTIFACT_DIR.resolve()
+    directory = (root / dataset_id).resolve()
+    if directory.parent != root:
+        raise ValueError(f"Identifiant de dataset invalide : {dataset_id!r}")
+    return directory
+
+
+def _artifact_path(dataset_id: str, name: str) -> Path:
+    safe_name = "".join(c for c in name if c.isalnum() or c in ("_", "-", "."))
+    return _artifact_dir(dataset_id) / f"{safe_name}.pkl"
+
+
+def list_artifacts(dataset_id: str) -> List[str]:
+    directory = _artifact_dir(dataset_id)
+    return sorted(p.stem for p in directory.glob("*.pkl")) if directory.exists() else []
+
+
+def load_artifact(dataset_id: str, name: str) -> Optional[Any]:
+    path = _artifact_path(dataset_id, name)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except Exception as e:
+        logger.warning(f"Artefact illisible {path}: {e}")
+        return None
+
+
+def save_artifact(dataset_id: str, name: str, value: Any) -> None:
+    path = _artifact_path(dataset_id, name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Écriture atomique : un autre worker ne lit jamais un fichier partiel
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def get_or_compute_artifact(dataset_id: Optional[str], name: str, compute: Callable[[], Any]) -> Any:
+    """
+    Retourne l'artefact en cache, sinon le calcule et le stocke (sans dataset_id valide :
+    calcul direct).
+    """
+    if not is_valid_dataset_id(dataset_id):
+        return compute()
+    value = load_artifact(dataset_id, name)
+    if value is None:
+        value = compute()
+        try:
+            save_artifact(dataset_id, name, value)
+        except Exception as e:
+            logger.warning(f"Impossible de stocker l'artefact '{name}' ({dataset_id}): {e}")
+    return value
+
+
+# Initialisation auto
+init_db()
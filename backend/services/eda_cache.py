@@ -0,0 +1,162 @@
+# backend/services/eda_cache.py
+import os
+import json
+import pickle
+import shutil
+import hashlib
+import logging
+from pathlib import Path
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, List
+
+import pandas as pd
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+# À incrémenter dès que les calculs EDA changent : invalide tout le cache
+EDA_ENGINE_VERSION = "3"
+# Empreinte et paramètres d'une entrée, pour retrouver celles d'un dataset
+OWNER_FILE = "owner.json"
+
+
+def dataframe_fingerprint(df: pd.DataFrame) -> str:
+    """Empreinte du contenu (valeurs, colonnes, dtypes) d'un DataFrame."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([list(map(str, df.columns)), df.dtypes.astype(str).tolist()]).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class LazyArtifacts(Mapping):
+    """Dictionnaire en lecture seule dont chaque valeur n'est chargée du disque qu'au premier accès."""
+
+    def __init__(self, loaders: Dict[str, Callable[[], Any]]):
+        self._loaders = loaders
+        self._values: Dict[str, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._values:
+            self._values[key] = self._loaders[key]()
+        return self._values[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._loaders)
+
+    def __len__(self) -> int:
+        return len(self._loaders)
+
+
+class EDAResultCache:
+    """
+    Cache disque des résultats EDA, une entrée par (empreinte dataset, paramètres
+    d'échantillonnage, version du moteur). Écritures atomiques : partageable entre workers.
+    `cacheable` permet d'écarter un résultat (ex. réponse LLM en erreur) pour le recalculer plus tard.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def entry(self, fingerprint: str, **params) -> Path:
+        owner = {"fingerprint": fingerprint, "version": EDA_ENGINE_VERSION, **params}
+        raw = json.dumps(owner, sort_keys=True)
+        key = hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+        path = self.root / key
+        path.mkdir(parents=True, exist_ok=True)
+        if not (path / OWNER_FILE).exists():
+            _atomic_write(path / OWNER_FILE, raw.encode("utf-8"))
+        return path
+
+    def _entries(self, fingerprint: str) -> List[Path]:
+        entries = []
+        for owner_path in self.root.glob(f"*/{OWNER_FILE}"):
+            try:
+                owner = json.loads(owner_path.read_text(encoding="utf-8"))
+            except Exception:
+                continue
+            if owner.get("fingerprint") == fingerprint:
+                entries.append(owner_path.parent)
+        return sorted(entries)
+
+    def list_entries(self, fingerprint: str) -> List[Dict[str, Any]]:
+        """Entrées d'une empreinte (ex. dataset_id) : paramètres et résultats déjà calculés."""
+        out = []
+        for path in self._entries(fingerprint):
+            owner = json.loads((path / OWNER_FILE).read_text(encoding="utf-8"))
+            out.append({"entry": path.name,
+                        "params": {k: v for k, v in owner.items() if k != "fingerprint"},
+                        "results": sorted(p.name for p in path.iterdir()
+                                          if p.name != OWNER_FILE and not p.name.startswith("."))})
+        return out
+
+    def purge(self, fingerprint: str) -> int:
+        """Supprime toutes les entrées d'une empreinte ; retourne leur nombre."""
+        entries = self._entries(fingerprint)
+        for path in entries:
+            shutil.rmtree(path, ignore_errors=True)
+        return len(entries)
+
+    # --- JSON (résumés, textes LLM) ---
+    def get_or_compute_json(self, entry: Path, name: str, compute: Callable[[], Any],
+                            cacheable: Callable[[Any], bool] = None) -> Any:
+        path = entry / f"{name}.json"
+        if path.exists():
+            try:
+                return json.loads(path.read_text(encoding="utf-8"))
+            except Exception as e:
+                logger.warning(f"Entrée EDA illisible {path}: {e}")
+        value = compute()
+        if cacheable and not cacheable(value):
+            return value
+        _atomic_write(path, json.dumps(value, default=str).encode("utf-8"))
+        # Relu pour renvoyer la même forme qu'au prochain hit (tuples -> listes...)
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    # --- Pickle (matrices, objets Python) ---
+    def get_or_compute_pickle(self, entry: Path, name: str, compute: Callable[[], Any],
+                              cacheable: Callable[[Any], bool] = None) -> Any:
+        path = entry / f"{name}.pkl"
+        if path.exists():
+            try:
+                with open(path, "rb") as f:
+                    return pickle.load(f)
+            except Exception as e:
+                logger.warning(f"Entrée EDA illisible {path}: {e}")
+        value = compute()
+        if cacheable and not cacheable(value):
+            return value
+        _atomic_write(path, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        return value
+
+    # --- Figures Plotly, chargées à la demande ---
+    def get_or_compute_figures(self, entry: Path, name: str,
+                               compute: Callable[[], Dict[str, Any]]) -> LazyArtifacts:
+        import plotly.io as pio
+
+        directory = entry / name
+        index_path = directory / "index.json"
+        if not index_path.exists():
+            directory.mkdir(parents=True, exist_ok=True)
+            files = {}
+            for i, (key, fig) in enumerate(compute().items()):
+                files[str(key)] = f"{i}.json"
+                _atomic_write(directory / files[str(key)], fig.to_json().encode("utf-8"))
+            _atomic_write(index_path, json.dumps(files).encode("utf-8"))
+
+        files = json.loads(index_path.read_text(encoding="utf-8"))
+        return LazyArtifacts({
+            key: (lambda p=directory / filename: pio.from_json(p.read_text(encoding="utf-8")))
+            for key, filename in files.items()
+        })
+
+
+eda_cache = EDAResultCache(settings.EDA_CACHE_DIR)
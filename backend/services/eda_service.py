@@ -1,8 +1,9 @@
 # backend/services/eda_service.py
+import os
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, Literal
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Literal, List, Optional
+from concurrent.futures import wait, FIRST_COMPLETED
 import logging
 
 # Librairies EDA
@@ -13,6 +14,16 @@ import plotly.express as px
 
 # LLM
 from backend.services import llm_service
+from backend.services.eda_cache import eda_cache, dataframe_fingerprint
+from backend.services.analysis_planner import CANCEL_POLL_INTERVAL
+from backend.config import settings
+from backend.utils.cancellation import CancellationToken
+from backend.utils.executors import get_executor
+from backend.utils.shared_frame import share_frame, call_with_shared_frame
+from backend.utils.type_inference import InferredSchema, apply_schema, infer_schema
+from backend.utils.outliers import OutlierResult, detect_outliers
+from backend.utils.profiler import DatasetProfile
+from backend.utils.correlation import correlation_matrix
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -21,61 +32,82 @@ class IntelligentEDAService:
     """
     Service EDA intelligent et scalable pour datasets tabulaires.
     - Échantillonnage adaptatif
-    - Détection robuste des colonnes
+    - Détection robuste des colonnes (une seule inférence de types par dataset)
     - Rapports ydata, Sweetviz, AutoViz
     - Corrélations et distributions optimisées
     - Insights LLM centralisés
+    - Résultats mémorisés sur disque par empreinte du dataset (cf. eda_cache)
+    - Résumé sur toutes les lignes du fichier si un profil complet est fourni (cf. profiler)
     """
 
-    def __init__(self, df: pd.DataFrame, sample_rows: int = 5000, max_plot_rows: int = 10000):
+    def __init__(self, df: pd.DataFrame, sample_rows: int = 5000, max_plot_rows: int = 10000,
+                 fingerprint: Optional[str] = None, use_cache: bool = True,
+                 profile: Optional[DatasetProfile] = None):
         self.df = df.copy()
+        self.profile = profile
         self.sample_rows = sample_rows
         self.max_plot_rows = max_plot_rows
+        self.use_cache = use_cache
+        self._fingerprint = fingerprint
+        self._entry = None
+        self._schema: Optional[InferredSchema] = None
+        self._typed_df: Optional[pd.DataFrame] = None
+        self._datetime_report: Dict[str, Dict[str, Any]] = {}
+        self._outliers: Dict[str, OutlierResult] = {}
         if len(self.df) > self.sample_rows:
             self.df = self.df.sample(self.sample_rows, random_state=42)
 
-    # --- Détection améliorée des colonnes ---
-    def detect_variable_types(self) -> Dict[str, list]:
-        df = self.df.copy()
-        numerical, categorical, datetime_cols, text_cols = [], [], [], []
+    # --- Cache des résultats ---
+    @property
+    def cache_entry(self):
+        """Entrée du cache EDA : empreinte fournie (dataset_id) ou calculée sur l'échantillon."""
+        if self._entry is None:
+            fingerprint = self._fingerprint or dataframe_fingerprint(self.df)
+            self._entry = eda_cache.entry(
+                fingerprint, sample_rows=self.sample_rows, max_plot_rows=self.max_plot_rows
+            )
+        return self._entry
 
-        for col in df.columns:
-            dtype = pd.api.types.infer_dtype(df[col], skipna=True)
-            if dtype in ["string", "unicode"]:
-                # Essayer float
-                try:
-                    df[col] = df[col].str.replace(",", "").astype(float)
-                    numerical.append(col)
-                    continue
-                except Exception:
-                    pass
-                # Essayer datetime
-                try:
-                    tmp = pd.to_datetime(df[col], errors="coerce")
-                    if tmp.notna().any():
-                        df[col] = tmp
-                        datetime_cols.append(col)
-                        continue
-                except Exception:
-                    pass
-                # Texte libre
-                text_cols.append(col)
-            elif pd.api.types.is_numeric_dtype(df[col]):
-                numerical.append(col)
-            elif pd.api.types.is_datetime64_any_dtype(df[col]):
-                datetime_cols.append(col)
+    def _report_path(self, output_path: Optional[str], cached_name: str, default: str) -> str:
+        """Chemin explicite, sinon fichier de l'entrée du cache (sinon chemin historique)."""
+        if output_path:
+            return output_path
+        return str(self.cache_entry / cached_name) if self.use_cache else default
+
+    # --- Détection améliorée des colonnes ---
+    @property
+    def schema(self) -> InferredSchema:
+        """Types des colonnes, inférés une fois par dataset (instance, puis cache EDA)."""
+        if self._schema is None:
+            if self.use_cache:
+                self._schema = InferredSchema.from_dict(eda_cache.get_or_compute_json(
+                    self.cache_entry, "schema", lambda: infer_schema(self.df).to_dict()
+                ))
             else:
-                categorical.append(col)
+                self._schema = infer_schema(self.df)
+        return self._schema
 
-        return {
-            "numerical": numerical,
-            "categorical": categorical,
-            "datetime": datetime_cols,
-            "text": text_cols
-        }
+    @property
+    def typed_df(self) -> pd.DataFrame:
+        """Échantillon avec les colonnes texte numériques / dates converties (une seule fois)."""
+        if self._typed_df is None:
+            self._typed_df, self._datetime_report = apply_schema(self.df, self.schema)
+        return self._typed_df
+
+    @property
+    def datetime_report(self) -> Dict[str, Dict[str, Any]]:
+        """Par colonne texte lue comme dates : format déduit et part des valeurs lues."""
+        _ = self.typed_df
+        return self._datetime_report
+
+    def detect_variable_types(self) -> Dict[str, list]:
+        return self.schema.variable_types()
 
     # --- Rapports EDA ---
-    def generate_profile_report(self, output_path: str = "report_profile.html") -> str:
+    def generate_profile_report(self, output_path: Optional[str] = None) -> str:
+        output_path = self._report_path(output_path, "profile.html", "report_profile.html")
+        if self.use_cache and os.path.exists(output_path):
+            return output_path
         try:
             profile = ProfileReport(
                 self.df.head(self.sample_rows),
@@ -89,7 +121,10 @@ class IntelligentEDAService:
             logger.warning(f"Erreur ProfileReport: {e}")
             return f"Erreur ProfileReport: {e}"
 
-    def generate_sweetviz_report(self, output_path: str = "report_sweetviz.html") -> str:
+    def generate_sweetviz_report(self, output_path: Optional[str] = None) -> str:
+        output_path = self._report_path(output_path, "sweetviz.html", "report_sweetviz.html")
+        if self.use_cache and os.path.exists(output_path):
+            return output_path
         try:
             report = sv.analyze(self.df.head(self.sample_rows))
             report.show_html(output_path)
@@ -98,7 +133,10 @@ class IntelligentEDAService:
             logger.warning(f"Erreur Sweetviz: {e}")
             return f"Erreur Sweetviz: {e}"
 
-    def generate_autoviz_report(self, output_path: str = "autoviz_report") -> str:
+    def generate_autoviz_report(self, output_path: Optional[str] = None) -> str:
+        output_path = self._report_path(output_path, "autoviz", "autoviz_report")
+        if self.use_cache and os.path.isdir(output_path) and os.listdir(output_path):
+            return output_path
         try:
             AV = AutoViz_Class()
             AV.AutoViz(
@@ -110,20 +148,35 @@ class IntelligentEDAService:
             return f"Erreur AutoViz: {e}"
 
     # --- Détection d’outliers ---
-    def detect_outliers(self) -> Dict[str, int]:
-        outliers = {}
-        numeric_cols = self.detect_variable_types()["numerical"]
-        for col in numeric_cols:
-            q1, q3 = self.df[col].quantile([0.25, 0.75])
-            iqr = q3 - q1
-            lower, upper = q1 - 1.5 * iqr, q3 + 1.5 * iqr
-            outliers[col] = self.df[(self.df[col] < lower) | (self.df[col] > upper)].shape[0]
-        return outliers
+    def outlier_result(self, method: str = "iqr") -> OutlierResult:
+        """Détection vectorisée (cf. utils.outliers) mémorisée par méthode : masques par ligne réutilisables."""
+        if method not in self._outliers:
+            self._outliers[method] = detect_outliers(self.typed_df, method=method, columns=self.schema.numerical)
+        return self._outliers[method]
+
+    def detect_outliers(self, method: str = "iqr") -> Dict[str, int]:
+        """Nombre de valeurs atypiques par colonne numérique."""
+        return self.outlier_result(method).counts()
 
     # --- Corrélations et insights LLM ---
-    def correlation_analysis(self, threshold: float = 0.7) -> Dict[str, Any]:
-        numeric_cols = self.detect_variable_types()["numerical"]
-        corr = self.df[numeric_cols].corr() if numeric_cols else pd.DataFrame()
+    def correlation_analysis(self, threshold: float = 0.7, interpret: bool = True) -> Dict[str, Any]:
+        """Matrice + corrélations fortes ; `interpret=False` : sans interprétation LLM."""
+        if self.use_cache:
+            name = f"correlation_{threshold}" if interpret else f"correlation_{threshold}_raw"
+            if self.profile is not None:
+                name += "_full"
+            return eda_cache.get_or_compute_pickle(
+                self.cache_entry, name, lambda: self._correlation_analysis(threshold, interpret),
+                cacheable=lambda r: r["insights"] != llm_service.LLM_ERROR_MESSAGE
+            )
+        return self._correlation_analysis(threshold, interpret)
+
+    def _correlation_analysis(self, threshold: float, interpret: bool = True) -> Dict[str, Any]:
+        numeric_cols = self.schema.numerical
+        # Toutes les lignes du fichier si le profil couvre les colonnes, sinon l'échantillon typé
+        corr = self.profile.correlation(numeric_cols) if self.profile is not None and numeric_cols else None
+        if corr is None:
+            corr = correlation_matrix(self.typed_df, columns=numeric_cols) if numeric_cols else pd.DataFrame()
         fig = px.imshow(corr, text_auto=True, title="Matrice de corrélation") if not corr.empty else None
 
         strong_relations = {}
@@ -132,7 +185,7 @@ class IntelligentEDAService:
             # Limiter LLM à corrélations fortes pour réduire tokens
             interpretation = llm_service.ask_llm(
                 f"Corrélations fortes {strong_relations}. Explique relations et anomalies."
-            )
+            ) if interpret else ""
         else:
             interpretation = "Pas de corrélations numériques disponibles."
 
@@ -140,49 +193,120 @@ class IntelligentEDAService:
 
     # --- Distributions légères ---
     def generate_distribution_plots(self) -> Dict[str, Any]:
+        if self.use_cache:
+            # Figures relues à la demande, colonne par colonne
+            return eda_cache.get_or_compute_figures(self.cache_entry, "distributions", self._distribution_plots)
+        return self._distribution_plots()
+
+    def _distribution_plots(self) -> Dict[str, Any]:
         figs = {}
-        numeric_cols = self.detect_variable_types()["numerical"]
-        df_plot = self.df.head(self.max_plot_rows)
-        for col in numeric_cols:
+        df_plot = self.typed_df.head(self.max_plot_rows)
+        for col in self.schema.numerical:
             figs[col] = px.histogram(df_plot, x=col, title=f"Distribution de {col}", marginal="box")
         return figs
 
     # --- Résumé global ---
     def smart_summary(self) -> Dict[str, Any]:
-        return {
+        if self.use_cache:
+            name = "summary" if self.profile is None else "summary_full"
+            return eda_cache.get_or_compute_json(self.cache_entry, name, self._smart_summary)
+        return self._smart_summary()
+
+    def _smart_summary(self) -> Dict[str, Any]:
+        summary = {
             "shape": self.df.shape,
             "missing_values": self.df.isna().sum().to_dict(),
             "dtypes": self.df.dtypes.astype(str).to_dict(),
             "outliers": self.detect_outliers(),
             "variable_types": self.detect_variable_types(),
+            "datetime_parsing": self.datetime_report,
         }
+        if self.profile is not None:
+            # Dimensions et manquants sur tout le fichier ; types et outliers restent sur l'échantillon
+            summary.update(shape=(self.profile.rows, self.df.shape[1]), sample_shape=self.df.shape,
+                           missing_values={c: n for c, n in self.profile.missing().items() if c in self.df.columns},
+                           profile=self.profile.summary())
+        return summary
 
-    # --- Analyse complète configurable ---
-    def full_analysis(self, engine: Literal["all", "ydata", "sweetviz", "autoviz"] = "ydata") -> Dict[str, Any]:
-        results = {}
-        futures = {}
-        engines = [engine] if engine != "all" else ["ydata", "sweetviz", "autoviz"]
-
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            for eng in engines:
-                if eng == "ydata":
-                    futures[executor.submit(self.generate_profile_report)] = "profile"
-                elif eng == "sweetviz":
-                    futures[executor.submit(self.generate_sweetviz_report)] = "sweetviz"
-                elif eng == "autoviz":
-                    futures[executor.submit(self.generate_autoviz_report)] = "autoviz"
+    # --- Moteurs EDA : threads ou processus ---
+    ENGINE_KEYS = {"ydata": "profile", "sweetviz": "sweetviz", "autoviz": "autoviz"}
 
-            for f in as_completed(futures):
+    @staticmethod
+    def _collect_engine_results(futures: Dict[Any, str], token: CancellationToken) -> Dict[str, str]:
+        """
+        Résultats des moteurs au fil de l'eau, sans dépasser l'échéance de `token` (réveil
+        régulier pour voir une annulation) ; à l'annulation, les moteurs pas encore démarrés
+        sont retirés du pool et l'étape est libérée (OperationCancelled).
+        """
+        results = {}
+        pending = set(futures)
+        while pending:
+            if token.cancelled:
+                for f in pending:
+                    f.cancel()
+                logger.warning(f"Moteurs EDA abandonnés ({token.reason}) : {sorted(futures[f] for f in pending)}")
+                token.raise_if_cancelled()
+            remaining = token.remaining()
+            timeout = CANCEL_POLL_INTERVAL if remaining is None else min(remaining, CANCEL_POLL_INTERVAL)
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for f in done:
                 key = futures[f]
                 try:
                     results[key] = f.result()
                 except Exception as e:
                     results[key] = f"Erreur {key}: {e}"
+        return results
+
+    def _run_engines_in_threads(self, engines: List[str], token: CancellationToken) -> Dict[str, str]:
+        futures = {}
+        executor = get_executor("engines")
+        for eng in engines:
+            if eng == "ydata":
+                futures[executor.submit(self.generate_profile_report)] = "profile"
+            elif eng == "sweetviz":
+                futures[executor.submit(self.generate_sweetviz_report)] = "sweetviz"
+            elif eng == "autoviz":
+                futures[executor.submit(self.generate_autoviz_report)] = "autoviz"
+        return self._collect_engine_results(futures, token)
+
+    def _run_engines_in_processes(self, engines: List[str], token: CancellationToken) -> Dict[str, str]:
+        """Moteurs dans le pool de processus préchauffé ; l'échantillon passe par Arrow IPC partagé."""
+        pool = get_executor("eda")
+        with share_frame(self.df) as frame:
+            futures = {
+                pool.submit(call_with_shared_frame, frame, run_eda_engine, eng,
+                            self.sample_rows, self.max_plot_rows,
+                            self._fingerprint or dataframe_fingerprint(self.df)): self.ENGINE_KEYS[eng]
+                for eng in engines if eng in self.ENGINE_KEYS
+            }
+            return self._collect_engine_results(futures, token)
+
+    # --- Analyse complète configurable ---
+    def full_analysis(self, engine: Literal["all", "ydata", "sweetviz", "autoviz"] = "ydata",
+                      interpret: bool = True, token: Optional[CancellationToken] = None) -> Dict[str, Any]:
+        """
+        Rapports EDA + résumé + corrélations ; `interpret=False` : aucun appel LLM.
+        `token` (échéance de l'étape, client déconnecté) est vérifié entre chaque calcul :
+        OperationCancelled dès qu'il est annulé, même si un moteur ne rend pas la main.
+        """
+        token = token or CancellationToken()
+        engines = [engine] if engine != "all" else ["ydata", "sweetviz", "autoviz"]
+        if settings.EXECUTION_MODE == "process":
+            results = self._run_engines_in_processes(engines, token)
+        else:
+            results = self._run_engines_in_threads(engines, token)
 
         # Résumé + corrélations + distributions
+        token.raise_if_cancelled()
         summary = self.smart_summary()
-        corr_data = self.correlation_analysis()
+        token.raise_if_cancelled()
+        corr_data = self.correlation_analysis(interpret=interpret)
+        token.raise_if_cancelled()
         dist_data = self.generate_distribution_plots()
+        token.raise_if_cancelled()
+        if not interpret:
+            return {"summary": summary, "eda_reports": results, "correlation": corr_data,
+                    "distributions": dist_data, "llm_insights": ""}
 
         # LLM centralisé pour résumé + recommandations
         prompt = (
@@ -190,7 +314,13 @@ class IntelligentEDAService:
             f"Corrélations fortes: {corr_data.get('strong_relations')}\n"
             "Génère insights et recommandations pratiques."
         )
-        llm_output = llm_service.ask_llm(prompt)
+        if self.use_cache:
+            llm_output = eda_cache.get_or_compute_json(
+                self.cache_entry, "llm_insights", lambda: llm_service.ask_llm(prompt, cancel_token=token),
+                cacheable=lambda r: r != llm_service.LLM_ERROR_MESSAGE
+            )
+        else:
+            llm_output = llm_service.ask_llm(prompt, cancel_token=token)
 
         return {
             "summary": summary,
@@ -199,3 +329,14 @@ class IntelligentEDAService:
             "distributions": dist_data,
             "llm_insights": llm_output
         }
+
+
+def run_eda_engine(df: pd.DataFrame, engine: str, sample_rows: int, max_plot_rows: int,
+                   fingerprint: Optional[str] = None) -> str:
+    """Tâche de worker : un moteur EDA sur l'échantillon partagé (sortie dans le cache EDA)."""
+    eda = IntelligentEDAService(df, sample_rows=sample_rows, max_plot_rows=max_plot_rows, fingerprint=fingerprint)
+    if engine == "ydata":
+        return eda.generate_profile_report()
+    if engine == "sweetviz":
+        return eda.generate_sweetviz_report()
+    return eda.generate_autoviz_report()
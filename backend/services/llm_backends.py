@@ -0,0 +1,231 @@
+# backend/services/llm_backends.py
+import json
+import random
+import asyncio
+import hashlib
+import logging
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+import httpx
+
+from backend.config import settings
+from backend.services.llm_client import AsyncLLMClient, LLMUnavailableError
+from backend.services.prompt_builder import CHARS_PER_TOKEN, count_tokens
+from backend.utils.cancellation import CancellationToken
+
+logger = logging.getLogger(__name__)
+
+
+class LLMBackend:
+    """
+    Interface des backends LLM utilisés par llm_service : appel complet (bloquant ou
+    asynchrone), streaming, métriques et fermeture. Les implémentations délèguent à un
+    AsyncLLMClient : pool, sémaphore, retries et disjoncteur sont communs à tous les backends.
+    """
+    name = "base"
+
+    def __init__(self, client: AsyncLLMClient):
+        self.client = client
+
+    @property
+    def model(self) -> str:
+        return self.client.model
+
+    def _check(self) -> None:
+        """Vérification préalable à chaque appel (configuration manquante...)."""
+
+    def complete_sync(self, messages: List[Dict[str, str]], temperature: float = 0.3, top_p: float = 1.0,
+                      cancel_token: Optional[CancellationToken] = None, max_retries: Optional[int] = None,
+                      response_format: Optional[Dict[str, Any]] = None,
+                      usage: Optional[Dict[str, int]] = None) -> str:
+        self._check()
+        return self.client.complete_sync(messages, temperature, top_p, cancel_token, max_retries,
+                                         response_format, usage)
+
+    def stream_sync(self, messages: List[Dict[str, str]], on_delta: Callable[[str], None],
+                    temperature: float = 0.3, top_p: float = 1.0,
+                    cancel_token: Optional[CancellationToken] = None, max_retries: Optional[int] = None,
+                    usage: Optional[Dict[str, int]] = None) -> str:
+        self._check()
+        return self.client.stream_sync(messages, on_delta, temperature, top_p, cancel_token, max_retries, usage)
+
+    async def acomplete(self, messages: List[Dict[str, str]], temperature: float = 0.3, top_p: float = 1.0,
+                        max_retries: Optional[int] = None, response_format: Optional[Dict[str, Any]] = None,
+                        usage: Optional[Dict[str, int]] = None) -> str:
+        self._check()
+        return await self.client.acomplete(messages, temperature, top_p, max_retries, response_format, usage)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, **self.client.stats()}
+
+    def close(self) -> None:
+        self.client.close()
+
+
+class RemoteLLMBackend(LLMBackend):
+    """Endpoint chat/completions distant (GitHub Models par défaut)."""
+    name = "remote"
+
+    def __init__(self, endpoint: str, token: Optional[str], model: str):
+        super().__init__(AsyncLLMClient(endpoint, token or "", model))
+        self.configured = bool(token)
+        if not self.configured:
+            logger.warning("⚠️ GITHUB_TOKEN non défini : les appels LLM distants échoueront")
+
+    def _check(self) -> None:
+        # Échec immédiat sans solliciter le disjoncteur : ce n'est pas une panne du fournisseur
+        if not self.configured:
+            raise LLMUnavailableError("GITHUB_TOKEN non défini")
+
+
+# -----------------------------
+# Backend local simulé (tests, CI, benchmarks hors réseau)
+# -----------------------------
+STUB_WORDS = ("les", "données", "montrent", "une", "tendance", "nette", "sur", "la", "variable",
+              "principale", "avec", "quelques", "valeurs", "atypiques", "à", "surveiller")
+
+
+def stub_response(messages: List[Dict[str, Any]], n_tokens: int, json_mode: bool) -> str:
+    """Réponse déterministe : même prompt => même texte, d'environ `n_tokens` mots."""
+    digest = hashlib.sha256(json.dumps(messages, sort_keys=True).encode("utf-8")).hexdigest()
+    rng = random.Random(digest)
+    words = [rng.choice(STUB_WORDS) for _ in range(max(1, n_tokens))]
+    text = f"[stub {digest[:8]}] " + " ".join(words)
+    if not json_mode:
+        return text
+    return json.dumps({
+        "summary": text,
+        "insights": [f"Insight simulé {i} ({digest[i:i + 4]})" for i in range(1, 4)],
+        "recommendations": [f"Recommandation simulée {i}" for i in range(1, 3)],
+    }, ensure_ascii=False)
+
+
+# Cache de préfixes simulé, comme chez le fournisseur : à partir de 1024 tokens, par blocs de 128
+PREFIX_CACHE_MIN_TOKENS = 1024
+PREFIX_CACHE_BLOCK_TOKENS = 128
+PREFIX_CACHE_MAX_BLOCKS = 100_000
+
+
+class StubTransport(httpx.AsyncBaseTransport):
+    """
+    Transport httpx simulant le fournisseur : latence avant le premier token, débit en
+    tokens/s, pannes injectées (statut + Retry-After) selon un tirage reproductible (`seed`),
+    et usage déclaré avec `cached_tokens` (préfixe déjà vu) pour mesurer le cache de prompts.
+    """
+
+    def __init__(self, latency: float = 0.0, tokens_per_second: float = 0.0, failure_rate: float = 0.0,
+                 failure_status: int = 503, retry_after: Optional[float] = None,
+                 response_tokens: int = 60, seed: int = 0):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.retry_after = retry_after
+        self.response_tokens = response_tokens
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+        self._prefixes: set = set()
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            failed = self.failure_rate > 0 and self._rng.random() < self.failure_rate
+            self.failures += failed
+            return failed
+
+    def _usage(self, messages: List[Dict[str, Any]], content: str) -> Dict[str, Any]:
+        """Tokens du prompt dont ceux d'un préfixe (par blocs) déjà envoyé."""
+        text = "".join(f"<{m.get('role')}>{m.get('content')}" for m in messages)
+        prompt_tokens = count_tokens(text)
+        block = PREFIX_CACHE_BLOCK_TOKENS * CHARS_PER_TOKEN
+        hashes = [hashlib.sha1(text[:end].encode("utf-8")).digest() for end in range(block, len(text) + 1, block)]
+        with self._lock:
+            cached_blocks = 0
+            for i, h in enumerate(hashes):
+                if h not in self._prefixes:
+                    break
+                cached_blocks = i + 1
+            if len(self._prefixes) > PREFIX_CACHE_MAX_BLOCKS:
+                self._prefixes.clear()
+            self._prefixes.update(hashes)
+        cached = cached_blocks * PREFIX_CACHE_BLOCK_TOKENS
+        cached = min(cached, prompt_tokens) if cached >= PREFIX_CACHE_MIN_TOKENS else 0
+        return {"prompt_tokens": prompt_tokens, "completion_tokens": count_tokens(content),
+                "total_tokens": prompt_tokens + count_tokens(content),
+                "prompt_tokens_details": {"cached_tokens": cached}}
+
+    def _token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content or b"{}")
+        if self._should_fail():
+            headers = {"Retry-After": str(self.retry_after)} if self.retry_after is not None else {}
+            return httpx.Response(self.failure_status, headers=headers, json={"error": "panne simulée"})
+
+        await asyncio.sleep(self.latency)
+        json_mode = (payload.get("response_format") or {}).get("type") == "json_object"
+        messages = payload.get("messages", [])
+        content = stub_response(messages, self.response_tokens, json_mode)
+        usage = self._usage(messages, content)
+
+        if payload.get("stream"):
+            include_usage = (payload.get("stream_options") or {}).get("include_usage", False)
+            return httpx.Response(200, headers={"Content-Type": "text/event-stream"},
+                                  content=self._sse(content, usage if include_usage else None))
+        await asyncio.sleep(self._token_delay() * self.response_tokens)
+        return httpx.Response(200, json={
+            "model": payload.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}],
+            "usage": usage,
+        })
+
+    async def _sse(self, content: str, usage: Optional[Dict[str, Any]] = None) -> AsyncIterator[bytes]:
+        delay = self._token_delay()
+        for i, word in enumerate(content.split(" ")):
+            chunk = {"choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word}}]}
+            yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8")
+            if delay:
+                await asyncio.sleep(delay)
+        if usage is not None:
+            yield f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n".encode("utf-8")
+        yield b"data: [DONE]\n\n"
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"requests": self.requests, "injected_failures": self.failures}
+
+
+class StubLLMBackend(LLMBackend):
+    """Backend local déterministe : mêmes chemins de code que le distant, sans réseau."""
+    name = "stub"
+
+    def __init__(self, model: str, **transport_options):
+        self.transport = StubTransport(**transport_options)
+        super().__init__(AsyncLLMClient("http://llm-stub.local", "stub", f"stub-{model}",
+                                        transport=self.transport))
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "stub": self.transport.stats()}
+
+
+def create_backend(kind: Optional[str] = None, model: Optional[str] = None) -> LLMBackend:
+    """Backend choisi par settings.LLM_BACKEND : "remote" (défaut) ou "stub"."""
+    kind = kind or settings.LLM_BACKEND
+    model = model or settings.MODEL_NAME
+    if kind == "stub":
+        return StubLLMBackend(
+            model,
+            latency=settings.LLM_STUB_LATENCY,
+            tokens_per_second=settings.LLM_STUB_TOKENS_PER_SECOND,
+            failure_rate=settings.LLM_STUB_FAILURE_RATE,
+            failure_status=settings.LLM_STUB_FAILURE_STATUS,
+            response_tokens=settings.LLM_STUB_RESPONSE_TOKENS,
+            seed=settings.LLM_STUB_SEED,
+        )
+    if kind == "remote":
+        return RemoteLLMBackend(settings.LLM_ENDPOINT, settings.GITHUB_TOKEN, model)
+    raise ValueError(f"Backend LLM inconnu : {kind}")
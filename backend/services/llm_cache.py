@@ -0,0 +1,127 @@
+# backend/services/llm_cache.py
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LLMResponseCache:
+    """
+    Cache persistant (SQLite) des réponses LLM.
+    Clé : modèle + prompt système + empreinte du prompt + température.
+    Entrées expirées après `ttl` secondes ; au-delà de `max_entries`, éviction des moins récemment lues.
+    """
+
+    def __init__(self, db_path: str, ttl: float, max_entries: int):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def init_db(self):
+        conn = self._connect()
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            key TEXT PRIMARY KEY,
+            model TEXT,
+            response TEXT,
+            created_at REAL,
+            last_access REAL
+        )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache (last_access)")
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, prompt: str, temperature: float) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        raw = json.dumps([model, system_prompt, prompt_hash, temperature])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        try:
+            conn = self._connect()
+            row = conn.execute("SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row and now - row[1] <= self.ttl:
+                conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+                conn.commit()
+            elif row:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                conn.commit()
+                row = None
+            conn.close()
+        except Exception as e:
+            logger.error(f"Erreur lecture cache LLM: {e}")
+            row = None
+
+        with self._lock:
+            if row:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return row[0] if row else None
+
+    def put(self, key: str, model: str, response: str) -> None:
+        now = time.time()
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, response, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now)
+            )
+            # Éviction : entrées expirées puis les moins récemment lues au-delà de max_entries
+            conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl,))
+            conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                "SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            # Ne pas faire échouer l'appel LLM si le cache est indisponible
+            logger.error(f"Erreur écriture cache LLM: {e}")
+
+    def clear(self) -> None:
+        conn = self._connect()
+        conn.execute("DELETE FROM llm_cache")
+        conn.commit()
+        conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            conn = self._connect()
+            entries = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            conn.close()
+        except Exception:
+            entries = None
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+llm_cache = LLMResponseCache(settings.LLM_CACHE_DB, settings.LLM_CACHE_TTL, settings.LLM_CACHE_MAX_ENTRIES)
@@ -0,0 +1,435 @@
+# backend/services/llm_client.py
+import json
+import time
+import random
+import asyncio
+import logging
+import threading
+from concurrent.futures import TimeoutError as FutureTimeout
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from backend.config import settings
+from backend.utils.cancellation import CancellationToken, OperationCancelled
+
+logger = logging.getLogger(__name__)
+
+# Statuts HTTP transitoires : nouvelle tentative avec backoff
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class LLMUnavailableError(Exception):
+    """Échec définitif d'un appel LLM (tentatives épuisées ou erreur non récupérable)."""
+
+
+class CircuitOpenError(LLMUnavailableError):
+    """Disjoncteur ouvert : l'appel échoue immédiatement sans solliciter le fournisseur."""
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur : après `failure_threshold` échecs consécutifs, les appels échouent
+    immédiatement pendant `reset_timeout` secondes ; un appel d'essai (demi-ouvert)
+    referme le circuit s'il réussit, le rouvre sinon.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.rejected = 0
+        # Jeton de l'appel d'essai en cours (demi-ouvert), None sinon
+        self._probe: Optional[object] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def admit(self) -> Optional[object]:
+        """
+        Jeton d'admission (à rendre avec `release`), None si l'appel est refusé.
+        En demi-ouvert, un seul appel d'essai est admis à la fois.
+        """
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return object()
+            if state == "half_open" and self._probe is None:
+                self._probe = object()
+                return self._probe
+            self.rejected += 1
+            return None
+
+    def allow(self) -> bool:
+        return self.admit() is not None
+
+    def release(self, ticket: Optional[object]) -> None:
+        """
+        Fin d'un appel admis : si c'était l'appel d'essai et qu'il s'est terminé sans
+        succès ni échec du fournisseur (erreur 4xx, annulation, exception de l'appelant),
+        un nouvel essai redevient possible au lieu de bloquer le circuit en demi-ouvert.
+        """
+        with self._lock:
+            if ticket is not None and self._probe is ticket:
+                self._probe = None
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info("Disjoncteur LLM refermé")
+            self.failures = 0
+            self.opened_at = None
+            self._probe = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            was_probe = self._probe is not None
+            self._probe = None
+            if was_probe or self.failures >= self.failure_threshold:
+                if self.opened_at is None or was_probe:
+                    logger.warning(f"Disjoncteur LLM ouvert pour {self.reset_timeout}s ({self.failures} échecs)")
+                self.opened_at = time.monotonic()
+
+    def retry_in(self) -> float:
+        """Secondes avant le prochain appel d'essai (0 si le circuit est fermé)."""
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self.failures,
+                    "rejected": self.rejected, "retry_in": round(self.retry_in(), 1)}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """En-tête Retry-After : nombre de secondes ou date HTTP."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def record_provider_usage(totals: Optional[Dict[str, int]], reported: Optional[Dict[str, Any]]) -> None:
+    """
+    Cumule l'usage renvoyé par le fournisseur (format OpenAI) : tokens du prompt, dont
+    lus depuis le cache de préfixes (prompt_tokens_details.cached_tokens), et de la réponse.
+    """
+    if totals is None or not reported:
+        return
+    details = reported.get("prompt_tokens_details") or {}
+    for key, value in (("provider_prompt_tokens", reported.get("prompt_tokens")),
+                       ("cached_tokens", details.get("cached_tokens")),
+                       ("completion_tokens", reported.get("completion_tokens"))):
+        if value is not None:
+            totals[key] = totals.get(key, 0) + int(value)
+
+
+def backoff_delay(attempt: int, base: float, cap: float, retry_after: Optional[float] = None) -> float:
+    """
+    Backoff exponentiel avec jitter complet : uniforme dans [0, min(cap, base * 2^attempt)].
+    Un Retry-After du fournisseur est un minimum (borné par `cap`).
+    """
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, cap))
+    return delay
+
+
+class AsyncLLMClient:
+    """
+    Client asynchrone du endpoint chat/completions : connexions HTTP réutilisées (pool httpx),
+    nombre d'appels simultanés borné par un sémaphore global, retries avec backoff + jitter
+    respectant Retry-After, disjoncteur partagé.
+
+    Toutes les requêtes tournent sur une boucle asyncio dédiée (thread "llm-client") :
+    pool et sémaphore sont donc communs aux threads de l'exécuteur "agent" (`complete_sync`)
+    et aux endpoints asynchrones (`acomplete`), quelle que soit leur boucle.
+    """
+
+    def __init__(self, endpoint: str, token: str, model: str,
+                 max_concurrency: int = settings.LLM_MAX_CONCURRENCY,
+                 timeout: float = settings.LLM_TIMEOUT,
+                 max_retries: int = settings.LLM_MAX_RETRIES,
+                 backoff_base: float = settings.LLM_BACKOFF_BASE,
+                 backoff_max: float = settings.LLM_BACKOFF_MAX,
+                 breaker: Optional[CircuitBreaker] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.url = endpoint.rstrip("/") + "/chat/completions"
+        self.token = token
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker(settings.LLM_BREAKER_THRESHOLD, settings.LLM_BREAKER_RESET)
+        self.inflight = 0
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        # Tokens déclarés par le fournisseur (cumul depuis le démarrage)
+        self.token_usage: Dict[str, int] = {}
+        self._transport = transport
+        # Client httpx et sémaphore, créés sur la boucle dédiée au premier appel
+        self._http: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="llm-client", daemon=True).start()
+                self._loop = loop
+                self._http = None
+            return self._loop
+
+    def _resources(self):
+        # Appelé uniquement depuis la boucle dédiée
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_concurrency,
+                                    max_keepalive_connections=self.max_concurrency),
+                headers={"Authorization": f"Bearer {self.token}", "Content-Type": "application/json"},
+                transport=self._transport,
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._http, self._semaphore
+
+    async def _post(self, payload: Dict[str, Any], usage: Optional[Dict[str, int]] = None) -> str:
+        http, semaphore = self._resources()
+        async with semaphore:
+            self.inflight += 1
+            try:
+                resp = await http.post(self.url, json=payload)
+            finally:
+                self.inflight -= 1
+        if resp.status_code in RETRYABLE_STATUS:
+            raise _RetryableError(f"HTTP {resp.status_code}", parse_retry_after(resp.headers.get("Retry-After")))
+        if resp.status_code >= 400:
+            raise LLMUnavailableError(f"HTTP {resp.status_code}: {resp.text[:200]}")
+        try:
+            body = resp.json()
+        except ValueError:
+            # Corps non JSON (proxy, page d'erreur) : traité comme une panne transitoire
+            raise _RetryableError("réponse non JSON", None)
+        choices = body.get("choices") or []
+        if not choices:
+            raise _RetryableError("réponse vide", None)
+        record_provider_usage(self.token_usage, body.get("usage"))
+        record_provider_usage(usage, body.get("usage"))
+        return ((choices[0].get("message") or {}).get("content") or "").strip()
+
+    async def _complete(self, messages: List[Dict[str, str]], temperature: float = 0.3,
+                        top_p: float = 1.0, max_retries: Optional[int] = None,
+                        response_format: Optional[Dict[str, Any]] = None,
+                        usage: Optional[Dict[str, int]] = None) -> str:
+        """
+        Appel chat/completions ; lève CircuitOpenError ou LLMUnavailableError en cas d'échec.
+        `usage` reçoit les tokens déclarés par le fournisseur (dont `cached_tokens`).
+        """
+        payload = {"model": self.model, "messages": messages, "temperature": temperature, "top_p": top_p}
+        if response_format:
+            payload["response_format"] = response_format
+        attempts = self.max_retries if max_retries is None else max_retries
+        last_error: Optional[Exception] = None
+        for attempt in range(attempts):
+            ticket = self.breaker.admit()
+            if ticket is None:
+                raise CircuitOpenError(f"LLM indisponible, nouvel essai dans {self.breaker.retry_in():.0f}s")
+            self.calls += 1
+            try:
+                content = await self._post(payload, usage)
+                self.breaker.record_success()
+                return content
+            except (_RetryableError, httpx.TransportError) as e:
+                last_error = e
+                self.breaker.record_failure()
+                retry_after = getattr(e, "retry_after", None)
+            except LLMUnavailableError:
+                # Erreur client (4xx) : inutile de réessayer, le fournisseur n'est pas en cause
+                self.failures += 1
+                raise
+            finally:
+                # 4xx, annulation (CancelledError) : l'appel d'essai ne doit pas rester en cours
+                self.breaker.release(ticket)
+            if attempt + 1 < attempts:
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_max, retry_after)
+                logger.warning(f"Erreur LLM tentative {attempt + 1}: {last_error}, nouvel essai dans {delay:.1f}s")
+                self.retries += 1
+                await asyncio.sleep(delay)
+        self.failures += 1
+        raise LLMUnavailableError(f"Erreur LLM après {attempts} tentatives : {last_error}")
+
+    async def _stream(self, messages: List[Dict[str, str]], on_delta: Callable[[str], None],
+                      temperature: float = 0.3, top_p: float = 1.0, max_retries: Optional[int] = None,
+                      usage: Optional[Dict[str, int]] = None) -> str:
+        """
+        Appel en streaming (SSE du fournisseur) : `on_delta` reçoit chaque fragment de texte.
+        Retries et disjoncteur comme `_complete`, mais seulement avant le premier fragment
+        (une réponse déjà transmise en partie n'est pas rejouée).
+        """
+        payload = {"model": self.model, "messages": messages, "temperature": temperature,
+                   "top_p": top_p, "stream": True, "stream_options": {"include_usage": True}}
+        attempts = self.max_retries if max_retries is None else max_retries
+        last_error: Optional[Exception] = None
+        for attempt in range(attempts):
+            ticket = self.breaker.admit()
+            if ticket is None:
+                raise CircuitOpenError(f"LLM indisponible, nouvel essai dans {self.breaker.retry_in():.0f}s")
+            self.calls += 1
+            parts: List[str] = []
+            retry_after = None
+            try:
+                http, semaphore = self._resources()
+                async with semaphore:
+                    self.inflight += 1
+                    try:
+                        async with http.stream("POST", self.url, json=payload) as resp:
+                            if resp.status_code in RETRYABLE_STATUS:
+                                raise _RetryableError(f"HTTP {resp.status_code}",
+                                                      parse_retry_after(resp.headers.get("Retry-After")))
+                            if resp.status_code >= 400:
+                                body = (await resp.aread()).decode("utf-8", "replace")
+                                raise LLMUnavailableError(f"HTTP {resp.status_code}: {body[:200]}")
+                            async for line in resp.aiter_lines():
+                                if not line.startswith("data:"):
+                                    continue
+                                data = line[5:].strip()
+                                if data == "[DONE]":
+                                    break
+                                try:
+                                    chunk = json.loads(data)
+                                except ValueError:
+                                    continue
+                                # Dernier fragment : usage du fournisseur (stream_options.include_usage)
+                                record_provider_usage(self.token_usage, chunk.get("usage"))
+                                record_provider_usage(usage, chunk.get("usage"))
+                                choices = chunk.get("choices") or []
+                                delta = ((choices[0].get("delta") or {}).get("content") or "") if choices else ""
+                                if delta:
+                                    parts.append(delta)
+                                    on_delta(delta)
+                    finally:
+                        self.inflight -= 1
+                self.breaker.record_success()
+                return "".join(parts).strip()
+            except (_RetryableError, httpx.TransportError) as e:
+                last_error = e
+                self.breaker.record_failure()
+                retry_after = getattr(e, "retry_after", None)
+                if parts:
+                    # Flux interrompu après des fragments déjà envoyés : pas de nouvelle tentative
+                    self.failures += 1
+                    raise LLMUnavailableError(f"Flux LLM interrompu : {e}")
+            except LLMUnavailableError:
+                self.failures += 1
+                raise
+            finally:
+                # 4xx, annulation, exception levée par `on_delta` : l'essai est rendu
+                self.breaker.release(ticket)
+            if attempt + 1 < attempts:
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_max, retry_after)
+                logger.warning(f"Erreur LLM (stream) tentative {attempt + 1}: {last_error}, nouvel essai dans {delay:.1f}s")
+                self.retries += 1
+                await asyncio.sleep(delay)
+        self.failures += 1
+        raise LLMUnavailableError(f"Erreur LLM après {attempts} tentatives : {last_error}")
+
+    async def acomplete(self, messages: List[Dict[str, str]], temperature: float = 0.3,
+                        top_p: float = 1.0, max_retries: Optional[int] = None,
+                        response_format: Optional[Dict[str, Any]] = None,
+                        usage: Optional[Dict[str, int]] = None) -> str:
+        """Version asynchrone pour les endpoints (l'annulation de la tâche annule l'appel)."""
+        fut = asyncio.run_coroutine_threadsafe(
+            self._complete(messages, temperature, top_p, max_retries, response_format, usage), self._get_loop()
+        )
+        return await asyncio.wrap_future(fut)
+
+    def complete_sync(self, messages: List[Dict[str, str]], temperature: float = 0.3, top_p: float = 1.0,
+                      cancel_token: Optional[CancellationToken] = None, max_retries: Optional[int] = None,
+                      response_format: Optional[Dict[str, Any]] = None,
+                      usage: Optional[Dict[str, int]] = None) -> str:
+        """
+        Version bloquante pour le code synchrone : l'attente (y compris le backoff)
+        est interrompue dès que `cancel_token` est annulé (lève OperationCancelled).
+        """
+        fut = asyncio.run_coroutine_threadsafe(
+            self._complete(messages, temperature, top_p, max_retries, response_format, usage), self._get_loop()
+        )
+        while True:
+            try:
+                return fut.result(timeout=0.1)
+            except FutureTimeout:
+                if cancel_token and cancel_token.cancelled:
+                    fut.cancel()
+                    raise OperationCancelled(cancel_token.reason)
+
+    def stream_sync(self, messages: List[Dict[str, str]], on_delta: Callable[[str], None],
+                    temperature: float = 0.3, top_p: float = 1.0,
+                    cancel_token: Optional[CancellationToken] = None, max_retries: Optional[int] = None,
+                    usage: Optional[Dict[str, int]] = None) -> str:
+        """
+        Streaming pour le code synchrone : `on_delta` est appelé depuis le thread du client
+        (il doit être thread-safe) ; retourne le texte complet. Interrompu par `cancel_token`.
+        """
+        fut = asyncio.run_coroutine_threadsafe(
+            self._stream(messages, on_delta, temperature, top_p, max_retries, usage), self._get_loop()
+        )
+        while True:
+            try:
+                return fut.result(timeout=0.1)
+            except FutureTimeout:
+                if cancel_token and cancel_token.cancelled:
+                    fut.cancel()
+                    raise OperationCancelled(cancel_token.reason)
+
+    def close(self) -> None:
+        """Ferme le pool de connexions et arrête la boucle dédiée (arrêt de l'application)."""
+        with self._loop_lock:
+            loop, http = self._loop, self._http
+            self._loop, self._http = None, None
+        if loop is None or loop.is_closed():
+            return
+        if http is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(http.aclose(), loop).result(timeout=5)
+            except Exception as e:
+                logger.warning(f"Fermeture du client LLM : {e}")
+        loop.call_soon_threadsafe(loop.stop)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "max_concurrency": self.max_concurrency,
+            "inflight": self.inflight,
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+            "tokens": dict(self.token_usage),
+            "circuit": self.breaker.stats(),
+        }
+
+
+class _RetryableError(Exception):
+    def __init__(self, message: str, retry_after: Optional[float]):
+        super().__init__(message)
+        self.retry_after = retry_after
@@ -1,36 +1,42 @@
 # backend/services/llm_service.py
-import json
 import logging
 import os
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List, Optional, Union
 import pandas as pd
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import time
 
 from backend.services.eda_service import IntelligentEDAService
 from backend.services import tools_service
+from backend.services.dataset_registry import get_dataset, get_or_compute_artifact
+from backend.services.llm_cache import llm_cache
+from backend.services.llm_backends import create_backend
+from backend.services.llm_client import LLMUnavailableError
+from backend.services.prompt_builder import build_prompt, count_tokens
+from backend.services.analysis_planner import (
+    build_plan, execute_plan, SharedArtifacts, Stage, STAGE_DEPENDENCIES, STAGE_TIMEOUTS
+)
+from backend.utils.cancellation import CancellationToken, OperationCancelled
 from backend.utils.chart_generator import (
     generate_correlation_plot,
     generate_distribution_plot,
     generate_time_series_plot
 )
 from backend.utils.chat_logger import log_interaction
-
-from azure.ai.inference import ChatCompletionsClient
-from azure.ai.inference.models import SystemMessage, UserMessage
-from azure.core.credentials import AzureKeyCredential
+from backend.utils.executors import get_executor
+from backend.utils.profiler import DatasetProfile, profile_dataset
+from backend.utils.shared_frame import share_frame, call_with_shared_frame
+from backend.config import settings
+from backend.models.schemas import StructuredAnalysis
+from pydantic import ValidationError
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 # --- CONFIG LLM ---
-GITHUB_ENDPOINT = os.environ.get("GITHUB_ENDPOINT", "https://models.github.ai/inference")
 GITHUB_MODEL = os.environ.get("GITHUB_MODEL", "gpt-4.1")
-GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN")
-if not GITHUB_TOKEN:
-    raise ValueError("⚠️ GITHUB_TOKEN non défini.")
 
-client = ChatCompletionsClient(endpoint=GITHUB_ENDPOINT, credential=AzureKeyCredential(GITHUB_TOKEN))
+# Backend partagé (settings.LLM_BACKEND) : pool de connexions, appels simultanés bornés,
+# backoff et disjoncteur ; "stub" pour les tests et benchmarks hors réseau
+client = create_backend(model=GITHUB_MODEL)
 
 ANALYST_PROMPT = """
 Tu es un expert Data Analyst IA. Analyse uniquement les données réelles fournies.
@@ -38,31 +44,93 @@ Ne jamais générer de code ni inventer des données.
 Fournis des explications claires, synthétiques et structurées adaptées au type de données.
 """
 
+LLM_ERROR_MESSAGE = "❌ Erreur LLM après plusieurs tentatives."
+
+# Consignes propres à chaque appel : placées après le contexte dataset, jamais dans le
+# prompt système, pour que [système + contexte] reste un préfixe identique entre appels
 INSIGHT_PROMPT = """
-Tu es un expert en data analysis avancée.
 Utilise uniquement les informations statistiques fournies.
 Génère un TOP 5 des insights clés et recommandations exploitables.
 """
 
+STRUCTURED_PROMPT = """
+Réponds uniquement par un objet JSON valide, sans texte autour, de la forme :
+{"summary": "analyse synthétique répondant à la question",
+ "insights": ["5 insights clés au plus"],
+ "recommendations": ["5 recommandations exploitables au plus"]}
+"""
+
 # --- FONCTIONS LLM ---
-def ask_llm(prompt: str, system_prompt: str = ANALYST_PROMPT, retries: int = 3, delay: float = 1.0) -> str:
-    """Appel LLM robuste avec retries pour réduire risque de timeout / déconnexion."""
-    for attempt in range(retries):
-        try:
-            resp = client.complete(
-                model=GITHUB_MODEL,
-                messages=[SystemMessage(content=system_prompt), UserMessage(content=prompt)],
-                temperature=0.3,
-                top_p=1.0
-            )
-            if resp and resp.choices:
-                return (resp.choices[0].message.content or "").strip()
-            else:
-                logger.warning(f"LLM returned empty response, attempt {attempt+1}")
-        except Exception as e:
-            logger.error(f"Erreur LLM attempt {attempt+1}: {e}")
-        time.sleep(delay)
-    return "❌ Erreur LLM après plusieurs tentatives."
+def _messages(prompt: str, system_prompt: str) -> List[Dict[str, str]]:
+    return [{"role": "system", "content": system_prompt}, {"role": "user", "content": prompt}]
+
+
+def new_usage() -> Dict[str, int]:
+    """
+    Compteurs de tokens d'une requête (cf. `usage` de ask_llm) : estimation locale
+    (`prompt_tokens`) et, si le fournisseur les déclare, tokens facturés dont ceux lus
+    depuis son cache de préfixes (`cached_tokens`).
+    """
+    return {"calls": 0, "cache_hits": 0, "prompt_tokens": 0,
+            "provider_prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
+
+
+def _record_usage(usage: Optional[Dict[str, int]], prompt: str, system_prompt: str, cached: bool) -> None:
+    if usage is None:
+        return
+    if cached:
+        usage["cache_hits"] += 1
+    else:
+        usage["calls"] += 1
+        usage["prompt_tokens"] += count_tokens(system_prompt) + count_tokens(prompt)
+
+
+def ask_llm(prompt: str, system_prompt: str = ANALYST_PROMPT, retries: int = settings.LLM_MAX_RETRIES,
+            cancel_token: Optional[CancellationToken] = None, use_cache: bool = True,
+            temperature: float = 0.3, usage: Optional[Dict[str, int]] = None, json_mode: bool = False,
+            cacheable: Optional[Callable[[str], bool]] = None,
+            on_token: Optional[Callable[[str], None]] = None) -> str:
+    """
+    Appel LLM robuste : retries avec backoff exponentiel + jitter (Retry-After respecté),
+    échec immédiat si le disjoncteur est ouvert (fournisseur indisponible).
+    Avec `cancel_token`, l'attente est interrompue dès que l'étape est annulée.
+    Les réponses sont mises en cache (llm_cache) sauf `use_cache=False` ; les erreurs jamais,
+    ni celles refusées par `cacheable` (ex. JSON invalide).
+    `usage` (cf. new_usage) cumule les tokens envoyés par la requête en cours.
+    `json_mode` demande au modèle un objet JSON (response_format).
+    `on_token` active le streaming : appelé pour chaque fragment (une fois, en entier, sur hit cache).
+    """
+    use_cache = use_cache and settings.LLM_CACHE_ENABLED
+    cache_key = llm_cache.make_key(client.model, system_prompt, prompt, temperature) if use_cache else None
+    if use_cache:
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            _record_usage(usage, prompt, system_prompt, cached=True)
+            if on_token:
+                on_token(cached)
+            return cached
+
+    _record_usage(usage, prompt, system_prompt, cached=False)
+
+    try:
+        if on_token:
+            content = client.stream_sync(_messages(prompt, system_prompt), on_token, temperature=temperature,
+                                         cancel_token=cancel_token, max_retries=retries, usage=usage)
+        else:
+            content = client.complete_sync(_messages(prompt, system_prompt), temperature=temperature,
+                                           cancel_token=cancel_token, max_retries=retries,
+                                           response_format={"type": "json_object"} if json_mode else None,
+                                           usage=usage)
+    except OperationCancelled as e:
+        logger.warning(f"Appel LLM abandonné : {e}")
+        return LLM_ERROR_MESSAGE
+    except LLMUnavailableError as e:
+        logger.error(str(e))
+        return LLM_ERROR_MESSAGE
+    if use_cache and content and (cacheable is None or cacheable(content)):
+        llm_cache.put(cache_key, client.model, content)
+    return content
+
 
 # --- STATISTIQUES DESCRIPTIVES ---
 def robust_stats(df: pd.DataFrame) -> Dict[str, Any]:
@@ -84,103 +152,245 @@ def robust_stats(df: pd.DataFrame) -> Dict[str, Any]:
     
     return stats
 
-def generate_insights(df: pd.DataFrame, stats: Dict[str, Any], question: str) -> str:
-    """Résumé compact + LLM pour éviter prompts trop longs."""
-    sample_values = df.head(5).to_dict(orient="records")
-    prompt_text = f"""
-Question: {question}
-Stats: {json.dumps(stats, indent=2)}
-Colonnes: {list(df.columns)}
-Exemple de valeurs (5 lignes): {json.dumps(sample_values, indent=2)}
-"""
-    return ask_llm(prompt_text, INSIGHT_PROMPT)
+def full_data_profile(dataset_id: Optional[str], columns: List[str]) -> Optional[DatasetProfile]:
+    """
+    Profil de toutes les lignes du fichier d'un dataset enregistré (une lecture par blocs),
+    mémorisé dans le registre. None sans dataset enregistré ou si la lecture échoue.
+    """
+    if not dataset_id or not settings.FULL_DATA_PROFILE:
+        return None
+    record = get_dataset(dataset_id)
+    if record is None:
+        return None
+    try:
+        return get_or_compute_artifact(dataset_id, "profile", lambda: profile_dataset(record["path"], columns=columns))
+    except Exception as e:
+        logger.warning(f"Profil complet indisponible pour {dataset_id} : {e}")
+        return None
+
+def generate_insights(df: pd.DataFrame, stats: Dict[str, Any], question: str,
+                      cancel_token: Optional[CancellationToken] = None,
+                      usage: Optional[Dict[str, int]] = None, history: Optional[str] = None) -> str:
+    """Résumé compact (budget de tokens, colonnes pertinentes d'abord) + LLM."""
+    prompt = build_prompt(INSIGHT_PROMPT, question, stats, df, history=history)
+    return ask_llm(prompt.text, cancel_token=cancel_token, usage=usage)
+
+def parse_structured_analysis(content: str) -> Optional[StructuredAnalysis]:
+    """Valide la réponse JSON du modèle (blocs ```json tolérés) ; None si invalide."""
+    if not content:
+        return None
+    start, end = content.find("{"), content.rfind("}")
+    if start == -1 or end <= start:
+        return None
+    try:
+        return StructuredAnalysis.model_validate_json(content[start:end + 1])
+    except ValidationError as e:
+        logger.warning(f"Réponse structurée invalide : {e.error_count()} erreur(s)")
+        return None
+
+
+def structured_analysis(df: pd.DataFrame, stats: Dict[str, Any], question: str,
+                        cancel_token: Optional[CancellationToken] = None,
+                        usage: Optional[Dict[str, int]] = None,
+                        history: Optional[str] = None) -> Optional[StructuredAnalysis]:
+    """
+    Synthèse, insights et recommandations en un seul appel LLM (sortie JSON validée).
+    Retourne None si la réponse est absente ou invalide : l'appelant repasse en mode texte.
+    """
+    prompt = build_prompt(STRUCTURED_PROMPT, question, stats, df, history=history)
+    content = ask_llm(prompt.text, cancel_token=cancel_token, usage=usage,
+                      json_mode=True, cacheable=lambda c: parse_structured_analysis(c) is not None)
+    return parse_structured_analysis(content)
+
+
+def format_structured_insights(result: StructuredAnalysis) -> str:
+    """Insights + recommandations au format texte attendu par le rapport."""
+    lines = ["Insights clés :"] + [f"{i}. {text}" for i, text in enumerate(result.insights, 1)]
+    lines += ["", "Recommandations :"] + [f"{i}. {text}" for i, text in enumerate(result.recommendations, 1)]
+    return "\n".join(lines)
+
 
 def needs_tools(question: str) -> Dict[str, bool]:
     """Détecte si question nécessite plots ou REPL."""
-    q = (question or "").lower()
-    repl_triggers = ["moyenne", "écart-type", "variance", "corrélation", "statistique", "résumé"]
-    plot_triggers = ["graphique", "plot", "visualisation", "nuage de points", "courbe", "diagramme", 
-                     "heatmap", "barres", "boxplot", "line chart", "scatter", "tendance", "série temporelle"]
-    return {"repl": any(w in q for w in repl_triggers), "plot": any(w in q for w in plot_triggers)}
+    plan = build_plan(question)
+    return {"repl": "repl" in plan, "plot": "plot" in plan}
 
 # --- AGENT IA INTELLIGENT ---
-def smart_agent(df: pd.DataFrame, question: str) -> Dict[str, Any]:
+def smart_agent(df: pd.DataFrame, question: str, dataset_id: Optional[str] = None,
+                token: Optional[CancellationToken] = None,
+                on_event: Optional[Callable[[str, Any], None]] = None,
+                history: Optional[str] = None,
+                reuse: Optional[Union[Dict[str, Any], SharedArtifacts]] = None) -> Dict[str, Any]:
+    """
+    Agent d'analyse. Seules les étapes utiles à la question sont exécutées (cf. analysis_planner),
+    en partageant leurs résultats intermédiaires. Avec `dataset_id`, les artefacts ne dépendant
+    que des données (stats, EDA) sont lus/stockés dans le registre et le cache EDA, et les stats
+    portent sur toutes les lignes du fichier (profil en une lecture par blocs, cf. profiler).
+    Chaque étape a son échéance ; `token` porte l'échéance globale et l'annulation (client
+    déconnecté). Les étapes hors délai sont listées dans `timeouts` et le résultat est partiel.
+    Avec `on_event(type, data)`, les résultats sont publiés dès qu'ils sont prêts (streaming) :
+    "stats", "token" (fragments de l'analyse LLM), "insights", "chart" (un par graphique).
+    Dans une conversation (cf. conversation.ConversationStore), `history` résume les tours
+    précédents pour le LLM et `reuse` fournit les "stats" / "charts" déjà calculés sur ce périmètre.
+    Un `SharedArtifacts` passé en `reuse` est complété au fil du calcul (analyse par lot).
+    """
     if df.empty:
         return {"error": "DataFrame vide, impossible d’analyser"}
 
     out = {"used": [], "messages": [], "eda_reports": {}, "repl": {}, "charts": [],
-           "llm": "", "insights": "", "stats": {}}
-
-    flags = needs_tools(question)
+           "llm": "", "insights": "", "stats": {}, "usage": new_usage()}
 
-    # Stats résumées
-    try:
-        out["stats"] = robust_stats(df)
-    except Exception as e:
-        out["messages"].append(f"Erreur stats: {e}")
+    plan = build_plan(question)
+    out["plan"] = list(plan.stages)
+    token = token or CancellationToken(settings.ANALYSIS_TIMEOUT)
+    shared = reuse if isinstance(reuse, SharedArtifacts) else SharedArtifacts(reuse)
 
-    # Multi-threading: EDA / REPL / Plots / LLM
-    def run_eda_task():
+    def emit(kind: str, data: Any) -> None:
+        if on_event is None:
+            return
         try:
-            eda = IntelligentEDAService(df)
-            return eda.full_analysis(engine="all")
+            on_event(kind, data)
         except Exception as e:
-            out["messages"].append(f"Erreur EDA: {e}")
-            return {}
+            logger.warning(f"Événement {kind} non publié : {e}")
 
-    def run_repl_task():
-        try:
+    def run_schema_task(results, token):
+        return {
+            "numeric": df.select_dtypes(include="number").columns.tolist(),
+            "datetime": df.select_dtypes(include="datetime").columns.tolist(),
+        }
+
+    def load_profile() -> Optional[DatasetProfile]:
+        if not dataset_id:
+            return None
+        return shared.get_or_compute("profile", lambda: full_data_profile(dataset_id, list(df.columns)))
+
+    def compute_stats():
+        # Dataset enregistré : stats sur toutes les lignes du fichier, pas seulement l'échantillon
+        profile = load_profile()
+        if profile is not None:
+            return profile.to_stats()
+        return get_or_compute_artifact(dataset_id, "stats", lambda: robust_stats(df))
+
+    def run_stats_task(results, token):
+        stats = shared.get_or_compute("stats", compute_stats)
+        emit("stats", stats)
+        return stats
+
+    def run_eda_task(results, token):
+        # Résultats mémorisés par empreinte (dataset_id si enregistré) dans le cache EDA.
+        # En mode structuré, l'interprétation est faite par l'unique appel de l'étape llm.
+        interpret = not settings.LLM_STRUCTURED_OUTPUT and on_event is None
+        return shared.get_or_compute(
+            f"eda_{plan.eda_engine}_{interpret}",
+            lambda: IntelligentEDAService(df, fingerprint=dataset_id, profile=load_profile()).full_analysis(
+                engine=plan.eda_engine, interpret=interpret, token=token
+            ),
+            cacheable=lambda _: not token.cancelled,
+        )
+
+    def run_repl_task(results, token):
+        def compute():
             res = tools_service.execute_python_repl("result = df.describe(include='all')", {"df": df})
             return res.get("locals", {}) if res.get("success") else {}
-        except Exception as e:
-            out["messages"].append(f"Erreur REPL: {e}")
-            return {}
+        return shared.get_or_compute("repl", compute)
 
-    def run_plot_task():
-        charts = []
-        try:
-            numeric_cols = df.select_dtypes(include="number").columns
-            datetime_cols = df.select_dtypes(include="datetime").columns
-            for col in numeric_cols:
-                fig = generate_distribution_plot(df, col)
-                if fig: charts.append(fig)
-            for dt_col in datetime_cols:
-                for num_col in numeric_cols:
-                    fig = generate_time_series_plot(df, dt_col, num_col)
-                    if fig: charts.append(fig)
-            corr_fig = generate_correlation_plot(df)
-            if corr_fig: charts.append(corr_fig)
-        except Exception as e:
-            out["messages"].append(f"Erreur graphiques: {e}")
+    def run_plot_task(results, token):
+        computed_here = []
+        charts = shared.get_or_compute("charts", lambda: computed_here.append(True) or compute_charts(results, token),
+                                       cacheable=lambda _: not token.cancelled)
+        if not computed_here:
+            # Graphiques calculés par une autre analyse : publiés d'un coup
+            for fig in charts:
+                emit("chart", fig)
         return charts
 
-    def run_llm_task():
-        try:
-            llm_result = ask_llm(f"Analyse complète: {question}\nStats: {json.dumps(out['stats'])}")
-            insights_result = generate_insights(df, out['stats'], question)
+    def compute_charts(results, token):
+        numeric_cols = results["schema"]["numeric"]
+        datetime_cols = results["schema"]["datetime"]
+        tasks = [(generate_distribution_plot, (col,)) for col in numeric_cols]
+        tasks += [(generate_time_series_plot, (dt_col, num_col)) for dt_col in datetime_cols for num_col in numeric_cols]
+        # Dataset enregistré : corrélations exactes sur toutes les lignes, issues du profil
+        profile = load_profile()
+        tasks.append((generate_correlation_plot, ("pearson", profile.correlation(numeric_cols) if profile else None)))
+
+        figs = []
+        if settings.EXECUTION_MODE == "process":
+            # Graphiques Plotly en parallèle réel : workers préchauffés, DataFrame partagé en Arrow IPC
+            pool = get_executor("eda")
+            with share_frame(df) as frame:
+                futures = [pool.submit(call_with_shared_frame, frame, fn, *args) for fn, args in tasks]
+                for fut in futures:
+                    if token.cancelled:
+                        fut.cancel()
+                        continue
+                    figs.append(fut.result(timeout=token.remaining()))
+                    if figs[-1]:
+                        emit("chart", figs[-1])
+        else:
+            for fn, args in tasks:
+                if token.cancelled:
+                    break
+                figs.append(fn(df, *args))
+                if figs[-1]:
+                    emit("chart", figs[-1])
+        # Graphiques partiels si l'étape est annulée
+        return [fig for fig in figs if fig]
+
+    def run_llm_task(results, token):
+        stats = results.get("stats", {})
+        if on_event is not None:
+            # Streaming : l'analyse textuelle est diffusée fragment par fragment (un JSON
+            # structuré ne serait pas lisible en cours de génération), puis les insights
+            prompt = build_prompt("Analyse complète.", question, stats, df, history=history)
+            llm_result = ask_llm(prompt.text, cancel_token=token, usage=out["usage"],
+                                 on_token=lambda text: emit("token", text))
+            insights_result = (generate_insights(df, stats, question, cancel_token=token, usage=out["usage"],
+                                                 history=history)
+                               if not token.cancelled else "")
+            emit("insights", insights_result)
             return llm_result, insights_result
-        except Exception as e:
-            out["messages"].append(f"Erreur LLM/Insights: {e}")
-            return "", ""
-
-    futures = {}
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        futures[executor.submit(run_eda_task)] = "eda"
-        if flags["repl"]: futures[executor.submit(run_repl_task)] = "repl"
-        if flags["plot"]: futures[executor.submit(run_plot_task)] = "plot"
-        futures[executor.submit(run_llm_task)] = "llm"
-
-        for fut in as_completed(futures):
-            key = futures[fut]
-            try:
-                result = fut.result()
-                if key == "eda": out["eda_reports"] = result
-                elif key == "repl": out["repl"] = result
-                elif key == "plot": out["charts"] = result
-                elif key == "llm": out["llm"], out["insights"] = result
-                out["used"].append(key)
-            except Exception as e:
-                out["messages"].append(f"Erreur {key}: {e}")
+
+        if settings.LLM_STRUCTURED_OUTPUT:
+            structured = structured_analysis(df, stats, question, cancel_token=token, usage=out["usage"],
+                                             history=history)
+            if structured is not None:
+                out["structured"] = structured.model_dump()
+                return structured.summary, format_structured_insights(structured)
+            if token.cancelled:
+                return LLM_ERROR_MESSAGE, ""
+            logger.warning("Sortie structurée inexploitable, repli sur analyse + insights séparés")
+
+        prompt = build_prompt("Analyse complète.", question, stats, df, history=history)
+        llm_result = ask_llm(prompt.text, cancel_token=token, usage=out["usage"])
+        insights_result = (generate_insights(df, stats, question, cancel_token=token, usage=out["usage"],
+                                             history=history)
+                           if not token.cancelled else "")
+        return llm_result, insights_result
+
+    runners = {"schema": run_schema_task, "stats": run_stats_task, "eda": run_eda_task,
+               "repl": run_repl_task, "plot": run_plot_task, "llm": run_llm_task}
+    stages = [Stage(name, runners[name], STAGE_DEPENDENCIES[name], STAGE_TIMEOUTS.get(name))
+              for name in plan.stages]
+    results, errors, timed_out = execute_plan(stages, token=token)
+    out["timeouts"] = timed_out
+    out["partial"] = bool(timed_out)
+
+    # Clés de sortie historiques
+    targets = {"stats": "stats", "eda": "eda_reports", "repl": "repl", "plot": "charts"}
+    for name in plan.stages:
+        if name in errors:
+            out["messages"].append(f"Erreur {name}: {errors[name]}")
+            continue
+        if name == "llm":
+            out["llm"], out["insights"] = results[name]
+        elif name in targets:
+            out[targets[name]] = results[name]
+        if name not in ("schema", "stats"):
+            out["used"].append(name)
+
+    usage = out["usage"]
+    logger.info(f"Tokens envoyés au LLM : {usage['prompt_tokens']} ({usage['calls']} appels, "
+                f"{usage['cache_hits']} depuis le cache), préfixe en cache fournisseur : {usage['cached_tokens']}")
 
     # Logging interaction sécurisé
     try:
@@ -190,5 +400,42 @@ def smart_agent(df: pd.DataFrame, question: str) -> Dict[str, Any]:
 
     return out
 
+def batch_agent(df: pd.DataFrame, questions: List[str], dataset_id: Optional[str] = None,
+                token: Optional[CancellationToken] = None) -> Dict[str, Any]:
+    """
+    Plusieurs questions sur un même dataset : stats, graphiques, REPL et EDA sont calculés une
+    fois et partagés (SharedArtifacts), les questions tournent en parallèle dans l'exécuteur
+    "batch" (BATCH_CONCURRENCY, tous lots confondus) ; les appels LLM restent bornés par le client.
+    Chaque question garde son échéance (ANALYSIS_TIMEOUT) sous celle du lot (`token`).
+    """
+    if df.empty:
+        return {"error": "DataFrame vide, impossible d’analyser"}
+    token = token or CancellationToken(settings.BATCH_TIMEOUT)
+    shared = SharedArtifacts()
+    pool = get_executor("batch")
+
+    def run_question(question: str) -> Dict[str, Any]:
+        # Échéance de la question à partir de son démarrage (pas de son attente dans la file)
+        return smart_agent(df, question, dataset_id, token.child(settings.ANALYSIS_TIMEOUT), None, None, shared)
+
+    futures = [pool.submit(run_question, question) for question in questions]
+
+    results, usage = [], new_usage()
+    for question, fut in zip(questions, futures):
+        try:
+            res = fut.result()
+        except Exception as e:
+            logger.error(f"Erreur question du lot « {question} » : {e}")
+            res = {"error": str(e)}
+        for key, value in (res.get("usage") or {}).items():
+            usage[key] = usage.get(key, 0) + value
+        results.append({"question": question, **res})
+
+    logger.info(f"Lot de {len(questions)} questions : artefacts partagés {shared.stats()}, "
+                f"tokens envoyés au LLM {usage['prompt_tokens']}")
+    # Artefacts partagés : une seule copie dans la réponse du lot
+    return {"results": results, "stats": shared.get("stats", {}), "charts": shared.get("charts", []),
+            "usage": usage, "shared": shared.stats()}
+
 def analyze_question(df: pd.DataFrame, question: str) -> Dict[str, Any]:
     return smart_agent(df, question)
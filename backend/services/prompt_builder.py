@@ -0,0 +1,212 @@
+# backend/services/prompt_builder.py
+import re
+import math
+import logging
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Décompte exact si tiktoken est installé, sinon estimation (~4 caractères par token)
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+except Exception:  # dépendance optionnelle absente ou encodage indisponible hors ligne
+    _ENCODING = None
+
+CHARS_PER_TOKEN = 4
+SAMPLE_ROWS = 5
+TOP_CATEGORIES = 5
+
+
+def count_tokens(text: str) -> int:
+    """Nombre de tokens de `text` (exact avec tiktoken, estimé sinon)."""
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+@dataclass
+class DatasetDigest:
+    """Contexte dataset compact ajusté au budget, et ce qui a dû être écarté."""
+    text: str
+    tokens: int
+    columns: List[str] = field(default_factory=list)
+    dropped_columns: List[str] = field(default_factory=list)
+
+
+def _normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", str(text).lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def _words(text: str) -> set:
+    return {w for w in re.split(r"[^a-z0-9]+", _normalize(text)) if len(w) > 2}
+
+
+def fmt_number(value: Any, digits: int = settings.PROMPT_SIGNIFICANT_DIGITS) -> str:
+    """Nombre arrondi à `digits` chiffres significatifs (sans notation scientifique pour les entiers courants)."""
+    try:
+        x = float(value)
+    except (TypeError, ValueError):
+        return str(value)
+    if math.isnan(x):
+        return "NA"
+    if x.is_integer() and abs(x) < 1e12:
+        return str(int(x))
+    return f"{x:.{digits}g}"
+
+
+def rank_columns(columns: List[str], question: str, stats: Dict[str, Any]) -> List[str]:
+    """
+    Colonnes triées par pertinence pour la question : nom cité en entier, puis mots
+    communs avec la question ; à égalité, colonnes numériques d'abord, ordre d'origine ensuite.
+    """
+    q_norm = _normalize(question)
+    q_words = _words(question)
+    numeric = set((stats.get("numeric") or {}).keys())
+
+    def score(item):
+        idx, col = item
+        name = _normalize(col)
+        mentioned = 2 if name and name in q_norm else 0
+        overlap = len(_words(col) & q_words)
+        return (-mentioned, -overlap, col not in numeric, idx)
+
+    return [col for _, col in sorted(enumerate(columns), key=score)]
+
+
+def describe_column(col: str, stats: Dict[str, Any]) -> str:
+    """Une ligne compacte par colonne (stats arrondies, top catégories)."""
+    dtype = (stats.get("dtypes") or {}).get(col, "?")
+    if col in (stats.get("numeric") or {}):
+        d = stats["numeric"][col]
+        keys = [("count", "n"), ("mean", "moy"), ("std", "σ"), ("min", "min"),
+                ("25%", "q1"), ("50%", "méd"), ("75%", "q3"), ("max", "max")]
+        parts = [f"{label}={fmt_number(d[k])}" for k, label in keys if k in d]
+        return f"- {col} ({dtype}): " + " ".join(parts)
+    if col in (stats.get("datetime") or {}):
+        d = stats["datetime"][col]
+        return f"- {col} ({dtype}): {d.get('min')} → {d.get('max')}, {d.get('nunique')} valeurs distinctes"
+    if col in (stats.get("categorical") or {}):
+        counts = list(stats["categorical"][col].items())
+        top = ", ".join(f"{k}:{fmt_number(v)}" for k, v in counts[:TOP_CATEGORIES])
+        more = f" (+{len(counts) - TOP_CATEGORIES} autres)" if len(counts) > TOP_CATEGORIES else ""
+        return f"- {col} ({dtype}): {top}{more}"
+    return f"- {col} ({dtype})"
+
+
+def _sample_block(df: pd.DataFrame, columns: List[str]) -> str:
+    sample = df[columns].head(SAMPLE_ROWS)
+    lines = [",".join(map(str, columns))]
+    for row in sample.itertuples(index=False):
+        lines.append(",".join(fmt_number(v) if isinstance(v, float) else str(v) for v in row))
+    return "Exemple de lignes (CSV):\n" + "\n".join(lines)
+
+
+def build_dataset_digest(stats: Dict[str, Any], question: str, df: Optional[pd.DataFrame] = None,
+                         budget: Optional[int] = None) -> DatasetDigest:
+    """
+    Résumé du dataset tenant dans `budget` tokens : colonnes les plus pertinentes pour
+    la question d'abord, nombres arrondis, pas d'indentation ; un échantillon de lignes
+    est ajouté s'il reste de la place. Les colonnes écartées sont seulement nommées.
+    """
+    budget = budget or settings.PROMPT_TOKEN_BUDGET
+    columns = list(stats.get("columns") or (list(df.columns) if df is not None else []))
+    header = f"Dataset: {stats.get('rows', len(df) if df is not None else '?')} lignes, {len(columns)} colonnes"
+    lines = [header]
+    used = count_tokens(header)
+    included, dropped = [], []
+
+    for col in rank_columns(columns, question, stats):
+        line = describe_column(col, stats)
+        cost = count_tokens(line) + 1
+        if not dropped and used + cost <= budget:
+            lines.append(line)
+            used += cost
+            included.append(col)
+        else:
+            dropped.append(col)
+
+    if dropped:
+        # Noms des colonnes écartées, tronqués pour rester dans le budget
+        names = []
+        for col in dropped:
+            if used + count_tokens(", ".join(names + [col])) + 8 > budget:
+                break
+            names.append(col)
+        rest = len(dropped) - len(names)
+        lines.append(f"Autres colonnes: {', '.join(names)}" + (f" (+{rest})" if rest else ""))
+
+    if df is not None and included:
+        sample = _sample_block(df, included[:10])
+        if used + count_tokens(sample) + 1 <= budget:
+            lines.append(sample)
+
+    text = "\n".join(lines)
+    return DatasetDigest(text=text, tokens=count_tokens(text), columns=included, dropped_columns=dropped)
+
+
+def build_dataset_context(stats: Dict[str, Any], df: Optional[pd.DataFrame] = None,
+                          budget: Optional[int] = None) -> DatasetDigest:
+    """
+    Bloc de contexte canonique du dataset : indépendant de la question (ordre des colonnes
+    fixe, budget fixe), donc identique octet pour octet d'une question à l'autre. Placé en
+    tête de prompt, il forme un préfixe réutilisable par le cache de prompts du fournisseur.
+    """
+    return build_dataset_digest(stats, "", df, budget)
+
+
+def relevant_columns(columns: List[str], question: str, limit: int = 5) -> List[str]:
+    """Colonnes citées dans la question (nom complet ou mots communs), par pertinence."""
+    q_norm, q_words = _normalize(question), _words(question)
+    scored = []
+    for idx, col in enumerate(columns):
+        name = _normalize(col)
+        score = (2 if name and name in q_norm else 0) + len(_words(col) & q_words)
+        if score:
+            scored.append((-score, idx, col))
+    return [col for _, _, col in sorted(scored)[:limit]]
+
+
+@dataclass
+class BuiltPrompt:
+    """
+    Prompt en deux parties : `context` (préfixe stable par dataset) puis `task`
+    (consigne, question, colonnes visées). `tokens` = taille totale envoyée.
+    """
+    context: str
+    task: str
+    tokens: int
+    columns: List[str] = field(default_factory=list)
+    dropped_columns: List[str] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        return f"{self.context}\n\n{self.task}" if self.context else self.task
+
+
+def build_prompt(instruction: str, question: str, stats: Dict[str, Any],
+                 df: Optional[pd.DataFrame] = None, budget: Optional[int] = None,
+                 history: Optional[str] = None) -> BuiltPrompt:
+    """
+    Contexte dataset canonique (budget fixe) puis partie propre à la question : consigne,
+    résumé des échanges précédents (`history`), question et, pour les colonnes visées
+    absentes du contexte, leur ligne de statistiques.
+    """
+    context = build_dataset_context(stats, df, budget)
+    focus = relevant_columns(list(stats.get("columns") or context.columns), question)
+    lines = [instruction.strip()] + ([history.strip()] if history else []) + [f"Question: {question}"]
+    if focus:
+        lines.append(f"Colonnes visées: {', '.join(focus)}")
+        lines += [describe_column(col, stats) for col in focus if col in context.dropped_columns]
+    task = "\n".join(lines)
+    return BuiltPrompt(context=context.text, task=task, tokens=context.tokens + count_tokens(task),
+                       columns=context.columns, dropped_columns=context.dropped_columns)
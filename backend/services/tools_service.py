@@ -3,9 +3,9 @@ import traceback
 import logging
 import pandas as pd
 from typing import Any, Dict, Optional, List
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from backend.utils import chart_generator
+from backend.utils.figure_summary import format_figure_summary, summarize_figure
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +32,7 @@ def execute_python_repl(code: str, local_vars: Optional[Dict[str, Any]] = None)
 
 
 # -----------------------------
-# Interpréteur "intelligent" optimisé avec parallélisation
+# Interpréteur "intelligent"
 # -----------------------------
 def _generate_plot(task: str, data: pd.DataFrame) -> Optional[Dict[str, Any]]:
     numeric_cols = data.select_dtypes(include="number").columns.tolist()
@@ -73,13 +73,11 @@ def execute_open_interpreter(task: str, data: pd.DataFrame) -> Dict[str, Any]:
             result["output"] = data[numeric_cols].mean().round(2).to_dict() if numeric_cols else "Pas de colonnes numériques."
         elif "médiane" in task_lower or "median" in task_lower:
             result["output"] = data[numeric_cols].median().round(2).to_dict() if numeric_cols else "Pas de colonnes numériques."
-        # Sinon, génération graphique en parallèle
+        # Sinon, génération graphique (appel direct : l'appelant tourne déjà dans un exécuteur)
         else:
-            with ThreadPoolExecutor() as executor:
-                future = executor.submit(_generate_plot, task, data)
-                result["chart"] = future.result()
-                if result["chart"] is None:
-                    result["output"] = f"Tâche '{task}' non reconnue ou pas applicable aux colonnes disponibles."
+            result["chart"] = _generate_plot(task, data)
+            if result["chart"] is None:
+                result["output"] = f"Tâche '{task}' non reconnue ou pas applicable aux colonnes disponibles."
 
         logger.info(f"Tâche '{task}' exécutée avec succès.")
     except Exception as e:
@@ -93,11 +91,18 @@ def execute_open_interpreter(task: str, data: pd.DataFrame) -> Dict[str, Any]:
 # Interprétation graphique via LLM
 # -----------------------------
 def interpret_chart(fig_json: str, df: pd.DataFrame, question: str, llm_asker) -> str:
+    # Résumé sémantique (axes, classes, tendance, extrema) au lieu des coordonnées brutes :
+    # taille du prompt bornée quel que soit le nombre de points
+    try:
+        chart_summary = format_figure_summary(summarize_figure(fig_json))
+    except Exception as e:
+        logger.warning(f"Résumé du graphique impossible : {e}")
+        chart_summary = "Graphique non résumable."
     prompt_text = f"""
 Tu es un expert en analyse de données.
-Explique ce graphique Plotly et identifie les tendances ou insights principaux.
+Explique ce graphique et identifie les tendances ou insights principaux.
 Question utilisateur : {question}
-Graphique JSON : {fig_json}
+{chart_summary}
 Données disponibles : colonnes = {list(df.columns)}, lignes = {len(df)}
 """
     try:
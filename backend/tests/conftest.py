@@ -0,0 +1,25 @@
+# backend/tests/conftest.py
+import os
+import shutil
+import tempfile
+
+# Tests hors réseau : backend LLM simulé, instantané, sans cache persistant.
+# Positionné avant tout import de `backend` (les settings sont lus à l'import).
+os.environ["LLM_BACKEND"] = "stub"
+os.environ.setdefault("LLM_STUB_LATENCY", "0")
+os.environ.setdefault("LLM_STUB_TOKENS_PER_SECOND", "0")
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+
+# Bases SQLite, fichiers nettoyés et artefacts dans un dossier temporaire, pas dans data/
+TEST_DATA_DIR = tempfile.mkdtemp(prefix="eda_tests_")
+os.environ["DATA_DIR"] = TEST_DATA_DIR
+os.environ["CLEAN_DIR"] = os.path.join(TEST_DATA_DIR, "cleaned")
+os.environ["CHAT_DB"] = os.path.join(TEST_DATA_DIR, "chat_history.db")
+os.environ["LLM_CACHE_DB"] = os.path.join(TEST_DATA_DIR, "llm_cache.db")
+os.environ["DATASET_DB"] = os.path.join(TEST_DATA_DIR, "datasets.db")
+os.environ["EDA_CACHE_DIR"] = os.path.join(TEST_DATA_DIR, "eda_cache")
+os.environ["ARTIFACT_DIR"] = os.path.join(TEST_DATA_DIR, "artifacts")
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(TEST_DATA_DIR, ignore_errors=True)
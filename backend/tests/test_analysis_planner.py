@@ -0,0 +1,70 @@
+# backend/tests/test_analysis_planner.py
+import time
+
+from backend.services.analysis_planner import Stage, build_plan, execute_plan
+
+
+def test_plan_skips_heavy_eda_by_default():
+    plan = build_plan("Quelle est la ville la plus représentée ?")
+    assert plan.stages == ["schema", "stats", "llm"]
+
+
+def test_plan_adds_requested_stages():
+    plan = build_plan("Calcule la moyenne et génère un graphique de distribution.")
+    assert "repl" in plan and "plot" in plan and "eda" not in plan
+
+    plan = build_plan("Génère un rapport sweetviz du dataset")
+    assert "eda" in plan and plan.eda_engine == "sweetviz"
+
+
+def test_execute_plan_respects_dependencies_and_shares_results():
+    order = []
+
+    def stats(results, token):
+        time.sleep(0.05)
+        order.append("stats")
+        return {"rows": 3}
+
+    def llm(results, token):
+        order.append("llm")
+        return f"rows={results['stats']['rows']}"
+
+    results, errors, _ = execute_plan([Stage("llm", llm, ("stats",)), Stage("stats", stats)])
+    assert order == ["stats", "llm"]
+    assert results["llm"] == "rows=3" and not errors
+
+
+def test_failed_stage_does_not_block_others():
+    def boom(results, token):
+        raise RuntimeError("boom")
+
+    results, errors, _ = execute_plan([Stage("plot", boom), Stage("llm", lambda r, t: "ok", ("plot",))])
+    assert errors == {"plot": "boom"}
+    assert results["llm"] == "ok"
+
+
+def test_stage_missing_deadline_yields_partial_results():
+    def slow(results, token):
+        while not token.cancelled:
+            time.sleep(0.01)
+        return "trop tard"
+
+    start = time.monotonic()
+    results, errors, timed_out = execute_plan([
+        Stage("eda", slow, timeout=0.2),
+        Stage("stats", lambda r, t: {"rows": 3}),
+        Stage("llm", lambda r, t: "ok", ("stats",)),
+    ])
+    assert time.monotonic() - start < 1.5
+    assert timed_out == ["eda"] and "eda" not in results
+    assert results["llm"] == "ok"
+
+
+def test_cancelled_token_stops_plan():
+    from backend.utils.cancellation import CancellationToken
+
+    token = CancellationToken()
+    token.cancel("client déconnecté")
+    results, errors, timed_out = execute_plan([Stage("llm", lambda r, t: "ok")], token=token)
+    assert results == {} and errors == {"llm": "client déconnecté"}
+    assert timed_out == ["llm"]
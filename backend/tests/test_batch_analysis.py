@@ -0,0 +1,71 @@
+# backend/tests/test_batch_analysis.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from backend.services import llm_service
+from backend.services.analysis_planner import SharedArtifacts
+from backend.services.llm_service import batch_agent
+
+
+def _df():
+    return pd.DataFrame({
+        "age": [25, 30, 22, 40, 35],
+        "salaire": [30000, 50000, 28000, 70000, 45000],
+        "ville": ["Paris", "Lyon", "Paris", "Marseille", "Lyon"],
+    })
+
+
+def test_shared_artifact_is_computed_once_under_concurrency():
+    shared, calls = SharedArtifacts(), []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return 42
+
+    threads = [threading.Thread(target=shared.get_or_compute, args=("stats", compute)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert shared.stats() == {"computed": 1, "hits": 7}
+    # Résultat refusé : recalculé à la demande suivante
+    shared.get_or_compute("charts", lambda: [], cacheable=lambda value: bool(value))
+    assert "charts" not in shared
+
+
+def test_batch_shares_stats_and_charts_between_questions():
+    questions = ["Quel est le salaire moyen ?", "Graphique de distribution des âges",
+                 "Visualisation des salaires par ville"]
+    out = batch_agent(_df(), questions)
+    assert [r["question"] for r in out["results"]] == questions
+    assert all("error" not in r and r["llm"] for r in out["results"])
+    assert out["stats"]["rows"] == 5
+    assert out["charts"]
+    # stats : 1 calcul pour 3 questions ; graphiques : 1 calcul pour 2 questions
+    assert out["shared"] == {"computed": 2, "hits": 3}
+    assert out["usage"]["calls"] >= len(questions)
+
+
+def test_question_deadline_starts_when_the_question_runs(monkeypatch):
+    # Une question à la fois, chacune plus longue que la moitié de l'échéance : les dernières
+    # attendent dans la file plus longtemps que ANALYSIS_TIMEOUT
+    monkeypatch.setattr(llm_service.settings, "ANALYSIS_TIMEOUT", 0.3)
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(llm_service, "get_executor", lambda stage: pool)
+
+    def slow_agent(df, question, dataset_id, token, *args):
+        expired_at_start = token.expired
+        time.sleep(0.2)
+        return {"llm": question, "expired_at_start": expired_at_start}
+
+    monkeypatch.setattr(llm_service, "smart_agent", slow_agent)
+    try:
+        out = batch_agent(_df(), [f"Question {i}" for i in range(5)])
+    finally:
+        pool.shutdown()
+    assert [r["expired_at_start"] for r in out["results"]] == [False] * 5
@@ -0,0 +1,94 @@
+# backend/tests/test_conversation.py
+import uuid
+
+import pandas as pd
+
+from backend.services.conversation import ConversationStore, detect_filters, is_follow_up, is_scope_restriction
+from backend.services.llm_service import smart_agent
+
+
+def _df():
+    return pd.DataFrame({
+        "ville": ["Paris", "Lyon", "Paris", "Marseille", "Lyon", "Lyon"],
+        "salaire": [30000, 50000, 28000, 70000, 45000, 52000],
+    })
+
+
+def _store():
+    return ConversationStore(max_sessions=10, ttl=60, history_turns=3, max_artifacts=4)
+
+
+def test_filters_and_follow_up_detection():
+    df = _df()
+    assert detect_filters("Et pour Lyon seulement ?", df) == {"ville": ["Lyon"]}
+    assert detect_filters("Salaire moyen par ville", df) == {}
+    assert is_follow_up("Et pour Lyon seulement ?")
+    assert is_follow_up("Lyon aussi ?", names_values=True)
+    assert not is_follow_up("Lyon ?", names_values=True)
+    assert not is_follow_up("average price in Paris?", names_values=True)
+    assert not is_follow_up("Quelle est la distribution des salaires ?")
+    assert is_scope_restriction("Salaire moyen à Paris uniquement")
+    assert not is_scope_restriction("Comparer les salaires de Paris et Lyon")
+
+
+def test_follow_up_refines_previous_question_and_reuses_artifacts():
+    store, df, session = _store(), _df(), uuid.uuid4().hex
+    first = store.prepare(session, "ds", df, "Quel est le salaire moyen ?")
+    results = smart_agent(first.df, first.question, history=first.history, reuse=first.reuse)
+    store.record(session, "ds", first, "Quel est le salaire moyen ?", results)
+
+    follow = store.prepare(session, "ds", df, "Et pour Lyon seulement ?")
+    assert follow.follow_up
+    assert follow.filters == {"ville": ["Lyon"]}
+    assert len(follow.df) == 3
+    assert follow.question.startswith("Quel est le salaire moyen ?")
+    assert "Q: Quel est le salaire moyen ?" in follow.history
+    results = smart_agent(follow.df, follow.question, history=follow.history, reuse=follow.reuse)
+    assert results["stats"]["rows"] == 3
+    store.record(session, "ds", follow, "Et pour Lyon seulement ?", results)
+
+    # Même périmètre : stats déjà calculées réutilisées
+    again = store.prepare(session, "ds", df, "Et uniquement pour Lyon, les écarts ?")
+    assert again.reuse["stats"]["rows"] == 3
+    assert store.stats()["artifact_hits"] == 1
+
+
+def test_history_is_reloaded_from_chat_log():
+    store, df, session = _store(), _df(), uuid.uuid4().hex
+    turn = store.prepare(session, "ds", df, "Salaire moyen à Paris uniquement ?")
+    store.record(session, "ds", turn, "Salaire moyen à Paris uniquement ?", {"llm": "Environ 29000.", "stats": {}})
+
+    restarted = _store()
+    assert restarted.history(session)[0]["filters"] == {"ville": ["Paris"]}
+    follow = restarted.prepare(session, "ds", df, "Et pour Lyon ?")
+    assert follow.follow_up and follow.filters == {"ville": ["Lyon"]}
+    assert "Environ 29000." in follow.history
+
+
+def test_first_question_citing_values_keeps_all_rows():
+    store, df, session = _store(), _df(), uuid.uuid4().hex
+    turn = store.prepare(session, "ds", df, "Comparer les salaires de Paris et Lyon")
+    assert turn.filters == {} and len(turn.df) == len(df)
+    store.record(session, "ds", turn, "Comparer les salaires de Paris et Lyon", {"llm": "...", "stats": {"rows": 6}})
+    # Périmètre complet : pas de copie du DataFrame mémorisée dans la session
+    assert all("frame" not in entry and "positions" not in entry
+               for entry in store._session(session).artifacts.values())
+
+    follow = store.prepare(session, "ds", df, "Et pour Marseille ?")
+    assert follow.follow_up and follow.filters == {"ville": ["Marseille"]}
+    assert follow.df["salaire"].tolist() == [70000]
+
+
+def test_short_standalone_question_is_not_narrowed_to_previous_scope():
+    store, df, session = _store(), _df(), uuid.uuid4().hex
+    first = store.prepare(session, "ds", df, "Salaire moyen à Lyon uniquement ?")
+    assert first.filters == {"ville": ["Lyon"]}
+    store.record(session, "ds", first, "Salaire moyen à Lyon uniquement ?", {"llm": "Environ 49000.", "stats": {}})
+
+    standalone = store.prepare(session, "ds", df, "Salaire max à Paris ?")
+    assert not standalone.follow_up
+    assert standalone.filters == {} and len(standalone.df) == len(df)
+    assert standalone.question == "Salaire max à Paris ?"
+
+    again = store.prepare(session, "ds", df, "Marseille aussi ?")
+    assert again.follow_up and again.filters == {"ville": ["Marseille"]}
@@ -0,0 +1,57 @@
+# backend/tests/test_correlation.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.utils.correlation import CorrelationEngine, correlate_dataset, correlation_matrix
+from backend.utils.profiler import profile_dataset
+
+
+def _df(n=30000, seed=0):
+    rng = np.random.default_rng(seed)
+    base = rng.normal(1e6, 1.0, n)  # grande moyenne : teste la stabilité numérique
+    df = pd.DataFrame({"a": base, "b": 2 * base + rng.normal(0, 1, n), "c": rng.lognormal(0, 1, n)})
+    df["d"] = df["c"] ** 2 + rng.normal(0, 0.1, n)
+    df.loc[::7, "b"] = np.nan
+    df.loc[::11, "c"] = np.nan
+    return df
+
+
+def test_partial_engines_merge_to_exact_pearson():
+    df = _df()
+    engines = []
+    for block in np.array_split(df, 4):  # un moteur par "worker"
+        engine = CorrelationEngine(list(df.columns))
+        engine.update(block)
+        engines.append(engine)
+    merged = engines[0]
+    for engine in engines[1:]:
+        merged.merge(engine)
+    np.testing.assert_allclose(merged.matrix().to_numpy(), df.corr().to_numpy(), atol=1e-9)
+    assert merged.strong_relations(0.8)[("a", "b")] == pytest.approx(df["a"].corr(df["b"]))
+
+
+def test_incremental_update_matches_full_recompute():
+    df = _df()
+    engine = CorrelationEngine(list(df.columns))
+    engine.update(df.iloc[:20000])
+    engine.update(df.iloc[20000:])  # lignes ajoutées
+    np.testing.assert_allclose(engine.matrix().to_numpy(), correlation_matrix(df).to_numpy(), atol=1e-9)
+
+
+def test_spearman_rank_approximation(tmp_path):
+    pytest.importorskip("pyarrow")
+    df = _df()
+    path = tmp_path / "clean.parquet"
+    df.to_parquet(path, index=False)
+    expected = df.corr(method="spearman").to_numpy()
+    assert np.abs(correlation_matrix(df, "spearman").to_numpy() - expected).max() < 1e-3
+    engine = correlate_dataset(path, list(df.columns), "spearman", batch_rows=4000)
+    assert np.abs(engine.matrix().to_numpy() - expected).max() < 1e-3
+
+    # Rangs lus dans les distributions du profil : une seule lecture supplémentaire
+    profile = profile_dataset(path, batch_rows=4000)
+    digests = {c: profile.columns[c].digest for c in df.columns}
+    engine = correlate_dataset(path, list(df.columns), "spearman", batch_rows=4000, digests=digests)
+    assert np.abs(engine.matrix().to_numpy() - expected).max() < 1e-3
+    np.testing.assert_allclose(profile.correlation().to_numpy(), df.corr().to_numpy(), atol=1e-9)
@@ -0,0 +1,105 @@
+# backend/tests/test_dataset_registry.py
+import asyncio
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+
+from backend.api import datasets
+from backend.config import settings
+from backend.models.schemas import DatasetRegisterRequest
+from backend.services import dataset_registry
+from backend.services.eda_cache import EDAResultCache
+from backend.utils import dataset_store
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset_registry, "DB_PATH", str(tmp_path / "datasets.db"))
+    monkeypatch.setattr(dataset_registry, "ARTIFACT_DIR", tmp_path / "artifacts")
+    monkeypatch.setattr(dataset_registry, "eda_cache", EDAResultCache(str(tmp_path / "eda_cache")))
+    dataset_registry.init_db()
+    return dataset_registry
+
+
+@pytest.fixture
+def clean_file(tmp_path):
+    path = tmp_path / "ventes_clean.csv"
+    pd.DataFrame({"ville": ["Paris", "Lyon"], "montant": [10.5, 20.0]}).to_csv(path, index=False)
+    return path
+
+
+def test_register_is_idempotent_and_keeps_metadata(registry, clean_file):
+    first = registry.register_dataset(str(clean_file))
+    second = registry.register_dataset(str(clean_file))
+    assert first["dataset_id"] == second["dataset_id"]
+    assert first["row_count"] == 2
+    assert first["schema"] == {"ville": "object", "montant": "float64"}
+    assert first["fingerprint"].startswith(first["dataset_id"])
+    assert len(registry.list_datasets()) == 1
+
+
+def test_artifacts_are_computed_once(registry, clean_file):
+    dataset_id = registry.register_dataset(str(clean_file))["dataset_id"]
+    calls = []
+    compute = lambda: calls.append(1) or {"rows": 2}
+    assert registry.get_or_compute_artifact(dataset_id, "stats", compute) == {"rows": 2}
+    assert registry.get_or_compute_artifact(dataset_id, "stats", compute) == {"rows": 2}
+    assert len(calls) == 1
+    assert registry.get_dataset(dataset_id)["artifacts"] == ["stats"]
+
+
+def test_delete_removes_entry_and_artifacts(registry, clean_file):
+    dataset_id = registry.register_dataset(str(clean_file))["dataset_id"]
+    registry.save_artifact(dataset_id, "stats", {"rows": 2})
+    assert registry.delete_dataset(dataset_id)
+    assert registry.get_dataset(dataset_id) is None
+    assert registry.load_artifact(dataset_id, "stats") is None
+    assert not registry.delete_dataset(dataset_id)
+
+
+def test_delete_purges_eda_outputs_listed_on_get(registry, clean_file):
+    dataset_id = registry.register_dataset(str(clean_file))["dataset_id"]
+    cache = registry.eda_cache
+    entry = cache.entry(dataset_id, sample_rows=5000, max_plot_rows=10000)
+    cache.get_or_compute_json(entry, "summary", lambda: {"shape": [2, 2]})
+    other = cache.entry("autre", sample_rows=5000, max_plot_rows=10000)
+
+    listed = registry.get_dataset(dataset_id)["eda_cache"]
+    assert [e["entry"] for e in listed] == [entry.name]
+    assert listed[0]["results"] == ["summary.json"]
+    assert listed[0]["params"]["sample_rows"] == 5000
+
+    assert registry.delete_dataset(dataset_id)
+    assert not entry.exists() and other.exists()
+
+
+def test_delete_rejects_ids_outside_the_registry_format(registry, clean_file, tmp_path):
+    registry.register_dataset(str(clean_file))
+    for bad in ("..", "../artifacts", "%2e%2e", "ABCDEF0123456789", ""):
+        with pytest.raises(ValueError):
+            registry.delete_dataset(bad)
+    with pytest.raises(HTTPException) as exc:
+        datasets.delete_dataset_endpoint("..")
+    assert exc.value.status_code == 400
+    # Rien n'est supprimé hors du dossier de l'identifiant
+    assert clean_file.exists() and (tmp_path / "datasets.db").exists()
+    assert len(registry.list_datasets()) == 1
+    # Identifiant bien formé mais inconnu : aucun artefact supprimé
+    registry.save_artifact("f" * 16, "stats", {"rows": 2})
+    assert not registry.delete_dataset("f" * 16)
+    assert registry.load_artifact("f" * 16, "stats") == {"rows": 2}
+
+
+def test_register_endpoint_reads_csv_once_in_analyze_pool(registry, monkeypatch):
+    path = Path(settings.CLEAN_DIR) / "registre_clean.csv"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame({"ville": ["Paris", "Lyon", "Nice"], "montant": [1.0, 2.0, 3.0]}).to_csv(path, index=False)
+    reads = []
+    read_dataset = dataset_store.read_dataset
+    monkeypatch.setattr(dataset_store, "read_dataset", lambda *a, **k: reads.append(a) or read_dataset(*a, **k))
+
+    record = asyncio.run(datasets.register_dataset_endpoint(DatasetRegisterRequest(clean_file_path=str(path))))
+    assert record["row_count"] == 3 and record["schema"] == {"ville": "object", "montant": "float64"}
+    assert len(reads) == 1
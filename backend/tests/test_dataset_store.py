@@ -0,0 +1,39 @@
+# backend/tests/test_dataset_store.py
+import pandas as pd
+import pytest
+
+from backend.utils import dataset_store
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def typed_df():
+    return pd.DataFrame({
+        "ville": pd.Categorical(["Paris", "Lyon", "Paris"]),
+        "date": pd.to_datetime(["2024-01-01", "2024-02-01", "2024-03-01"]),
+        "montant": [1.5, 2.0, 3.25],
+    })
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".arrow"])
+def test_columnar_roundtrip_keeps_dtypes(tmp_path, typed_df, suffix):
+    path = dataset_store.write_dataset(typed_df, tmp_path / f"clean{suffix}")
+    assert path.suffix == suffix
+    df = dataset_store.read_dataset(path)
+    assert isinstance(df["ville"].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(df["date"])
+    pd.testing.assert_frame_equal(df, typed_df)
+
+
+def test_column_projection(tmp_path, typed_df):
+    path = dataset_store.write_dataset(typed_df, tmp_path / "clean.parquet")
+    assert dataset_store.read_columns(path) == ["ville", "date", "montant"]
+    assert list(dataset_store.read_dataset(path, columns=["montant"]).columns) == ["montant"]
+
+
+def test_mixed_object_column_falls_back_to_csv(tmp_path):
+    df = pd.DataFrame({"mix": [1, "a", 2.5]})
+    path = dataset_store.write_dataset(df, tmp_path / "clean.parquet")
+    assert path.suffix == ".csv"
+    assert not (tmp_path / "clean.parquet").exists()
@@ -0,0 +1,48 @@
+# backend/tests/test_datetime_parser.py
+import warnings
+
+import pandas as pd
+
+from backend.utils.chart_generator import generate_time_series_plot
+from backend.utils.datetime_parser import DatetimeParser, infer_datetime_format
+
+
+def test_format_is_inferred_from_sample():
+    assert infer_datetime_format(pd.Series(["05/01/2024", "25/12/2023"])) == ("%d/%m/%Y", 1.0)
+    assert infer_datetime_format(pd.Series(["2024-01-05 10:00:00", None])) == ("%Y-%m-%d %H:%M:%S", 1.0)
+    log_format = infer_datetime_format(pd.Series(["10/Oct/2023:13:55:36 +0200"]))
+    assert log_format == ("%d/%b/%Y:%H:%M:%S %z", 1.0)
+    assert infer_datetime_format(pd.Series(["Paris", "Lyon"])) == (None, 0.0)
+    assert infer_datetime_format(pd.Series([20240105, 20240106])) == (None, 0.0)
+
+
+def test_parse_reports_ratio_and_is_memoized():
+    parser = DatetimeParser()
+    values = pd.Series(["01/02/2024", "15/02/2024", "pas une date", None], index=[10, 11, 12, 13])
+    parsed = parser.parse(values)
+    assert parsed.format == "%d/%m/%Y"
+    assert parsed.parsed_ratio == 2 / 3
+    assert parsed.values.iloc[0] == pd.Timestamp("2024-02-01")
+    assert list(parsed.values.index) == [10, 11, 12, 13]
+
+    again = parser.parse(values.reset_index(drop=True))
+    assert parser.stats()["hits"] == 1
+    assert list(again.values.index) == [0, 1, 2, 3]
+
+
+def test_time_series_plot_uses_inferred_format():
+    df = pd.DataFrame({"jour": ["13/01/2024", "02/01/2024", "20/01/2024"], "ventes": [3, 1, 2]})
+    result = generate_time_series_plot(df, "jour", "ventes")
+    assert result["success"]
+    assert df["jour"].dtype == object  # DataFrame de l'appelant intact
+
+
+def test_mixed_offsets_are_parsed_as_utc_datetimes():
+    values = pd.Series(["2024-01-05T10:00:00+01:00", "March 5, 2024 10:00 -0500", "2024/02/01 08:30 +0000"])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        parsed = DatetimeParser().parse(values)
+    assert parsed.format == "mixed" and parsed.parsed_ratio == 1.0
+    assert str(parsed.values.dtype) == "datetime64[ns, UTC]"
+    assert parsed.values.iloc[0] == pd.Timestamp("2024-01-05 09:00", tz="UTC")
+    assert parsed.values.iloc[1] == pd.Timestamp("2024-03-05 15:00", tz="UTC")
@@ -0,0 +1,49 @@
+# backend/tests/test_df_cache.py
+import os
+import pandas as pd
+
+from backend.utils.df_cache import DataFrameCache
+
+
+def _write(path, n):
+    pd.DataFrame({"a": range(n)}).to_csv(path, index=False)
+    return path
+
+
+def test_hit_and_miss_counters(tmp_path):
+    path = _write(tmp_path / "data.csv", 10)
+    cache = DataFrameCache(max_bytes=10 * 1024 * 1024)
+    calls = []
+
+    def loader(p):
+        calls.append(p)
+        return pd.read_csv(p)
+
+    first = cache.get_or_load(path, loader)
+    second = cache.get_or_load(path, loader)
+    assert first is second
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_modified_file_is_reloaded(tmp_path):
+    path = _write(tmp_path / "data.csv", 10)
+    cache = DataFrameCache(max_bytes=10 * 1024 * 1024)
+    cache.get_or_load(path, pd.read_csv)
+    _write(path, 20)
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+    assert len(cache.get_or_load(path, pd.read_csv)) == 20
+    assert cache.stats()["misses"] == 2
+
+
+def test_lru_eviction_respects_byte_budget(tmp_path):
+    paths = [_write(tmp_path / f"d{i}.csv", 1000) for i in range(3)]
+    size = int(pd.read_csv(paths[0]).memory_usage(deep=True).sum())
+    cache = DataFrameCache(max_bytes=2 * size)
+    for p in paths:
+        cache.get_or_load(p, pd.read_csv)
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["evictions"] == 1
+    assert stats["bytes"] <= stats["max_bytes"]
+    # La plus ancienne entrée a été évincée
+    assert cache.get(DataFrameCache.make_key(paths[0])) is None
@@ -0,0 +1,46 @@
+# backend/tests/test_eda_cache.py
+import pandas as pd
+import plotly.express as px
+
+from backend.services.eda_cache import EDAResultCache, dataframe_fingerprint
+
+
+def test_fingerprint_depends_on_content_only():
+    df = pd.DataFrame({"a": [1, 2, 3]})
+    assert dataframe_fingerprint(df) == dataframe_fingerprint(df.copy())
+    assert dataframe_fingerprint(df) != dataframe_fingerprint(pd.DataFrame({"a": [1, 2, 4]}))
+
+
+def test_entries_keyed_by_sampling_params(tmp_path):
+    cache = EDAResultCache(str(tmp_path))
+    assert cache.entry("abc", sample_rows=5000) == cache.entry("abc", sample_rows=5000)
+    assert cache.entry("abc", sample_rows=5000) != cache.entry("abc", sample_rows=1000)
+
+
+def test_results_computed_once_and_errors_not_cached(tmp_path):
+    cache = EDAResultCache(str(tmp_path))
+    entry = cache.entry("abc")
+    calls = []
+
+    def summary():
+        calls.append(1)
+        return {"shape": (3, 1)}
+
+    assert cache.get_or_compute_json(entry, "summary", summary) == {"shape": [3, 1]}
+    assert cache.get_or_compute_json(entry, "summary", summary) == {"shape": [3, 1]}
+    assert len(calls) == 1
+
+    cache.get_or_compute_pickle(entry, "llm", lambda: "erreur", cacheable=lambda r: r != "erreur")
+    assert cache.get_or_compute_pickle(entry, "llm", lambda: "ok") == "ok"
+
+
+def test_figures_are_loaded_lazily(tmp_path):
+    cache = EDAResultCache(str(tmp_path))
+    entry = cache.entry("abc")
+    df = pd.DataFrame({"a": [1, 2, 3]})
+    cache.get_or_compute_figures(entry, "distributions", lambda: {"a": px.histogram(df, x="a")})
+
+    figures = cache.get_or_compute_figures(entry, "distributions", lambda: {})
+    assert list(figures) == ["a"]
+    assert figures._values == {}
+    assert figures["a"].data[0].type == "histogram"
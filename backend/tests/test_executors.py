@@ -0,0 +1,50 @@
+# backend/tests/test_executors.py
+import asyncio
+import pytest
+
+from backend.utils.executors import AdmissionController, ServiceBusyError
+
+
+def test_admission_rejects_when_queue_full():
+    async def scenario():
+        ctrl = AdmissionController("test", max_concurrent=1, max_queue=1)
+        release = asyncio.Event()
+
+        async def hold():
+            async with ctrl.slot():
+                await release.wait()
+
+        running = asyncio.create_task(hold())
+        queued = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        assert ctrl.stats()["inflight"] == 1 and ctrl.stats()["waiting"] == 1
+
+        with pytest.raises(ServiceBusyError) as exc:
+            async with ctrl.slot():
+                pass
+        release.set()
+        await asyncio.gather(running, queued)
+        return exc.value, ctrl.stats()
+
+    error, stats = asyncio.run(scenario())
+    assert error.status_code == 503
+    assert "Retry-After" in error.headers
+    assert stats["inflight"] == 0 and stats["waiting"] == 0
+
+
+def test_managed_executor_reports_queue_depth():
+    import threading
+    from backend.utils.executors import ManagedExecutor
+
+    executor = ManagedExecutor("test", "thread", max_workers=1)
+    release = threading.Event()
+    futures = [executor.submit(release.wait) for _ in range(3)]
+    stats = executor.stats()
+    assert stats["pending"] == 3 and stats["queue_depth"] == 2
+
+    release.set()
+    for fut in futures:
+        fut.result()
+    executor.shutdown()
+    stats = executor.stats()
+    assert stats["pending"] == 0 and stats["completed"] == 3
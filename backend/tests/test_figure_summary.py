@@ -0,0 +1,55 @@
+# backend/tests/test_figure_summary.py
+import numpy as np
+import pandas as pd
+
+from backend.services.tools_service import interpret_chart
+from backend.utils import chart_generator
+from backend.utils.figure_summary import summarize_figure
+
+
+def _df(n):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "a": rng.normal(50, 10, n),
+        "date": pd.date_range("2020-01-01", periods=n, freq="D"),
+        "ville": rng.choice(["Paris", "Lyon", "Nice"], n),
+    })
+    df["b"] = df["a"] * 2 + rng.normal(size=n)
+    df["t"] = np.arange(n) * 0.5 + rng.normal(size=n)
+    return df
+
+
+def test_histogram_is_binned():
+    fig = chart_generator.generate_distribution_plot(_df(1000), "a")["fig_json"]
+    hist = summarize_figure(fig)["traces"][0]
+    assert hist["type"] == "histogram" and hist["n"] == 1000
+    assert sum(count for _, _, count in hist["bins"]) == 1000
+
+
+def test_time_series_trend_and_extrema():
+    fig = chart_generator.generate_time_series_plot(_df(200), "date", "t")["fig_json"]
+    trace = summarize_figure(fig)["traces"][0]
+    assert abs(trace["trend_slope"] - 0.5) < 0.05
+    assert trace["trend_unit"] == "par jour"
+    assert trace["y_max"] > trace["y_min"]
+
+
+def test_correlation_heatmap_keeps_strong_cells_once():
+    fig = chart_generator.generate_correlation_plot(_df(500)[["a", "b", "t"]])["fig_json"]
+    heatmap = summarize_figure(fig)["traces"][0]
+    assert [cell[:2] for cell in heatmap["strong_cells"]] == [["a", "b"]]
+
+
+def test_prompt_size_is_independent_of_points():
+    prompts = []
+
+    def asker(prompt):
+        prompts.append(prompt)
+        return "ok"
+
+    for n in (100, 5000):
+        df = _df(n)
+        fig = chart_generator.generate_time_series_plot(df, "date", "a")["fig_json"]
+        interpret_chart(fig, df, "Tendance ?", asker)
+    assert len(prompts[1]) < 1000
+    assert abs(len(prompts[1]) - len(prompts[0])) < 100
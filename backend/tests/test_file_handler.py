@@ -0,0 +1,37 @@
+# backend/tests/test_file_handler.py
+import io
+import asyncio
+import hashlib
+from pathlib import Path
+
+import pytest
+from starlette.datastructures import UploadFile
+
+from backend.config import settings
+from backend.utils.file_handler import save_upload_file
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE", 4)  # force plusieurs morceaux
+    return tmp_path
+
+
+def _upload(content: bytes, filename: str) -> str:
+    return asyncio.run(save_upload_file(UploadFile(file=io.BytesIO(content), filename=filename)))
+
+
+def test_upload_stored_under_content_hash(data_dir):
+    content = b"a,b\n1,2\n3,4\n"
+    path = _upload(content, "Mon Fichier.CSV")
+    assert Path(path).name == f"{hashlib.sha256(content).hexdigest()}.csv"
+    assert Path(path).read_bytes() == content
+
+
+def test_upload_same_bytes_returns_existing_path(data_dir):
+    content = b"x,y\n5,6\n"
+    first = _upload(content, "ventes.csv")
+    second = _upload(content, "ventes_copie.csv")
+    assert first == second
+    assert sorted(p.name for p in data_dir.iterdir()) == [Path(first).name]
@@ -0,0 +1,78 @@
+# backend/tests/test_llm_backends.py
+import json
+import time
+
+import pytest
+
+from backend.services.llm_backends import RemoteLLMBackend, StubLLMBackend, create_backend
+from backend.services.llm_client import CircuitBreaker, LLMUnavailableError
+
+MESSAGES = [{"role": "user", "content": "Analyse des ventes"}]
+
+
+def test_stub_is_deterministic_and_supports_json_mode():
+    backend = StubLLMBackend("gpt-4.1", response_tokens=10)
+    try:
+        first = backend.complete_sync(MESSAGES)
+        assert first == backend.complete_sync(MESSAGES)
+        assert first != backend.complete_sync([{"role": "user", "content": "autre"}])
+        parsed = json.loads(backend.complete_sync(MESSAGES, response_format={"type": "json_object"}))
+        assert set(parsed) == {"summary", "insights", "recommendations"}
+        assert backend.model == "stub-gpt-4.1"
+    finally:
+        backend.close()
+
+
+def test_stub_streams_at_configured_token_rate():
+    backend = StubLLMBackend("gpt-4.1", latency=0.05, tokens_per_second=100, response_tokens=10)
+    received = []
+    try:
+        start = time.monotonic()
+        text = backend.stream_sync(MESSAGES, received.append)
+        elapsed = time.monotonic() - start
+        assert "".join(received).strip() == text
+        assert elapsed >= 0.05 + 10 / 100
+    finally:
+        backend.close()
+
+
+def test_stub_reports_cached_prefix_tokens():
+    backend = StubLLMBackend("gpt-4.1", response_tokens=5)
+    context = "contexte dataset " * 400
+    usage = {}
+    try:
+        backend.complete_sync([{"role": "user", "content": context + "Question A"}], usage=usage)
+        assert usage["cached_tokens"] == 0
+        backend.complete_sync([{"role": "user", "content": context + "Question B"}], usage=usage)
+        assert usage["cached_tokens"] >= 1024
+        assert usage["provider_prompt_tokens"] > usage["cached_tokens"]
+        assert backend.stats()["tokens"]["cached_tokens"] == usage["cached_tokens"]
+    finally:
+        backend.close()
+
+
+def test_injected_failures_go_through_retries_and_breaker():
+    backend = StubLLMBackend("gpt-4.1", failure_rate=1.0, failure_status=503, retry_after=0)
+    backend.client.backoff_base = 0.001
+    backend.client.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    try:
+        with pytest.raises(LLMUnavailableError):
+            backend.complete_sync(MESSAGES)
+        stats = backend.stats()
+        assert stats["stub"]["injected_failures"] == 3
+        assert stats["circuit"]["state"] == "open"
+    finally:
+        backend.close()
+
+
+def test_remote_without_token_fails_on_call_not_on_import():
+    backend = RemoteLLMBackend("https://llm.test", None, "gpt-4.1")
+    with pytest.raises(LLMUnavailableError):
+        backend.complete_sync(MESSAGES)
+    assert backend.stats()["calls"] == 0
+
+
+def test_factory_selects_backend():
+    assert create_backend("stub").name == "stub"
+    with pytest.raises(ValueError):
+        create_backend("inconnu")
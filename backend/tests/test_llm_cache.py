@@ -0,0 +1,47 @@
+# backend/tests/test_llm_cache.py
+import time
+
+from backend.services.llm_cache import LLMResponseCache
+
+
+def _cache(tmp_path, ttl=3600, max_entries=100):
+    return LLMResponseCache(str(tmp_path / "llm_cache.db"), ttl=ttl, max_entries=max_entries)
+
+
+def test_key_depends_on_model_system_prompt_and_temperature():
+    key = LLMResponseCache.make_key("gpt-4.1", "system", "prompt", 0.3)
+    assert key == LLMResponseCache.make_key("gpt-4.1", "system", "prompt", 0.3)
+    assert key != LLMResponseCache.make_key("gpt-4.1", "system", "prompt", 0.7)
+    assert key != LLMResponseCache.make_key("gpt-4.1", "autre", "prompt", 0.3)
+    assert key != LLMResponseCache.make_key("gpt-4o", "system", "prompt", 0.3)
+
+
+def test_hit_miss_counters_and_persistence(tmp_path):
+    cache = _cache(tmp_path)
+    assert cache.get("k") is None
+    cache.put("k", "gpt-4.1", "réponse")
+    assert cache.get("k") == "réponse"
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    # Une autre instance (autre worker) lit la même base
+    assert _cache(tmp_path).get("k") == "réponse"
+
+
+def test_expired_entries_are_ignored(tmp_path):
+    cache = _cache(tmp_path, ttl=0.05)
+    cache.put("k", "gpt-4.1", "réponse")
+    time.sleep(0.1)
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_size_bound_evicts_least_recently_used(tmp_path):
+    cache = _cache(tmp_path, max_entries=2)
+    cache.put("a", "m", "1")
+    time.sleep(0.01)
+    cache.put("b", "m", "2")
+    time.sleep(0.01)
+    cache.get("a")
+    time.sleep(0.01)
+    cache.put("c", "m", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
@@ -0,0 +1,181 @@
+# backend/tests/test_llm_client.py
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from backend.services.llm_client import (
+    AsyncLLMClient, CircuitBreaker, CircuitOpenError, LLMUnavailableError, backoff_delay, parse_retry_after,
+)
+from backend.utils.cancellation import CancellationToken, OperationCancelled
+
+MESSAGES = [{"role": "user", "content": "bonjour"}]
+
+
+def _ok(content="réponse"):
+    return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+
+def _client(handler, **kwargs):
+    kwargs.setdefault("backoff_base", 0.01)
+    kwargs.setdefault("backoff_max", 0.05)
+    kwargs.setdefault("breaker", CircuitBreaker(failure_threshold=5, reset_timeout=60))
+    return AsyncLLMClient("https://llm.test", "token", "modele", transport=httpx.MockTransport(handler), **kwargs)
+
+
+def test_backoff_is_bounded_and_honours_retry_after():
+    for attempt in range(6):
+        assert 0 <= backoff_delay(attempt, base=1.0, cap=8.0) <= min(8.0, 2 ** attempt)
+    assert backoff_delay(0, base=0.01, cap=30, retry_after=2) >= 2
+    assert backoff_delay(0, base=0.01, cap=5, retry_after=60) <= 5
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+
+
+def test_retries_transient_errors_then_succeeds():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(429, headers={"Retry-After": "0"}) if len(calls) < 3 else _ok()
+
+    client = _client(handler)
+    try:
+        assert client.complete_sync(MESSAGES) == "réponse"
+        assert len(calls) == 3 and client.stats()["retries"] == 2
+        assert calls[0].headers["Authorization"] == "Bearer token"
+    finally:
+        client.close()
+
+
+def test_client_error_is_not_retried():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(400, text="requête invalide")
+
+    client = _client(handler)
+    try:
+        with pytest.raises(LLMUnavailableError):
+            client.complete_sync(MESSAGES)
+        assert len(calls) == 1
+    finally:
+        client.close()
+
+
+def test_circuit_opens_and_fails_fast():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    client = _client(handler, max_retries=2, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    try:
+        with pytest.raises(LLMUnavailableError):
+            client.complete_sync(MESSAGES)
+        with pytest.raises(CircuitOpenError):
+            client.complete_sync(MESSAGES)
+        assert len(calls) == 2
+        assert client.stats()["circuit"]["state"] == "open"
+    finally:
+        client.close()
+
+
+def test_half_open_probe_closes_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()          # appel d'essai
+    assert not breaker.allow()      # un seul essai à la fois
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_half_open_probe_released_after_4xx_cancellation_or_bad_body():
+    replies = iter([503, 503, 400])
+    mode = {"next": None}
+
+    async def handler(request):
+        if mode["next"] == "slow":
+            await asyncio.sleep(5)
+        if mode["next"] == "html":
+            return httpx.Response(200, text="<html>maintenance</html>")
+        if mode["next"] == "stream":
+            return httpx.Response(200, text='data: {"choices": [{"delta": {"content": "x"}}]}\n\n')
+        status = next(replies, 200)
+        return _ok() if status == 200 else httpx.Response(status)
+
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    client = _client(handler, max_retries=1, breaker=breaker)
+
+    def reopen():
+        breaker.record_failure()
+        breaker.record_failure()
+        time.sleep(0.06)
+
+    try:
+        for _ in range(2):
+            with pytest.raises(LLMUnavailableError):
+                client.complete_sync(MESSAGES)
+        time.sleep(0.06)
+        with pytest.raises(LLMUnavailableError):
+            client.complete_sync(MESSAGES)  # l'essai reçoit un 400
+        assert client.complete_sync(MESSAGES) == "réponse"
+        assert breaker.state == "closed"
+
+        reopen()
+        mode["next"] = "slow"
+        with pytest.raises(OperationCancelled):
+            client.complete_sync(MESSAGES, cancel_token=CancellationToken(timeout=0.1))
+        time.sleep(0.05)  # annulation propagée à la boucle du client
+        mode["next"] = "stream"
+        reopen()
+
+        def failing_delta(text):
+            raise RuntimeError("client parti")
+        with pytest.raises(RuntimeError):
+            client.stream_sync(MESSAGES, failing_delta)
+        mode["next"] = "html"
+        with pytest.raises(LLMUnavailableError):
+            client.complete_sync(MESSAGES)  # corps non JSON : échec transitoire, circuit rouvert
+        time.sleep(0.06)
+        mode["next"] = None
+        assert client.complete_sync(MESSAGES) == "réponse"
+        assert breaker.state == "closed"
+    finally:
+        client.close()
+
+
+def test_cancellation_interrupts_backoff():
+    client = _client(lambda request: httpx.Response(503, headers={"Retry-After": "30"}), backoff_max=30)
+    token = CancellationToken(timeout=0.2)
+    start = time.monotonic()
+    try:
+        with pytest.raises(OperationCancelled):
+            client.complete_sync(MESSAGES, cancel_token=token)
+        assert time.monotonic() - start < 2
+    finally:
+        client.close()
+
+
+def test_stream_delivers_fragments_in_order():
+    chunks = ["Bon", "jour", " !"]
+    body = "".join(
+        f'data: {{"choices": [{{"delta": {{"content": "{c}"}}}}]}}\n\n' for c in chunks
+    ) + "data: [DONE]\n\n"
+
+    def handler(request):
+        assert b'"stream": true' in request.content or b'"stream":true' in request.content
+        return httpx.Response(200, text=body, headers={"Content-Type": "text/event-stream"})
+
+    client = _client(handler)
+    received = []
+    try:
+        assert client.stream_sync(MESSAGES, received.append) == "Bonjour !"
+        assert received == chunks
+    finally:
+        client.close()
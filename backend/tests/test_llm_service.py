@@ -1,8 +1,14 @@
 # tests/test_llm_service.py
+import threading
+import time
+
 import pytest
 import pandas as pd
 import numpy as np
-from backend.services.llm_service import analyze_question
+from backend.services import llm_service
+from backend.services.eda_service import IntelligentEDAService
+from backend.services.llm_service import analyze_question, smart_agent
+from backend.utils.cancellation import CancellationToken, OperationCancelled
 
 # --- Fixtures pour DataFrames ---
 @pytest.fixture
@@ -59,3 +65,45 @@ def test_empty_dataframe():
     result = analyze_question(empty_df, question)
     assert "error" in result
     assert result["error"] == "DataFrame vide, impossible d’analyser"
+
+
+@pytest.fixture
+def stuck_engine(monkeypatch):
+    """Moteur ydata qui ne rend pas la main avant la fin du test."""
+    release = threading.Event()
+    monkeypatch.setattr(IntelligentEDAService, "generate_profile_report",
+                        lambda self, output_path=None: release.wait(30) and "stuck")
+    yield
+    release.set()
+
+
+def test_stuck_engine_releases_eda_stage_within_deadline(small_df, stuck_engine, monkeypatch):
+    eda = IntelligentEDAService(small_df, use_cache=False)
+    start = time.monotonic()
+    with pytest.raises(OperationCancelled):
+        eda.full_analysis(engine="ydata", interpret=False, token=CancellationToken(0.3))
+    assert time.monotonic() - start < 1.5
+
+    # Annulation sans échéance (client déconnecté) : vue au prochain réveil
+    token = CancellationToken()
+    threading.Timer(0.2, token.cancel, ("client déconnecté",)).start()
+    start = time.monotonic()
+    with pytest.raises(OperationCancelled, match="client déconnecté"):
+        eda.full_analysis(engine="ydata", interpret=False, token=token)
+    assert time.monotonic() - start < 1.5
+
+    # Dans l'agent : l'étape eda hors délai libère son thread, le reste de l'analyse aboutit
+    monkeypatch.setitem(llm_service.STAGE_TIMEOUTS, "eda", 0.3)
+    stage_done = threading.Event()
+    full_analysis = IntelligentEDAService.full_analysis
+
+    def tracked(self, *args, **kwargs):
+        try:
+            return full_analysis(self, *args, **kwargs)
+        finally:
+            stage_done.set()
+
+    monkeypatch.setattr(IntelligentEDAService, "full_analysis", tracked)
+    result = smart_agent(small_df, "Fais un profil exploratoire du dataset.")
+    assert result["timeouts"] == ["eda"] and result["llm"]
+    assert stage_done.wait(1.5)
@@ -0,0 +1,45 @@
+# backend/tests/test_outliers.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.utils.outliers import column_quantiles, detect_outliers
+
+
+def _df():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(500, 4)), columns=["a", "b", "c", "d"])
+    df.loc[10, "a"] = 50.0
+    df.loc[20, "c"] = -40.0
+    df.loc[::9, "b"] = np.nan
+    df["ville"] = "Paris"
+    return df
+
+
+def test_quantiles_match_pandas_with_missing_values():
+    df = _df()[["a", "b", "c", "d"]]
+    expected = df.quantile([0.25, 0.5, 0.75]).to_numpy()
+    assert np.allclose(column_quantiles(df.to_numpy(), [0.25, 0.5, 0.75]), expected)
+
+
+def test_iqr_counts_match_column_by_column_filtering():
+    df = _df()
+    result = detect_outliers(df)
+    for col in ["a", "b", "c", "d"]:
+        q1, q3 = df[col].quantile([0.25, 0.75])
+        iqr = q3 - q1
+        expected = df[(df[col] < q1 - 1.5 * iqr) | (df[col] > q3 + 1.5 * iqr)].shape[0]
+        assert result.counts()[col] == expected
+    assert "ville" not in result.masks.columns
+    assert result.masks.index.equals(df.index)
+
+
+@pytest.mark.parametrize("method", ["zscore", "mad", "isolation"])
+def test_other_methods_flag_injected_rows(method):
+    result = detect_outliers(_df(), method=method)
+    assert result.rows[10] and result.rows[20]
+    assert result.rows.sum() < 50
+    if method == "isolation":
+        assert result.scores[10] > result.scores.median()
+    else:
+        assert result.masks.loc[10, "a"] and not result.masks.loc[10, "b"]
@@ -0,0 +1,97 @@
+# backend/tests/test_profiler.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.services import dataset_registry
+from backend.services.llm_service import smart_agent
+from backend.utils.profiler import DatasetProfile, profile_dataset
+from backend.utils.sketches import HyperLogLog, TDigest
+
+pytest.importorskip("pyarrow")
+
+
+def _df(n=20000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "montant": rng.lognormal(3, 1, n),
+        "age": rng.integers(18, 80, n).astype(float),
+        "ville": pd.Categorical(rng.choice(["Paris", "Lyon", "Marseille", "Nice"], n)),
+        "date": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, n), unit="D"),
+    })
+    df.loc[::9, "age"] = np.nan
+    return df
+
+
+def test_chunked_profile_matches_pandas(tmp_path):
+    df = _df()
+    path = tmp_path / "clean.parquet"
+    df.to_parquet(path, index=False)
+    profile = profile_dataset(path, batch_rows=3000)
+    stats = profile.to_stats()
+    assert profile.batches == 7 and stats["rows"] == len(df)
+
+    for col in ("montant", "age"):
+        expected = df[col].describe()
+        got = stats["numeric"][col]
+        for key in ("count", "mean", "std", "min", "max"):
+            assert got[key] == pytest.approx(expected[key], rel=1e-9)
+        for key in ("25%", "50%", "75%"):
+            assert got[key] == pytest.approx(expected[key], rel=0.02)
+    assert profile.columns["montant"].moments.skewness == pytest.approx(df["montant"].skew(), rel=1e-6)
+    assert profile.missing()["age"] == df["age"].isna().sum()
+    assert stats["categorical"]["ville"] == df["ville"].value_counts().to_dict()
+    assert stats["datetime"]["date"] == {"min": str(df["date"].min()), "max": str(df["date"].max()),
+                                         "nunique": pytest.approx(df["date"].nunique(), rel=0.05)}
+    histogram = profile.summary()["columns"]["age"]["histogram"]
+    assert sum(histogram["counts"]) == df["age"].notna().sum()
+    assert histogram["edges"][0] <= df["age"].min() and histogram["edges"][-1] > df["age"].max()
+
+
+def test_partial_profiles_merge_like_a_single_pass():
+    df = _df()
+    whole, left, right = DatasetProfile(), DatasetProfile(), DatasetProfile()
+    whole.update(df)
+    left.update(df.iloc[:5000])
+    right.update(df.iloc[5000:])
+    left.merge(right)
+    for col in ("montant", "age"):
+        a, b = whole.columns[col], left.columns[col]
+        assert b.moments.mean == pytest.approx(a.moments.mean)
+        assert b.moments.kurtosis == pytest.approx(a.moments.kurtosis)
+        assert (a.distinct.registers == b.distinct.registers).all()
+        assert b.histogram.to_dict() == a.histogram.to_dict()
+    assert left.to_stats()["categorical"] == whole.to_stats()["categorical"]
+
+
+def test_sketch_accuracy():
+    rng = np.random.default_rng(1)
+    ids = rng.integers(0, 50000, 200000)
+    hll = HyperLogLog()
+    for block in np.array_split(ids, 5):
+        hll.update(pd.Series(block))
+    assert hll.estimate() == pytest.approx(len(np.unique(ids)), rel=0.05)
+
+    values = rng.exponential(1.0, 200000)
+    digest = TDigest()
+    for block in np.array_split(values, 20):
+        digest.update(block)
+    for q, got in zip((0.01, 0.5, 0.99), digest.quantiles([0.01, 0.5, 0.99])):
+        assert got == pytest.approx(np.quantile(values, q), rel=0.02)
+
+
+def test_registered_dataset_stats_cover_all_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset_registry, "DB_PATH", str(tmp_path / "datasets.db"))
+    monkeypatch.setattr(dataset_registry, "ARTIFACT_DIR", tmp_path / "artifacts")
+    dataset_registry.init_db()
+    df = _df()
+    path = tmp_path / "clean.parquet"
+    df.to_parquet(path, index=False)
+    dataset_id = dataset_registry.register_dataset(str(path))["dataset_id"]
+
+    sample = df.sample(500, random_state=0)
+    results = smart_agent(sample, "Quel est le montant moyen ?", dataset_id=dataset_id)
+    assert results["stats"]["rows"] == len(df)
+    assert results["stats"]["profile"]["full_data"]
+    assert results["stats"]["numeric"]["montant"]["mean"] == pytest.approx(df["montant"].mean())
+    assert "profile" in dataset_registry.list_artifacts(dataset_id)
@@ -0,0 +1,67 @@
+# backend/tests/test_prompt_builder.py
+import numpy as np
+import pandas as pd
+
+from backend.services.prompt_builder import (
+    build_dataset_digest, build_prompt, count_tokens, fmt_number, rank_columns,
+)
+
+
+def _wide_df(n_cols=60, rows=200):
+    rng = np.random.default_rng(0)
+    data = {f"mesure_{i}": rng.normal(size=rows) * 1000 for i in range(n_cols)}
+    data["salaire"] = rng.integers(30000, 90000, size=rows)
+    data["ville"] = rng.choice(["Paris", "Lyon", "Marseille"], size=rows)
+    return pd.DataFrame(data)
+
+
+def robust_stats(df):
+    # Même structure que llm_service.robust_stats
+    return {
+        "rows": len(df), "columns": list(df.columns), "dtypes": {c: str(df[c].dtype) for c in df.columns},
+        "numeric": df.select_dtypes(include="number").describe().to_dict(),
+        "categorical": {c: df[c].value_counts().head(10).to_dict() for c in df.select_dtypes(include="object")},
+    }
+
+
+def test_numbers_are_rounded():
+    assert fmt_number(3.14159265) == "3.142"
+    assert fmt_number(42.0) == "42"
+    assert fmt_number(float("nan")) == "NA"
+
+
+def test_columns_named_in_question_come_first():
+    stats = {"columns": ["a", "salaire", "ville"], "numeric": {"a": {}, "salaire": {}}}
+    assert rank_columns(stats["columns"], "Quel est le salaire moyen par ville ?", stats)[:2] == ["salaire", "ville"]
+
+
+def test_digest_fits_budget_and_keeps_relevant_columns():
+    df = _wide_df()
+    stats = robust_stats(df)
+    digest = build_dataset_digest(stats, "Répartition des salaires par ville", df, budget=300)
+    assert digest.tokens <= 300
+    assert set(digest.columns[:2]) == {"salaire", "ville"}
+    assert digest.dropped_columns
+    assert "    " not in digest.text  # pas d'indentation JSON
+
+
+def test_prompt_is_smaller_than_raw_stats_dump():
+    import json
+    df = _wide_df()
+    stats = robust_stats(df)
+    prompt = build_prompt("Analyse complète.", "Analyse du salaire", stats, df, budget=800)
+    assert count_tokens(prompt.context) <= 800  # budget fixe du préfixe, la question s'y ajoute
+    assert prompt.tokens < count_tokens(json.dumps(stats, indent=2, default=str)) / 5
+    assert prompt.text.startswith(prompt.context)
+    assert prompt.task.startswith("Analyse complète.\nQuestion: Analyse du salaire")
+
+
+def test_context_prefix_is_identical_across_questions():
+    df = _wide_df()
+    stats = robust_stats(df)
+    a = build_prompt("Analyse complète.", "Répartition des salaires par ville", stats, df, budget=400)
+    b = build_prompt("Insights.", "Évolution de mesure_59", stats, df, budget=400)
+    assert a.context == b.context
+    # La colonne visée mais écartée du contexte est décrite dans la partie question
+    assert "mesure_59" in b.dropped_columns
+    assert "- mesure_59 (" in b.task
@@ -0,0 +1,27 @@
+# backend/tests/test_shared_frame.py
+import os
+import pandas as pd
+import pytest
+
+from backend.utils.shared_frame import share_frame, call_with_shared_frame
+
+pytest.importorskip("pyarrow")
+
+
+def _shape(df, factor=1):
+    return df.shape[0] * factor, df.shape[1]
+
+
+def test_frame_shared_through_arrow_file_and_removed():
+    df = pd.DataFrame({"a": [1, 2, 3], "ville": pd.Categorical(["x", "y", "x"])})
+    with share_frame(df) as frame:
+        assert isinstance(frame, str) and frame.endswith(".arrow")
+        assert call_with_shared_frame(frame, _shape, factor=2) == (6, 2)
+    assert not os.path.exists(frame)
+
+
+def test_unconvertible_frame_falls_back_to_pickle():
+    df = pd.DataFrame({"mix": [1, "a", 2.5]})
+    with share_frame(df) as frame:
+        assert frame is df
+        assert call_with_shared_frame(frame, _shape) == (3, 1)
@@ -0,0 +1,48 @@
+# backend/tests/test_structured_output.py
+import pandas as pd
+
+from backend.services import llm_service
+
+VALID = '{"summary": "Salaires en hausse", "insights": ["a", "b"], "recommendations": ["c"]}'
+
+
+def _df():
+    return pd.DataFrame({"age": [25, 30, 22, 40, 35], "salaire": [30, 50, 28, 70, 45]})
+
+
+def test_parse_accepts_fenced_json_and_rejects_invalid():
+    parsed = llm_service.parse_structured_analysis(f"```json\n{VALID}\n```")
+    assert parsed.summary == "Salaires en hausse" and parsed.insights == ["a", "b"]
+    assert llm_service.parse_structured_analysis('{"insights": []}') is None
+    assert llm_service.parse_structured_analysis(llm_service.LLM_ERROR_MESSAGE) is None
+
+
+def test_agent_makes_a_single_structured_call(monkeypatch):
+    calls = []
+
+    def fake_ask(prompt, system_prompt=None, **kwargs):
+        calls.append(kwargs.get("json_mode", False))
+        return VALID
+
+    monkeypatch.setattr(llm_service, "ask_llm", fake_ask)
+    monkeypatch.setattr(llm_service.settings, "LLM_STRUCTURED_OUTPUT", True)
+    out = llm_service.smart_agent(_df(), "Analyse des salaires")
+    assert calls == [True]
+    assert out["llm"] == "Salaires en hausse"
+    assert out["structured"]["recommendations"] == ["c"]
+    assert "1. a" in out["insights"]
+
+
+def test_invalid_json_falls_back_to_separate_calls(monkeypatch):
+    calls = []
+
+    def fake_ask(prompt, system_prompt=None, **kwargs):
+        calls.append(kwargs.get("json_mode", False))
+        return "pas du JSON" if kwargs.get("json_mode") else "texte"
+
+    monkeypatch.setattr(llm_service, "ask_llm", fake_ask)
+    monkeypatch.setattr(llm_service.settings, "LLM_STRUCTURED_OUTPUT", True)
+    out = llm_service.smart_agent(_df(), "Analyse des salaires")
+    assert calls == [True, False, False]
+    assert out["llm"] == "texte" and out["insights"] == "texte"
+    assert "structured" not in out
@@ -0,0 +1,48 @@
+# backend/tests/test_type_inference.py
+import pandas as pd
+
+# llm_service d'abord : il charge eda_service sans import circulaire
+import backend.services.llm_service  # noqa: F401
+from backend.services.eda_service import IntelligentEDAService
+from backend.utils import type_inference
+from backend.utils.type_inference import InferredSchema, apply_schema, infer_schema
+
+
+def _df():
+    return pd.DataFrame({
+        "montant": ["1,200.5", "3,400", "560", None],
+        "date": ["2024-01-05", "2024-02-10", "2024-03-15", "2024-04-20"],
+        "ville": ["Paris", "Lyon", "Paris", "Nice"],
+        "age": [25, 31, 40, 22],
+        "actif": [True, False, True, True],
+    })
+
+
+def test_schema_and_single_conversion():
+    df = _df()
+    schema = infer_schema(df)
+    assert schema.variable_types() == {"numerical": ["montant", "age"], "categorical": ["actif"],
+                                       "datetime": ["date"], "text": ["ville"]}
+    typed, reports = apply_schema(df, schema)
+    assert reports == {"date": {"format": "%Y-%m-%d", "parsed_ratio": 1.0}}
+    assert typed["montant"].tolist()[:3] == [1200.5, 3400.0, 560.0]
+    assert pd.api.types.is_datetime64_any_dtype(typed["date"])
+    assert df["montant"].dtype == object  # original intact
+    assert InferredSchema.from_dict(schema.to_dict()) == schema
+
+
+def test_eda_infers_types_once(monkeypatch):
+    calls = []
+    original = type_inference.infer_text_column
+
+    def counting(values, sample_size=type_inference.SAMPLE_SIZE):
+        calls.append(values.name)
+        return original(values, sample_size)
+
+    monkeypatch.setattr(type_inference, "infer_text_column", counting)
+    eda = IntelligentEDAService(_df(), use_cache=False)
+    eda.smart_summary()
+    eda.correlation_analysis(interpret=False)
+    eda.generate_distribution_plots()
+    assert sorted(calls) == ["date", "montant", "ville"]
+    assert eda.detect_outliers() == {"montant": 0, "age": 0}
@@ -0,0 +1,80 @@
+# backend/utils/cancellation.py
+import time
+import asyncio
+import logging
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class OperationCancelled(Exception):
+    """Levée par le code coopératif quand son jeton est annulé ou a expiré."""
+
+
+class CancellationToken:
+    """
+    Jeton d'annulation coopérative avec échéance optionnelle.
+    Les étapes longues consultent `cancelled` (ou `wait`) entre deux unités de travail ;
+    un jeton enfant hérite de l'annulation et de l'échéance de son parent.
+    """
+
+    def __init__(self, timeout: Optional[float] = None, parent: Optional["CancellationToken"] = None):
+        self.parent = parent
+        self.deadline = time.monotonic() + timeout if timeout else None
+        if parent and parent.deadline is not None:
+            self.deadline = parent.deadline if self.deadline is None else min(self.deadline, parent.deadline)
+        self._event = threading.Event()
+        self._reason: Optional[str] = None
+
+    def child(self, timeout: Optional[float] = None) -> "CancellationToken":
+        return CancellationToken(timeout, parent=self)
+
+    def cancel(self, reason: str = "annulé") -> None:
+        if not self._event.is_set():
+            self._reason = reason
+            self._event.set()
+
+    @property
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set() or self.expired or bool(self.parent and self.parent.cancelled)
+
+    @property
+    def reason(self) -> Optional[str]:
+        if self._event.is_set():
+            return self._reason
+        if self.parent and self.parent.cancelled:
+            return self.parent.reason
+        return "délai dépassé" if self.expired else None
+
+    def remaining(self) -> Optional[float]:
+        """Secondes restantes avant l'échéance (None : pas d'échéance)."""
+        return None if self.deadline is None else max(0.0, self.deadline - time.monotonic())
+
+    def raise_if_cancelled(self) -> None:
+        if self.cancelled:
+            raise OperationCancelled(self.reason)
+
+    def wait(self, seconds: float) -> bool:
+        """Attente interrompue par l'annulation (remplace time.sleep) ; True si annulé."""
+        end = time.monotonic() + seconds
+        while not self.cancelled:
+            left = end - time.monotonic()
+            if left <= 0:
+                return False
+            self._event.wait(min(left, 0.1))
+        return True
+
+
+async def cancel_on_disconnect(request, token: CancellationToken, interval: float = 0.5) -> None:
+    """Tâche de fond : annule `token` dès que le client HTTP se déconnecte."""
+    while not token.cancelled:
+        if await request.is_disconnected():
+            logger.info("Client déconnecté : annulation de l'analyse")
+            token.cancel("client déconnecté")
+            return
+        await asyncio.sleep(interval)
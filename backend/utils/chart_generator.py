@@ -4,6 +4,9 @@ import plotly.express as px
 import logging
 from typing import Optional, Dict
 
+from backend.utils.correlation import METHODS as CORRELATION_METHODS, correlation_matrix
+from backend.utils.datetime_parser import parse_datetime
+
 logger = logging.getLogger(__name__)
 MAX_ROWS_SAMPLE = 5000  # Limite pour gros datasets
 
@@ -16,15 +19,24 @@ def _sample_df(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def generate_correlation_plot(df: pd.DataFrame, method: str = "pearson") -> Optional[Dict]:
-    """Génère une matrice de corrélation."""
+def generate_correlation_plot(df: pd.DataFrame, method: str = "pearson",
+                              matrix: Optional[pd.DataFrame] = None) -> Optional[Dict]:
+    """
+    Génère une matrice de corrélation. Pearson / Spearman sur toutes les lignes (cf. utils.correlation),
+    ou `matrix` déjà calculée (ex. profil complet du fichier).
+    """
     try:
-        if df.empty or df.select_dtypes(include=["number"]).shape[1] < 2:
+        numeric = df.select_dtypes(include=["number"])
+        if (matrix is None and df.empty) or (numeric if matrix is None else matrix).shape[1] < 2:
             logger.warning("Pas assez de colonnes numériques pour corrélation.")
             return None
 
-        df = _sample_df(df)
-        corr = df.select_dtypes(include=["number"]).corr(method=method)
+        if matrix is not None:
+            corr = matrix
+        elif method in CORRELATION_METHODS:
+            corr = correlation_matrix(numeric, method)
+        else:
+            corr = _sample_df(numeric).corr(method=method)
         fig = px.imshow(
             corr, text_auto=True, aspect="auto",
             title=f"Matrice de corrélation ({method})",
@@ -98,11 +110,15 @@ def generate_time_series_plot(
             logger.warning(f"Colonnes '{date_col}' ou '{value_col}' absentes ou DataFrame vide.")
             return None
 
-        df = _sample_df(df)
-        df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
+        df = _sample_df(df).copy()  # ne pas modifier le DataFrame de l'appelant
+        # Format déduit d'un échantillon puis conversion vectorisée (mémorisée par contenu)
+        parsed = parse_datetime(df[date_col])
+        df[date_col] = parsed.values
         if df[date_col].isnull().all():
             logger.warning(f"Colonne '{date_col}' ne contient aucune date valide.")
             return None
+        if parsed.parsed_ratio < 1.0:
+            logger.info(f"Colonne '{date_col}' : {parsed.parsed_ratio:.1%} des valeurs lues ({parsed.format})")
 
         df = df.sort_values(date_col)
         fig = px.line(df, x=date_col, y=value_col, color=color,
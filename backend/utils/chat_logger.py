@@ -2,7 +2,7 @@
 import sqlite3
 import json
 from datetime import datetime
-from typing import Any
+from typing import Any, Dict, List, Optional
 import logging
 from backend.config import settings
 import os
@@ -22,9 +22,15 @@ def init_db():
         timestamp TEXT,
         role TEXT,
         question TEXT,
-        response TEXT
+        response TEXT,
+        session_id TEXT
     )
     """)
+    # Bases créées avant l'ajout des sessions de conversation
+    columns = [row[1] for row in cur.execute("PRAGMA table_info(chat_history)")]
+    if "session_id" not in columns:
+        cur.execute("ALTER TABLE chat_history ADD COLUMN session_id TEXT")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_chat_history_session ON chat_history (session_id, id)")
     conn.commit()
     conn.close()
 
@@ -58,19 +64,20 @@ def serialize_data(data: Any) -> str:
     else:
         return str(data)
 
-def log_interaction(role: str, question: str, response: Any):
-    """Version simplifiée mais robuste"""
+def log_interaction(role: str, question: str, response: Any, session_id: Optional[str] = None):
+    """Version simplifiée mais robuste ; `session_id` rattache l'échange à une conversation."""
     try:
         conn = sqlite3.connect(DB_PATH)
         cur = conn.cursor()
         
         cur.execute(
-            "INSERT INTO chat_history (timestamp, role, question, response) VALUES (?, ?, ?, ?)",
+            "INSERT INTO chat_history (timestamp, role, question, response, session_id) VALUES (?, ?, ?, ?, ?)",
             (
                 datetime.utcnow().isoformat(),
                 role,
                 serialize_data(question),
-                serialize_data(response)  # ✅ Gère DataFrames et tout objet
+                serialize_data(response),  # ✅ Gère DataFrames et tout objet
+                session_id
             )
         )
         conn.commit()
@@ -80,5 +87,22 @@ def log_interaction(role: str, question: str, response: Any):
         logger.error(f"Erreur logging: {e}")
         # Ne pas faire planter l'application si le logging échoue
 
+def get_session_history(session_id: str, role: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+    """Derniers échanges d'une session (du plus ancien au plus récent), filtrés par rôle si précisé."""
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        conn.row_factory = sqlite3.Row
+        query = "SELECT timestamp, role, question, response FROM chat_history WHERE session_id = ?"
+        params: list = [session_id]
+        if role:
+            query += " AND role = ?"
+            params.append(role)
+        rows = conn.execute(query + " ORDER BY id DESC LIMIT ?", (*params, limit)).fetchall()
+        conn.close()
+    except Exception as e:
+        logger.error(f"Erreur lecture historique: {e}")
+        return []
+    return [dict(row) for row in reversed(rows)]
+
 # Initialisation auto
 init_db()
\ No newline at end of file
@@ -0,0 +1,115 @@
+# backend/utils/correlation.py
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.config import settings
+from backend.utils import dataset_store
+from backend.utils.sketches import CoMoments, TDigest
+
+logger = logging.getLogger(__name__)
+
+METHODS = ("pearson", "spearman")
+
+
+def numeric_columns(df: pd.DataFrame) -> List[Any]:
+    return [c for c, dtype in df.dtypes.items()
+            if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)]
+
+
+class CorrelationEngine:
+    """
+    Corrélations de toutes les lignes d'un dataset, accumulées bloc par bloc (cf. CoMoments) :
+    des moteurs partiels (autres blocs, autres workers) se fusionnent avec `merge`, et des lignes
+    ajoutées se prennent en compte avec `update`, sans relire les précédentes.
+    - "pearson" : exacte ;
+    - "spearman" : Pearson des rangs relatifs approchés par un t-digest par colonne. Avec
+      `digests` (distributions déjà connues, ex. profil du fichier), les rangs sont lus dans ces
+      digests figés ; sinon ils sont appris au fil des blocs.
+    """
+
+    def __init__(self, columns: List[Any], method: str = "pearson",
+                 digests: Optional[Dict[Any, TDigest]] = None):
+        if method not in METHODS:
+            raise ValueError(f"Méthode inconnue : {method} (attendu : {', '.join(METHODS)})")
+        self.columns = list(columns)
+        self.method = method
+        self.moments = CoMoments(len(self.columns))
+        self.learn_ranks = method == "spearman" and digests is None
+        self.digests = {c: TDigest() for c in self.columns} if self.learn_ranks else digests
+
+    def _values(self, batch: pd.DataFrame) -> np.ndarray:
+        frame = batch[self.columns]
+        if len(numeric_columns(frame)) < len(self.columns):
+            frame = frame.apply(pd.to_numeric, errors="coerce")  # dtype d'un bloc CSV différent du premier
+        values = frame.to_numpy(dtype=float, na_value=np.nan)
+        values[~np.isfinite(values)] = np.nan  # infinis traités comme manquants (cf. clean_df)
+        if self.method == "spearman":
+            for i, col in enumerate(self.columns):
+                if self.learn_ranks:
+                    column = values[:, i]
+                    self.digests[col].update(column[~np.isnan(column)])
+                values[:, i] = self.digests[col].cdf(values[:, i])
+        return values
+
+    def update(self, batch: pd.DataFrame) -> None:
+        """Ajoute un bloc de lignes (colonnes manquantes du bloc : KeyError)."""
+        if len(batch):
+            self.moments.update(self._values(batch))
+
+    def merge(self, other: "CorrelationEngine") -> None:
+        if other.columns != self.columns or other.method != self.method:
+            raise ValueError("Fusion de moteurs de corrélation sur des colonnes ou méthodes différentes")
+        self.moments.merge(other.moments)
+        if self.learn_ranks and other.learn_ranks:
+            for col in self.columns:
+                self.digests[col].merge(other.digests[col])
+
+    def matrix(self) -> pd.DataFrame:
+        return pd.DataFrame(self.moments.correlation(), index=self.columns, columns=self.columns)
+
+    def strong_relations(self, threshold: float) -> Dict[Any, float]:
+        """Paires (col1, col2) de corrélation absolue supérieure au seuil."""
+        return self.matrix().abs().stack().loc[lambda x: x > threshold].to_dict()
+
+
+def rank_digests(df: pd.DataFrame, columns: List[Any]) -> Dict[Any, TDigest]:
+    """Distributions des colonnes (t-digest), pour des rangs globaux en corrélation de Spearman."""
+    digests = {}
+    for col in columns:
+        values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        digests[col] = TDigest()
+        digests[col].update(values[np.isfinite(values)])
+    return digests
+
+
+def correlation_matrix(df: pd.DataFrame, method: str = "pearson",
+                       columns: Optional[List[Any]] = None) -> pd.DataFrame:
+    """Matrice de corrélation d'un DataFrame en mémoire, même calcul que sur un fichier par blocs."""
+    columns = numeric_columns(df) if columns is None else list(columns)
+    digests = rank_digests(df, columns) if method == "spearman" else None
+    engine = CorrelationEngine(columns, method, digests)
+    engine.update(df)
+    return engine.matrix()
+
+
+def correlate_dataset(path: Path, columns: List[Any], method: str = "pearson",
+                      batch_rows: Optional[int] = None,
+                      digests: Optional[Dict[Any, TDigest]] = None) -> CorrelationEngine:
+    """
+    Corrélations de tout un fichier lu par blocs. Spearman sans `digests` : une première lecture
+    établit la distribution de chaque colonne, pour que tous les blocs partagent les mêmes rangs.
+    """
+    batch_rows = batch_rows or settings.PROFILE_BATCH_ROWS
+    if method == "spearman" and digests is None:
+        digests = {c: TDigest() for c in columns}
+        for batch in dataset_store.iter_batches(path, columns=columns, batch_rows=batch_rows):
+            for col, digest in rank_digests(batch, columns).items():
+                digests[col].merge(digest)
+    engine = CorrelationEngine(columns, method, digests)
+    for batch in dataset_store.iter_batches(path, columns=columns, batch_rows=batch_rows):
+        engine.update(batch)
+    return engine
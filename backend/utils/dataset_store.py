@@ -0,0 +1,171 @@
+# backend/utils/dataset_store.py
+import logging
+import importlib.util
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Formats colonnaires : écrits une seule fois au nettoyage, relus avec projection de colonnes
+COLUMNAR_SUFFIXES = {"parquet": ".parquet", "arrow": ".arrow"}
+ARROW_SUFFIXES = (".arrow", ".feather")
+EXCEL_SUFFIXES = (".xls", ".xlsx")
+SUPPORTED_SUFFIXES = (".csv", ".parquet") + EXCEL_SUFFIXES + ARROW_SUFFIXES
+
+
+def columnar_available() -> bool:
+    """pyarrow est requis pour Parquet et Arrow IPC."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def clean_suffix(fmt: str, original_suffix: str) -> str:
+    """Extension du fichier nettoyé selon le format de stockage configuré."""
+    fmt = (fmt or "").lower()
+    if fmt in COLUMNAR_SUFFIXES:
+        if columnar_available():
+            return COLUMNAR_SUFFIXES[fmt]
+        logger.warning(f"pyarrow non installé, stockage '{fmt}' indisponible : repli sur {original_suffix}")
+    return original_suffix
+
+
+def write_dataset(df: pd.DataFrame, path: Path) -> Path:
+    """
+    Écrit le DataFrame selon l'extension de `path`.
+    Parquet/Arrow conservent les dtypes (category, datetime) ; en cas d'échec
+    (colonnes object hétérogènes...), repli sur CSV à côté du chemin demandé.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    try:
+        if suffix == ".parquet":
+            df.to_parquet(path, index=False)
+            return path
+        if suffix in ARROW_SUFFIXES:
+            df.reset_index(drop=True).to_feather(path)
+            return path
+    except Exception as e:
+        logger.warning(f"Écriture colonnaire impossible ({e}), repli sur CSV")
+        if path.exists():
+            path.unlink()
+        path = path.with_suffix(".csv")
+        suffix = ".csv"
+
+    if suffix in EXCEL_SUFFIXES:
+        df.to_excel(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+
+def read_dataset(path: Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Lit un dataset en ne chargeant que `columns` (toutes si None)."""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".parquet":
+        return pd.read_parquet(path, columns=columns)
+    if suffix in ARROW_SUFFIXES:
+        return pd.read_feather(path, columns=columns)
+    if suffix == ".csv":
+        return pd.read_csv(path, usecols=columns)
+    if suffix in EXCEL_SUFFIXES:
+        return pd.read_excel(path, usecols=columns)
+    raise ValueError("Format non supporté (CSV/Excel/Parquet/Arrow uniquement).")
+
+
+def iter_batches(path: Path, columns: Optional[List[str]] = None,
+                 batch_rows: int = 100_000) -> Iterator[pd.DataFrame]:
+    """
+    Lit le dataset par blocs d'au plus `batch_rows` lignes (mémoire bornée, projection de colonnes).
+    Parquet : groupes de lignes décodés au fil de l'eau ; Arrow : batches en mémoire mappée ;
+    CSV : lecture par morceaux. Excel ne se lit pas par morceaux : un seul bloc.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_rows, columns=columns):
+            yield batch.to_pandas()
+    elif suffix in ARROW_SUFFIXES:
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+        with pa.memory_map(str(path)) as source:
+            reader = ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                if columns is not None:
+                    batch = batch.select(columns)
+                for offset in range(0, batch.num_rows, batch_rows):
+                    yield batch.slice(offset, batch_rows).to_pandas()
+    elif suffix == ".csv":
+        with pd.read_csv(path, usecols=columns, chunksize=batch_rows) as reader:
+            yield from reader
+    elif suffix in EXCEL_SUFFIXES:
+        yield pd.read_excel(path, usecols=columns)
+    else:
+        raise ValueError("Format non supporté (CSV/Excel/Parquet/Arrow uniquement).")
+
+
+def _arrow_schema(path: Path):
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    with pa.memory_map(str(path)) as source:
+        return ipc.open_file(source).schema
+
+
+def read_columns(path: Path) -> List[str]:
+    """Liste des colonnes sans charger les données (schéma seul pour Parquet/Arrow)."""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".parquet":
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(path).names)
+    if suffix in ARROW_SUFFIXES:
+        return list(_arrow_schema(path).names)
+    if suffix == ".csv":
+        return list(pd.read_csv(path, nrows=0).columns)
+    if suffix in EXCEL_SUFFIXES:
+        return list(pd.read_excel(path, nrows=0).columns)
+    raise ValueError("Format non supporté (CSV/Excel/Parquet/Arrow uniquement).")
+
+
+def read_schema(path: Path) -> Dict[str, str]:
+    """Schéma {colonne: dtype pandas} ; métadonnées seules pour Parquet/Arrow."""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".parquet" or suffix in ARROW_SUFFIXES:
+        if suffix == ".parquet":
+            import pyarrow.parquet as pq
+            schema = pq.read_schema(path)
+        else:
+            schema = _arrow_schema(path)
+        empty = schema.empty_table().to_pandas()
+        return {c: str(t) for c, t in empty.dtypes.items()}
+    return {c: str(t) for c, t in read_dataset(path).dtypes.items()}
+
+
+def count_rows(path: Path) -> int:
+    """Nombre de lignes ; lu dans les métadonnées pour Parquet/Arrow."""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".parquet":
+        import pyarrow.parquet as pq
+        return pq.read_metadata(path).num_rows
+    if suffix in ARROW_SUFFIXES:
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+        with pa.memory_map(str(path)) as source:
+            reader = ipc.open_file(source)
+            return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+    return len(read_dataset(path))
+
+
+def describe_file(path: Path) -> Tuple[Dict[str, str], int]:
+    """Schéma et nombre de lignes : métadonnées pour Parquet/Arrow, une seule lecture sinon."""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".parquet" or suffix in ARROW_SUFFIXES:
+        return read_schema(path), count_rows(path)
+    df = read_dataset(path)
+    return {c: str(t) for c, t in df.dtypes.items()}, len(df)
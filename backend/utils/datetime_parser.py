@@ -0,0 +1,172 @@
+# backend/utils/datetime_parser.py
+import hashlib
+import logging
+import threading
+import warnings
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+logger = logging.getLogger(__name__)
+
+# Valeurs examinées pour choisir le format
+SAMPLE_SIZE = 500
+# Colonnes parsées gardées en mémoire (toutes datasets confondus)
+CACHE_ENTRIES = 64
+
+# Formats essayés en priorité, dans l'ordre (jour avant mois en cas d'ambiguïté)
+KNOWN_FORMATS = [
+    "%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d %H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M:%S.%f", "%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%dT%H:%M:%S.%f%z",
+    "%Y-%m-%d %H:%M:%S%z", "%Y/%m/%d", "%Y/%m/%d %H:%M:%S",
+    "%d/%m/%Y", "%d/%m/%Y %H:%M", "%d/%m/%Y %H:%M:%S", "%d-%m-%Y", "%d-%m-%Y %H:%M:%S", "%d.%m.%Y",
+    "%m/%d/%Y", "%m/%d/%Y %H:%M", "%m/%d/%Y %H:%M:%S",
+    "%d/%b/%Y:%H:%M:%S %z",  # journaux Apache / Nginx
+    "%d %b %Y", "%b %d %Y", "%b %d, %Y", "%d %B %Y", "%B %d, %Y",
+]
+
+
+@dataclass
+class DatetimeParse:
+    """Colonne parsée : valeurs (NaT si illisible), format retenu et part des valeurs non vides lues."""
+    values: pd.Series
+    format: Optional[str]
+    parsed_ratio: float
+
+    def report(self) -> Dict[str, object]:
+        return {"format": self.format, "parsed_ratio": round(self.parsed_ratio, 4)}
+
+
+def _sample(values: pd.Series, size: int) -> pd.Series:
+    values = values.dropna()
+    if len(values) > size:
+        values = values.iloc[:: len(values) // size][:size]
+    return values.astype(str).str.strip()
+
+
+def _parse(values: pd.Series, fmt: str) -> pd.Series:
+    with warnings.catch_warnings():
+        # "mixed" (repli élément par élément) avertit quand il devine le format
+        warnings.simplefilter("ignore", UserWarning)
+        # Décalages horaires : ramenés en UTC pour garder une colonne datetime homogène
+        if fmt != "mixed":
+            return pd.to_datetime(values, format=fmt, errors="coerce", utc="%z" in fmt)
+        # Décalages différents (ou dates avec et sans décalage) : colonne object, relue en UTC
+        warnings.simplefilter("ignore", FutureWarning)
+        parsed = pd.to_datetime(values, format=fmt, errors="coerce")
+        if not pd.api.types.is_datetime64_any_dtype(parsed):
+            parsed = pd.to_datetime(values, format=fmt, errors="coerce", utc=True)
+        return parsed
+
+
+def _candidates(sample: pd.Series) -> List[str]:
+    guessed = []
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        for value in sample.head(5):
+            for dayfirst in (True, False):
+                fmt = guess_datetime_format(value, dayfirst=dayfirst)
+                if fmt:
+                    guessed.append(fmt)
+    return list(dict.fromkeys(KNOWN_FORMATS + guessed))
+
+
+def infer_datetime_format(values: pd.Series, sample_size: int = SAMPLE_SIZE) -> Tuple[Optional[str], float]:
+    """
+    Format explicite lisant la plus grande part d'un échantillon de la colonne, et cette part.
+    Sans format satisfaisant, "mixed" si le parsing élément par élément lit l'échantillon ;
+    (None, 0.0) si aucune date n'est reconnue.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return None, 1.0
+    if pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+        return None, 0.0  # pas d'interprétation des nombres comme horodatages
+    sample = _sample(values, sample_size)
+    if sample.empty:
+        return None, 0.0
+    best, best_ratio = None, 0.0
+    for fmt in _candidates(sample):
+        ratio = float(_parse(sample, fmt).notna().mean())
+        if ratio > best_ratio:
+            best, best_ratio = fmt, ratio
+        if ratio == 1.0:
+            break
+    if best_ratio < 1.0:
+        mixed_ratio = float(_parse(sample, "mixed").notna().mean())
+        if mixed_ratio > best_ratio:
+            best, best_ratio = "mixed", mixed_ratio
+    return best, best_ratio
+
+
+class DatetimeParser:
+    """
+    Parsing vectorisé des colonnes de dates : format déduit d'un échantillon puis une seule
+    conversion avec ce format explicite. Colonnes parsées mémorisées par contenu (LRU),
+    donc partagées entre le service EDA et la génération de graphiques sur un même dataset.
+    """
+
+    def __init__(self, max_entries: int = CACHE_ENTRIES, sample_size: int = SAMPLE_SIZE):
+        self.max_entries = max_entries
+        self.sample_size = sample_size
+        self._entries: "OrderedDict[str, DatetimeParse]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(values: pd.Series, fmt: Optional[str]) -> str:
+        digest = hashlib.sha256(str(fmt).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(values, index=False).values.tobytes())
+        return digest.hexdigest()
+
+    def parse(self, values: pd.Series, fmt: Optional[str] = None) -> DatetimeParse:
+        """Colonne convertie en datetime (index d'origine) ; `fmt` évite une nouvelle inférence."""
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return DatetimeParse(values, None, 1.0)
+        key = self._key(values, fmt)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if cached is None:
+            cached = self._parse(values, fmt)
+            with self._lock:
+                self._entries[key] = cached
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return DatetimeParse(cached.values.set_axis(values.index), cached.format, cached.parsed_ratio)
+
+    def _parse(self, values: pd.Series, fmt: Optional[str]) -> DatetimeParse:
+        if fmt is None:
+            fmt, _ = infer_datetime_format(values, self.sample_size)
+        if fmt is None:
+            return DatetimeParse(pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]"), None, 0.0)
+        if fmt == "mixed":
+            logger.info(f"Colonne '{values.name}' : aucun format unique, parsing élément par élément")
+        if pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values):
+            # Espaces parasites seulement si l'échantillon en contient (évite une copie de la colonne)
+            head = values.dropna().head(self.sample_size).astype(str)
+            if (head != head.str.strip()).any():
+                values = values.astype("string").str.strip()
+        parsed = _parse(values, fmt)
+        present = int(values.notna().sum())
+        ratio = float(parsed.notna().sum() / present) if present else 0.0
+        return DatetimeParse(parsed, fmt, ratio)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+datetime_parser = DatetimeParser()
+
+
+def parse_datetime(values: pd.Series, fmt: Optional[str] = None) -> DatetimeParse:
+    """Raccourci vers le parseur partagé."""
+    return datetime_parser.parse(values, fmt)
@@ -0,0 +1,96 @@
+# backend/utils/df_cache.py
+import os
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, int, int]
+
+
+class DataFrameCache:
+    """
+    Cache LRU de DataFrames préparés, borné en octets (memory_usage(deep=True)).
+    Clé : chemin résolu + mtime + taille, donc un fichier modifié est rechargé.
+    Thread-safe ; le chargement lui-même se fait hors verrou.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[CacheKey, Tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(path: str) -> CacheKey:
+        p = Path(path).resolve()
+        st = os.stat(p)
+        return str(p), st.st_mtime_ns, st.st_size
+
+    def get(self, key: CacheKey) -> Optional[pd.DataFrame]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: CacheKey, df: pd.DataFrame) -> None:
+        size = int(df.memory_usage(deep=True).sum())
+        if size > self.max_bytes:
+            logger.info(f"DataFrame de {size} octets > budget cache ({self.max_bytes}), non mis en cache")
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            # Éviction LRU jusqu'à respecter le budget
+            while self._entries and self.current_bytes + size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+            self._entries[key] = (df, size)
+            self.current_bytes += size
+
+    def get_or_load(self, path: str, loader: Callable[[Path], pd.DataFrame]) -> pd.DataFrame:
+        """Retourne le DataFrame préparé en cache, ou l'obtient via `loader(path)`."""
+        key = self.make_key(path)
+        df = self.get(key)
+        if df is None:
+            df = loader(Path(key[0]))
+            self.put(key, df)
+        return df
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+# Instance partagée par le processus backend
+df_cache = DataFrameCache(settings.DF_CACHE_MAX_BYTES)
@@ -0,0 +1,242 @@
+# backend/utils/executors.py
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict
+
+from fastapi import HTTPException
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Quota par étape : taille de l'exécuteur et nombre de requêtes admises en parallèle
+STAGE_LIMITS: Dict[str, int] = {
+    "analyze": settings.ANALYZE_CONCURRENCY,
+    "report": settings.REPORT_CONCURRENCY,
+    "clean": settings.CLEAN_CONCURRENCY,
+    "upload": settings.UPLOAD_CONCURRENCY,
+    "batch": settings.BATCH_CONCURRENCY,      # questions d'une analyse par lot (une par smart_agent)
+    "agent": settings.AGENT_CONCURRENCY,      # étapes du plan d'analyse (smart_agent)
+    "engines": settings.ENGINE_CONCURRENCY,   # moteurs EDA en mode thread
+    "eda": settings.EDA_PROCESS_WORKERS,      # moteurs EDA / graphiques en mode processus
+}
+
+# Type d'exécuteur par étape. Étapes distinctes pour les appels imbriqués
+# (analyze -> batch -> agent -> engines) : une tâche n'attend jamais une tâche de son propre pool.
+STAGE_KINDS: Dict[str, str] = {
+    "analyze": "thread",
+    "batch": "thread",
+    "report": "thread",
+    "clean": "process",
+    "agent": "thread",
+    "engines": "thread",
+    "eda": "process",
+}
+
+# Étapes soumises au contrôle d'admission (requêtes HTTP)
+ADMISSION_STAGES = ("analyze", "clean", "upload")
+
+
+class ServiceBusyError(HTTPException):
+    """File d'attente pleine : réponse 503 immédiate avec Retry-After."""
+
+    def __init__(self, stage: str, retry_after: int = settings.RETRY_AFTER_SECONDS):
+        super().__init__(
+            status_code=503,
+            detail=f"Service saturé ({stage}), réessayez dans {retry_after} s",
+            headers={"Retry-After": str(retry_after)},
+        )
+        self.stage = stage
+
+
+# -----------------------------
+# Contrôle d'admission
+# -----------------------------
+class AdmissionController:
+    """
+    Borne le nombre de requêtes d'une étape : `max_concurrent` s'exécutent,
+    au plus `max_queue` attendent, les suivantes sont refusées sans attendre.
+    """
+
+    def __init__(self, stage: str, max_concurrent: int, max_queue: int):
+        self.stage = stage
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.inflight = 0
+        self.waiting = 0
+        self._semaphore = None
+        self._loop = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Un sémaphore asyncio est lié à sa boucle : recréé si la boucle change (tests, reload)
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+            self._loop = loop
+        return self._semaphore
+
+    @asynccontextmanager
+    async def slot(self):
+        semaphore = self._get_semaphore()
+        if self.inflight + self.waiting >= self.max_concurrent + self.max_queue:
+            logger.warning(f"Admission refusée ({self.stage}) : {self.inflight} en cours, {self.waiting} en attente")
+            raise ServiceBusyError(self.stage)
+        self.waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.inflight += 1
+        try:
+            yield
+        finally:
+            self.inflight -= 1
+            semaphore.release()
+
+    def stats(self) -> Dict[str, int]:
+        return {"inflight": self.inflight, "waiting": self.waiting,
+                "max_concurrent": self.max_concurrent, "max_queue": self.max_queue}
+
+
+_admission: Dict[str, AdmissionController] = {
+    stage: AdmissionController(stage, STAGE_LIMITS[stage], settings.ADMISSION_QUEUE_SIZE)
+    for stage in ADMISSION_STAGES
+}
+
+
+def admission(stage: str):
+    """`async with admission("analyze"):` — lève ServiceBusyError si la file est pleine."""
+    return _admission[stage].slot()
+
+
+# -----------------------------
+# Exécuteurs partagés par étape
+# -----------------------------
+class ManagedExecutor:
+    """
+    Exécuteur applicatif d'une étape (threads ou processus) : taille = quota de l'étape,
+    compteurs de tâches en attente / terminées pour les métriques de profondeur de file.
+    """
+
+    def __init__(self, stage: str, kind: str, max_workers: int):
+        self.stage = stage
+        self.kind = kind
+        self.max_workers = max_workers
+        if kind == "process":
+            # spawn : pas de fork d'un processus multi-thread (uvicorn, pools)
+            self._executor: Executor = ProcessPoolExecutor(
+                max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"),
+                initializer=PROCESS_INITIALIZERS.get(stage)
+            )
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=stage)
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+
+    def _on_done(self, fut: Future) -> None:
+        with self._lock:
+            self.pending -= 1
+            if fut.cancelled() or fut.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        with self._lock:
+            self.pending += 1
+        try:
+            fut = self._executor.submit(fn, *args, **kwargs)
+        except Exception:
+            with self._lock:
+                self.pending -= 1
+            raise
+        fut.add_done_callback(self._on_done)
+        return fut
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "pending": self.pending,
+                "queue_depth": max(0, self.pending - self.max_workers),
+                "completed": self.completed,
+                "failed": self.failed,
+            }
+
+
+def _warm_eda_worker() -> None:
+    """Initialisation d'un worker EDA : bibliothèques lourdes importées une seule fois."""
+    # llm_service d'abord : il charge eda_service sans import circulaire
+    import backend.services.llm_service  # noqa: F401
+    import ydata_profiling  # noqa: F401
+    import sweetviz  # noqa: F401
+    import autoviz.AutoViz_Class  # noqa: F401
+    import plotly.express  # noqa: F401
+
+
+def _noop() -> None:
+    return None
+
+
+# Initialiseurs des workers par étape
+PROCESS_INITIALIZERS: Dict[str, Callable[[], None]] = {"eda": _warm_eda_worker}
+
+_executors: Dict[str, ManagedExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(stage: str) -> ManagedExecutor:
+    """Exécuteur partagé de l'étape ; créé au démarrage de l'application (ou au premier usage hors API)."""
+    with _executors_lock:
+        if stage not in _executors:
+            _executors[stage] = ManagedExecutor(stage, STAGE_KINDS[stage], STAGE_LIMITS[stage])
+        return _executors[stage]
+
+
+def start_executors() -> None:
+    """Lifespan FastAPI : crée les exécuteurs et préchauffe le pool EDA en mode processus."""
+    for stage in STAGE_KINDS:
+        if stage == "eda" and settings.EXECUTION_MODE != "process":
+            continue
+        get_executor(stage)
+    if settings.EXECUTION_MODE == "process":
+        warm_process_pool("eda")
+
+
+def warm_process_pool(stage: str) -> None:
+    """Démarre tous les workers de l'étape (imports faits) avant la première requête."""
+    executor = get_executor(stage)
+    for fut in [executor.submit(_noop) for _ in range(executor.max_workers)]:
+        fut.result()
+    logger.info(f"Pool de processus '{stage}' prêt ({executor.max_workers} workers)")
+
+
+async def run_in_stage(stage: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Exécute une fonction bloquante dans l'exécuteur de l'étape sans bloquer la boucle."""
+    return await asyncio.wrap_future(get_executor(stage).submit(fn, *args, **kwargs))
+
+
+def executor_stats() -> Dict[str, Any]:
+    with _executors_lock:
+        executors = {stage: ex.stats() for stage, ex in _executors.items()}
+    return {
+        "admission": {stage: ctrl.stats() for stage, ctrl in _admission.items()},
+        "executors": executors,
+    }
+
+
+def shutdown_executors(wait: bool = True) -> None:
+    with _executors_lock:
+        for executor in _executors.values():
+            executor.shutdown(wait=wait)
+        _executors.clear()
@@ -0,0 +1,216 @@
+# backend/utils/figure_summary.py
+import json
+import base64
+import logging
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Bornes du résumé : sa taille ne dépend pas du nombre de points du graphique
+MAX_TRACES = 5
+HIST_BINS = 10
+TOP_BARS = 10
+MAX_CORR_CELLS = 15
+CORR_THRESHOLD = 0.5
+
+
+def _decode_array(value: Any) -> Optional[np.ndarray]:
+    """Tableau Plotly : liste JSON ou tableau typé {"dtype", "bdata", "shape"} (plotly >= 6)."""
+    if value is None:
+        return None
+    if isinstance(value, dict) and "bdata" in value:
+        arr = np.frombuffer(base64.b64decode(value["bdata"]), dtype=np.dtype(value["dtype"]))
+        if value.get("shape"):
+            arr = arr.reshape([int(s) for s in str(value["shape"]).split(",")])
+        return arr
+    return np.asarray(value, dtype=object)
+
+
+def _numeric(arr: Optional[np.ndarray]) -> Optional[np.ndarray]:
+    """Valeurs numériques (dates converties en jours) ; None si l'axe est catégoriel."""
+    if arr is None or arr.size == 0:
+        return None
+    if arr.dtype.kind in "iufb":
+        return arr.astype(float)
+    values = pd.to_numeric(pd.Series(arr.ravel()), errors="coerce")
+    if values.notna().mean() > 0.9:
+        return values.to_numpy(dtype=float)
+    dates = pd.to_datetime(pd.Series(arr.ravel()), errors="coerce")
+    if dates.notna().mean() > 0.9:
+        return (dates - pd.Timestamp("1970-01-01")).dt.total_seconds().to_numpy() / 86400.0
+    return None
+
+
+def _is_dates(arr: Optional[np.ndarray]) -> bool:
+    """Axe de dates : chaînes ISO (Plotly sérialise les dates en texte)."""
+    if arr is None or arr.dtype.kind in "iufb" or arr.size == 0:
+        return False
+    head = arr.ravel()[:20]
+    if not all(isinstance(v, str) for v in head):
+        return False
+    return bool(pd.to_datetime(pd.Series(head), errors="coerce").notna().all())
+
+
+def _r(x: float) -> float:
+    return float(f"{x:.4g}")
+
+
+def _axis_title(layout: Dict[str, Any], axis: str) -> Optional[str]:
+    title = (layout.get(axis) or {}).get("title")
+    return title.get("text") if isinstance(title, dict) else title
+
+
+def _summarize_histogram(trace: Dict[str, Any]) -> Dict[str, Any]:
+    values = _numeric(_decode_array(trace.get("x") if trace.get("x") is not None else trace.get("y")))
+    if values is None:
+        return {"type": "histogram"}
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return {"type": "histogram", "n": 0}
+    counts, edges = np.histogram(values, bins=HIST_BINS)
+    peak = int(np.argmax(counts))
+    return {
+        "type": "histogram", "n": int(values.size),
+        "min": _r(values.min()), "max": _r(values.max()),
+        "mean": _r(values.mean()), "median": _r(np.median(values)),
+        "bins": [[_r(edges[i]), _r(edges[i + 1]), int(c)] for i, c in enumerate(counts)],
+        "mode_bin": [_r(edges[peak]), _r(edges[peak + 1])],
+    }
+
+
+def _summarize_xy(trace: Dict[str, Any]) -> Dict[str, Any]:
+    x_raw, y_raw = _decode_array(trace.get("x")), _decode_array(trace.get("y"))
+    y = _numeric(y_raw)
+    summary: Dict[str, Any] = {"type": trace.get("type", "scatter"), "mode": trace.get("mode")}
+    if y is None:
+        return summary
+    x = _numeric(x_raw) if x_raw is not None else np.arange(len(y), dtype=float)
+    mask = ~np.isnan(y) if x is None else ~(np.isnan(y) | np.isnan(x))
+    y_valid = y[mask]
+    summary["n"] = int(y_valid.size)
+    if y_valid.size == 0:
+        return summary
+    labels = x_raw[mask] if x_raw is not None else np.arange(len(y))[mask]
+    i_max, i_min = int(np.argmax(y_valid)), int(np.argmin(y_valid))
+    summary.update({
+        "y_min": _r(y_valid[i_min]), "y_min_at": str(labels[i_min]),
+        "y_max": _r(y_valid[i_max]), "y_max_at": str(labels[i_max]),
+        "y_mean": _r(y_valid.mean()),
+    })
+    if x is not None and y_valid.size >= 3 and np.ptp(x[mask]) > 0:
+        dates = _is_dates(x_raw)
+        slope, _ = np.polyfit(x[mask], y_valid, 1)
+        summary["trend_slope"] = _r(slope)
+        summary["trend_unit"] = "par jour" if dates else "par unité de x"
+        if np.std(y_valid) > 0:
+            summary["correlation_xy"] = _r(np.corrcoef(x[mask], y_valid)[0, 1])
+        summary["x_range"] = [str(labels[0]), str(labels[-1])] if dates else \
+            [_r(np.nanmin(x[mask])), _r(np.nanmax(x[mask]))]
+    return summary
+
+
+def _summarize_bar(trace: Dict[str, Any]) -> Dict[str, Any]:
+    horizontal = trace.get("orientation") == "h"
+    cats = _decode_array(trace.get("y") if horizontal else trace.get("x"))
+    vals = _numeric(_decode_array(trace.get("x") if horizontal else trace.get("y")))
+    if cats is None or vals is None:
+        return {"type": "bar"}
+    order = np.argsort(-np.nan_to_num(vals, nan=-np.inf))[:TOP_BARS]
+    total = float(np.nansum(vals))
+    return {
+        "type": "bar", "n_bars": int(len(vals)), "total": _r(total),
+        "top": [[str(cats[i]), _r(vals[i])] for i in order],
+    }
+
+
+def _summarize_heatmap(trace: Dict[str, Any], threshold: float) -> Dict[str, Any]:
+    z = _decode_array(trace.get("z"))
+    if z is None:
+        return {"type": "heatmap"}
+    z = np.asarray(z, dtype=float)
+    xs = list(_decode_array(trace.get("x")) if trace.get("x") is not None else range(z.shape[1]))
+    ys = list(_decode_array(trace.get("y")) if trace.get("y") is not None else range(z.shape[0]))
+    symmetric = z.shape[0] == z.shape[1] and xs == ys and np.allclose(z, z.T, equal_nan=True)
+    cells = []
+    for i in range(z.shape[0]):
+        for j in range(z.shape[1]):
+            if symmetric and j <= i:
+                continue  # matrice de corrélation : diagonale et doublons ignorés
+            if not np.isnan(z[i, j]) and abs(z[i, j]) >= threshold:
+                cells.append((str(ys[i]), str(xs[j]), _r(z[i, j])))
+    cells.sort(key=lambda c: -abs(c[2]))
+    return {
+        "type": "heatmap", "shape": list(z.shape), "threshold": threshold,
+        "strong_cells": [list(c) for c in cells[:MAX_CORR_CELLS]],
+        "n_strong_cells": len(cells),
+    }
+
+
+def _summarize_box(trace: Dict[str, Any]) -> Dict[str, Any]:
+    values = _numeric(_decode_array(trace.get("y") if trace.get("y") is not None else trace.get("x")))
+    if values is None:
+        return {"type": "box"}
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return {"type": "box", "n": 0}
+    q1, med, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    outliers = int(((values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)).sum())
+    return {"type": "box", "n": int(values.size), "q1": _r(q1), "median": _r(med), "q3": _r(q3),
+            "min": _r(values.min()), "max": _r(values.max()), "outliers": outliers}
+
+
+def summarize_figure(fig: Union[str, Dict[str, Any]], corr_threshold: float = CORR_THRESHOLD) -> Dict[str, Any]:
+    """
+    Contenu sémantique d'une figure Plotly (JSON ou dict) : titre, axes, et par trace
+    effectifs par classe, pente de tendance, extrema ou cellules de corrélation fortes.
+    """
+    spec = json.loads(fig) if isinstance(fig, str) else fig
+    layout = spec.get("layout") or {}
+    title = layout.get("title")
+    traces = spec.get("data") or []
+    summary: Dict[str, Any] = {
+        "title": title.get("text") if isinstance(title, dict) else title,
+        "x_axis": _axis_title(layout, "xaxis"),
+        "y_axis": _axis_title(layout, "yaxis"),
+        "n_traces": len(traces),
+        "traces": [],
+    }
+    for trace in traces[:MAX_TRACES]:
+        kind = trace.get("type", "scatter")
+        try:
+            if kind == "histogram":
+                item = _summarize_histogram(trace)
+            elif kind in ("scatter", "scattergl"):
+                item = _summarize_xy(trace)
+            elif kind == "bar":
+                item = _summarize_bar(trace)
+            elif kind == "heatmap":
+                item = _summarize_heatmap(trace, corr_threshold)
+            elif kind == "box":
+                item = _summarize_box(trace)
+            else:
+                item = {"type": kind}
+        except Exception as e:
+            logger.warning(f"Résumé de trace {kind} impossible : {e}")
+            item = {"type": kind}
+        if trace.get("name"):
+            item["name"] = trace["name"]
+        summary["traces"].append(item)
+    return summary
+
+
+def format_figure_summary(summary: Dict[str, Any]) -> str:
+    """Texte compact (une ligne par trace) pour un prompt LLM."""
+    lines = [f"Graphique : {summary.get('title') or 'sans titre'} "
+             f"(x = {summary.get('x_axis') or '?'}, y = {summary.get('y_axis') or '?'})"]
+    for trace in summary.get("traces", []):
+        details = ", ".join(f"{k}={json.dumps(v, ensure_ascii=False, default=str)}"
+                            for k, v in trace.items() if k != "type" and v is not None)
+        lines.append(f"- {trace['type']}: {details}")
+    if summary.get("n_traces", 0) > MAX_TRACES:
+        lines.append(f"- (+{summary['n_traces'] - MAX_TRACES} traces non détaillées)")
+    return "\n".join(lines)
@@ -1,33 +1,61 @@
 # backend/utils/file_handler.py
 import os
+import hashlib
+import logging
+import aiofiles
 from fastapi import UploadFile
-from datetime import datetime
 from backend.config import settings  # settings.DATA_DIR
 
+logger = logging.getLogger(__name__)
+
 # Assurer que le dossier existe
 os.makedirs(settings.DATA_DIR, exist_ok=True)
 
+
+def _sanitize_extension(filename: str) -> str:
+    """Extension en minuscules, limitée aux caractères alphanumériques."""
+    _, ext = os.path.splitext(filename or "")
+    ext = "".join(c for c in ext.lower() if c.isalnum())
+    return f".{ext}" if ext else ""
+
+
+def hash_file(path: str, chunk_size: int = None) -> str:
+    """Empreinte SHA-256 d'un fichier, lu par morceaux."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size or settings.UPLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 async def save_upload_file(file: UploadFile) -> str:
     """
-    Sauvegarde un fichier UploadFile dans DATA_DIR.
-    Renomme automatiquement en cas de conflit en ajoutant un timestamp.
+    Sauvegarde un fichier UploadFile dans DATA_DIR, par morceaux et sans bloquer la boucle.
+    Le contenu est haché (SHA-256) pendant l'écriture et stocké sous son empreinte :
+    si les mêmes octets ont déjà été envoyés, le chemin existant est retourné.
     Retourne le chemin complet du fichier sauvegardé.
     """
-    filename = file.filename
-    base, ext = os.path.splitext(filename)
-    
-    # Nettoyer le nom de fichier (retirer espaces et caractères spéciaux)
-    base = "".join(c for c in base if c.isalnum() or c in ("_", "-")).rstrip()
-    ext = ext.lower()
-    
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    save_name = f"{base}_{timestamp}{ext}"
-    save_path = os.path.join(settings.DATA_DIR, save_name)
+    ext = _sanitize_extension(file.filename)
+    digest = hashlib.sha256()
+    tmp_path = os.path.join(settings.DATA_DIR, f".upload_{os.urandom(8).hex()}.part")
 
     try:
-        contents = await file.read()
-        with open(save_path, "wb") as f:
-            f.write(contents)
+        async with aiofiles.open(tmp_path, "wb") as out:
+            while True:
+                chunk = await file.read(settings.UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                await out.write(chunk)
+
+        save_path = os.path.join(settings.DATA_DIR, f"{digest.hexdigest()}{ext}")
+        if os.path.exists(save_path):
+            logger.info(f"Upload dédupliqué : contenu déjà présent dans {save_path}")
+        else:
+            os.replace(tmp_path, save_path)
         return save_path
     finally:
+        # Fichier temporaire restant : doublon ou upload interrompu
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
         await file.close()
@@ -0,0 +1,139 @@
+# backend/utils/outliers.py
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Isolation Forest si scikit-learn est installé, sinon score robuste multivarié
+try:
+    from sklearn.ensemble import IsolationForest
+except Exception:  # dépendance optionnelle absente
+    IsolationForest = None
+
+METHODS = ("iqr", "zscore", "mad", "isolation")
+# Seuils par défaut : k × IQR, |z|, |z robuste| (Iglewicz & Hoaglin) et score d'isolation
+# (0.5 : contamination "auto" de scikit-learn ; sinon plus grand |z robuste| de la ligne)
+DEFAULT_THRESHOLDS = {"iqr": 1.5, "zscore": 3.0, "mad": 3.5,
+                      "isolation": 0.5 if IsolationForest is not None else 3.5}
+MAD_SCALE = 0.6745
+ISOLATION_TREES = 100
+
+
+@dataclass
+class OutlierResult:
+    """
+    Valeurs atypiques d'un DataFrame : `masks` (lignes × colonnes, méthodes univariées),
+    `rows` (ligne atypique pour au moins une colonne, ou selon le score multivarié),
+    bornes par colonne et, pour "isolation", `scores` (plus haut = plus atypique).
+    """
+    method: str
+    threshold: float
+    masks: pd.DataFrame
+    rows: pd.Series
+    bounds: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+    scores: Optional[pd.Series] = None
+
+    def counts(self) -> Dict[str, int]:
+        """Nombre de valeurs atypiques par colonne."""
+        return {col: int(n) for col, n in zip(self.masks.columns, self.masks.to_numpy().sum(axis=0))}
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "method": self.method, "threshold": self.threshold,
+            "counts": self.counts(), "rows": int(self.rows.sum()),
+            "bounds": {col: [float(lo), float(hi)] for col, (lo, hi) in self.bounds.items()},
+        }
+
+
+def column_quantiles(values: np.ndarray, qs: List[float]) -> np.ndarray:
+    """
+    Quantiles (interpolation linéaire, NaN ignorés) de toutes les colonnes : un tri par
+    colonne puis lecture vectorisée des rangs, plus rapide que nanquantile. Forme (len(qs), n_colonnes).
+    """
+    ordered = np.sort(values, axis=0)  # NaN rangés en fin de colonne
+    last = np.maximum((~np.isnan(values)).sum(axis=0) - 1, 0)
+    pos = np.outer(qs, last)
+    below = np.floor(pos).astype(int)
+    above = np.minimum(below + 1, last)
+    cols = np.arange(values.shape[1])
+    low, high = ordered[below, cols], ordered[above, cols]
+    return low + (high - low) * (pos - below)
+
+
+def _bounds_mask(values: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+    # Comparaisons diffusées sur toutes les colonnes ; NaN jamais atypique
+    with np.errstate(invalid="ignore"):
+        return (values < lower) | (values > upper)
+
+
+def _robust_z(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """z robuste par colonne (0 si l'écart absolu médian est nul), médianes et écarts absolus médians."""
+    median = column_quantiles(values, [0.5])[0]
+    mad = column_quantiles(np.abs(values - median), [0.5])[0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = MAD_SCALE * (values - median) / mad
+    return np.where(mad > 0, z, 0.0), median, mad
+
+
+def _isolation_scores(values: np.ndarray, seed: int) -> np.ndarray:
+    """Score d'anomalie par ligne : Isolation Forest, ou plus grand |z robuste| sans scikit-learn."""
+    filled = np.where(np.isnan(values), np.nanmedian(values, axis=0), values)
+    if IsolationForest is None:
+        z, _, _ = _robust_z(filled)
+        return np.abs(z).max(axis=1)
+    forest = IsolationForest(n_estimators=ISOLATION_TREES, random_state=seed).fit(filled)
+    return -forest.score_samples(filled)
+
+
+def detect_outliers(df: pd.DataFrame, method: str = "iqr", columns: Optional[List[str]] = None,
+                    threshold: Optional[float] = None, seed: int = 0) -> OutlierResult:
+    """
+    Détection vectorisée sur toutes les colonnes numériques à la fois :
+    - "iqr" : hors [q1 - k·IQR, q3 + k·IQR], quartiles de toutes les colonnes en une passe ;
+    - "zscore" : |x - moyenne| / écart-type > seuil ;
+    - "mad" : |z robuste| (médiane, écart absolu médian) > seuil ;
+    - "isolation" : lignes atypiques dans l'espace de toutes les colonnes, score > seuil
+      (Isolation Forest ; sans scikit-learn, plus grand |z robuste| de la ligne).
+    """
+    if method not in METHODS:
+        raise ValueError(f"Méthode inconnue : {method} (attendu : {', '.join(METHODS)})")
+    threshold = DEFAULT_THRESHOLDS[method] if threshold is None else threshold
+    if columns is None:
+        columns = [c for c, dtype in df.dtypes.items()
+                   if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)]
+    frame = df if len(columns) == df.shape[1] else df[columns]
+    values = frame.to_numpy(dtype=float, na_value=np.nan)
+    empty = pd.DataFrame(False, index=df.index, columns=columns)
+    if not columns or len(df) == 0:
+        return OutlierResult(method, threshold, empty, pd.Series(False, index=df.index))
+
+    if method == "isolation":
+        scores = _isolation_scores(values, seed)
+        flagged = scores > threshold
+        return OutlierResult(method, threshold, empty, pd.Series(flagged, index=df.index),
+                             scores=pd.Series(scores, index=df.index))
+
+    if method == "iqr":
+        q1, q3 = column_quantiles(values, [0.25, 0.75])
+        iqr = q3 - q1
+        lower, upper = q1 - threshold * iqr, q3 + threshold * iqr
+        mask = _bounds_mask(values, lower, upper)
+    elif method == "zscore":
+        mean = np.nanmean(values, axis=0)
+        std = np.nanstd(values, axis=0, ddof=1)
+        lower, upper = mean - threshold * std, mean + threshold * std
+        mask = _bounds_mask(values, lower, upper) & (std > 0)
+    else:
+        z, median, mad = _robust_z(values)
+        with np.errstate(invalid="ignore"):
+            mask = np.abs(z) > threshold
+        spread = threshold * mad / MAD_SCALE
+        lower, upper = median - spread, median + spread
+
+    masks = pd.DataFrame(mask, index=df.index, columns=columns)
+    bounds = {col: (lo, hi) for col, lo, hi in zip(columns, lower, upper)}
+    return OutlierResult(method, threshold, masks, pd.Series(mask.any(axis=1), index=df.index), bounds)
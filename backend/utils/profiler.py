@@ -0,0 +1,203 @@
+# backend/utils/profiler.py
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.config import settings
+from backend.utils import dataset_store
+from backend.utils.correlation import CorrelationEngine
+from backend.utils.sketches import HyperLogLog, RunningMoments, StreamingHistogram, TDigest, TopValues
+
+logger = logging.getLogger(__name__)
+
+QUANTILES = (0.25, 0.5, 0.75)
+TOP_CATEGORIES = 10
+
+
+def column_kind(dtype) -> str:
+    """Même répartition que robust_stats ; booléens comptés comme catégories."""
+    if pd.api.types.is_bool_dtype(dtype):
+        return "categorical"
+    if pd.api.types.is_numeric_dtype(dtype):
+        return "numeric"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "datetime"
+    return "categorical"
+
+
+class ColumnProfile:
+    """
+    Résumé d'une colonne en une passe : effectifs et manquants exacts ; moments, min/max,
+    histogramme et quantiles (t-digest) pour les nombres ; valeurs distinctes (HyperLogLog,
+    exact pour les catégories peu nombreuses) et valeurs les plus fréquentes.
+    """
+
+    def __init__(self, name: Any, dtype: str):
+        self.name = name
+        self.dtype = dtype
+        self.kind = column_kind(dtype)
+        self.count = 0
+        self.missing = 0
+        self.distinct = HyperLogLog()
+        self.moments = RunningMoments() if self.kind == "numeric" else None
+        self.digest = TDigest() if self.kind == "numeric" else None
+        self.histogram = StreamingHistogram() if self.kind == "numeric" else None
+        self.top = TopValues() if self.kind == "categorical" else None
+        self.min: Optional[pd.Timestamp] = None
+        self.max: Optional[pd.Timestamp] = None
+
+    def update(self, values: pd.Series) -> None:
+        if self.kind == "numeric":
+            # Dtype d'un bloc CSV parfois différent du premier : conversion forcée
+            array = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+            present = array[np.isfinite(array)]  # infinis traités comme manquants (cf. clean_df)
+            self.moments.update(present)
+            self.digest.update(present)
+            self.histogram.update(present)
+            self.distinct.update(pd.Series(present))
+        else:
+            if self.kind == "datetime" and not pd.api.types.is_datetime64_any_dtype(values):
+                values = pd.to_datetime(values, errors="coerce")
+            present = values.dropna()
+            if self.kind == "datetime" and len(present):
+                low, high = present.min(), present.max()
+                self.min = low if self.min is None else min(self.min, low)
+                self.max = high if self.max is None else max(self.max, high)
+            if self.top is not None:
+                self.top.update(present)
+            self.distinct.update(present)
+        self.count += len(present)
+        self.missing += len(values) - len(present)
+
+    def merge(self, other: "ColumnProfile") -> None:
+        self.count += other.count
+        self.missing += other.missing
+        self.distinct.merge(other.distinct)
+        for name in ("moments", "digest", "histogram", "top"):
+            sketch = getattr(self, name)
+            if sketch is not None and getattr(other, name) is not None:
+                sketch.merge(getattr(other, name))
+        for bound, pick in (("min", min), ("max", max)):
+            values = [v for v in (getattr(self, bound), getattr(other, bound)) if v is not None]
+            setattr(self, bound, pick(values) if values else None)
+
+    def nunique(self) -> int:
+        exact = self.top.distinct() if self.top is not None else None
+        return exact if exact is not None else self.distinct.estimate()
+
+    def describe(self) -> Dict[str, float]:
+        """Mêmes clés que DataFrame.describe() ; quartiles approchés (t-digest)."""
+        m = self.moments
+        q1, median, q3 = self.digest.quantiles(list(QUANTILES))
+        return {"count": float(m.count), "mean": m.mean if m.count else np.nan, "std": m.std,
+                "min": m.min if m.count else np.nan, "25%": q1, "50%": median, "75%": q3,
+                "max": m.max if m.count else np.nan}
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = {"kind": self.kind, "dtype": self.dtype, "count": self.count, "missing": self.missing,
+               "nunique": self.nunique()}
+        if self.kind == "numeric":
+            out.update(self.describe())
+            out.update(skew=self.moments.skewness, kurtosis=self.moments.kurtosis,
+                       histogram=self.histogram.to_dict())
+        elif self.kind == "datetime":
+            out.update(min=str(self.min), max=str(self.max))
+        else:
+            out.update(top=self.top.top(TOP_CATEGORIES), top_exact=not self.top.truncated)
+        return out
+
+
+class DatasetProfile:
+    """
+    Profil de toutes les colonnes, mis à jour bloc par bloc et fusionnable (profils partiels) ;
+    corrélations de Pearson exactes entre colonnes numériques accumulées dans la même passe.
+    Des lignes ajoutées au dataset se prennent en compte avec `update`.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.batches = 0
+        self.columns: Dict[Any, ColumnProfile] = {}
+        self.correlations: Optional[CorrelationEngine] = None
+
+    def update(self, batch: pd.DataFrame) -> None:
+        for col in batch.columns:
+            profile = self.columns.get(col)
+            if profile is None:
+                profile = self.columns[col] = ColumnProfile(col, str(batch[col].dtype))
+            profile.update(batch[col])
+        if self.correlations is None:
+            self.correlations = CorrelationEngine([c for c, p in self.columns.items() if p.kind == "numeric"])
+        self.correlations.update(batch)
+        self.rows += len(batch)
+        self.batches += 1
+
+    def merge(self, other: "DatasetProfile") -> None:
+        for col, profile in other.columns.items():
+            if col in self.columns:
+                self.columns[col].merge(profile)
+            else:
+                self.columns[col] = profile
+        if self.correlations is None:
+            self.correlations = other.correlations
+        elif other.correlations is not None:
+            self.correlations.merge(other.correlations)
+        self.rows += other.rows
+        self.batches += other.batches
+
+    def missing(self) -> Dict[Any, int]:
+        return {col: p.missing for col, p in self.columns.items()}
+
+    def correlation(self, columns: Optional[List[Any]] = None) -> Optional[pd.DataFrame]:
+        """Matrice de Pearson sur toutes les lignes ; None si une des `columns` n'y figure pas."""
+        if self.correlations is None:
+            return None
+        matrix = self.correlations.matrix()
+        if columns is None:
+            return matrix
+        if not set(columns) <= set(matrix.columns):
+            return None
+        return matrix.loc[list(columns), list(columns)]
+
+    def to_stats(self) -> Dict[str, Any]:
+        """Stats au format de robust_stats, calculées sur toutes les lignes du fichier."""
+        by_kind: Dict[str, List[ColumnProfile]] = {"numeric": [], "datetime": [], "categorical": []}
+        for profile in self.columns.values():
+            by_kind[profile.kind].append(profile)
+        stats = {"rows": self.rows, "columns": list(self.columns),
+                 "dtypes": {col: p.dtype for col, p in self.columns.items()}}
+        if by_kind["numeric"]:
+            stats["numeric"] = {p.name: p.describe() for p in by_kind["numeric"]}
+        datetimes = {p.name: {"min": str(p.min), "max": str(p.max), "nunique": p.nunique()}
+                     for p in by_kind["datetime"] if p.count}
+        if datetimes:
+            stats["datetime"] = datetimes
+        if by_kind["categorical"]:
+            stats["categorical"] = {p.name: p.top.top(TOP_CATEGORIES) for p in by_kind["categorical"]}
+        stats["profile"] = {"full_data": True, "batches": self.batches,
+                            "approximate": ["25%", "50%", "75%", "nunique"]}
+        return stats
+
+    def summary(self) -> Dict[str, Any]:
+        """Profil détaillé (JSON) : moments, histogrammes, valeurs distinctes par colonne."""
+        return {"rows": self.rows, "batches": self.batches,
+                "columns": {str(col): p.to_dict() for col, p in self.columns.items()}}
+
+
+def profile_dataset(path: Path, columns: Optional[List[str]] = None,
+                    batch_rows: Optional[int] = None) -> DatasetProfile:
+    """
+    Profil complet d'un fichier nettoyé en une lecture par blocs : la mémoire dépend du
+    nombre de colonnes et de la taille des blocs, pas du nombre de lignes.
+    """
+    start = time.perf_counter()
+    profile = DatasetProfile()
+    for batch in dataset_store.iter_batches(path, columns=columns, batch_rows=batch_rows or settings.PROFILE_BATCH_ROWS):
+        profile.update(batch)
+    logger.info(f"Profil de {path} : {profile.rows} lignes, {len(profile.columns)} colonnes, "
+                f"{profile.batches} blocs en {time.perf_counter() - start:.2f}s")
+    return profile
@@ -0,0 +1,80 @@
+# backend/utils/shared_frame.py
+import os
+import uuid
+import logging
+import tempfile
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Union
+
+import pandas as pd
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Un DataFrame transmis aux workers : chemin d'un fichier Arrow IPC en mémoire partagée,
+# ou le DataFrame lui-même (repli pickle) si la conversion Arrow est impossible.
+FrameRef = Union[str, pd.DataFrame]
+
+# Frames déjà chargés dans ce worker (plusieurs tâches partagent souvent le même frame)
+_WORKER_FRAMES: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+_WORKER_FRAMES_MAX = 2
+
+
+def _shared_dir() -> str:
+    """tmpfs (/dev/shm) si disponible : le fichier Arrow reste en RAM."""
+    directory = settings.SHARED_FRAME_DIR or ("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir())
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+@contextmanager
+def share_frame(df: pd.DataFrame) -> Iterator[FrameRef]:
+    """
+    Écrit `df` une fois en Arrow IPC dans la mémoire partagée ; les workers le mappent
+    (memory_map) au lieu de recevoir une copie picklée par tâche. Supprimé à la sortie.
+    """
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+
+    path = os.path.join(_shared_dir(), f"frame_{uuid.uuid4().hex}.arrow")
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        with pa.OSFile(path, "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    except Exception as e:
+        logger.warning(f"Partage Arrow impossible ({e}), repli sur pickle du DataFrame")
+        if os.path.exists(path):
+            os.remove(path)
+        yield df
+        return
+
+    try:
+        yield path
+    finally:
+        os.remove(path)
+
+
+def load_shared_frame(frame: FrameRef) -> pd.DataFrame:
+    """Côté worker : DataFrame à partir d'une référence produite par `share_frame`."""
+    if isinstance(frame, pd.DataFrame):
+        return frame
+    if frame in _WORKER_FRAMES:
+        _WORKER_FRAMES.move_to_end(frame)
+        return _WORKER_FRAMES[frame]
+
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+
+    with pa.memory_map(frame) as source:
+        df = ipc.open_file(source).read_all().to_pandas()
+    _WORKER_FRAMES[frame] = df
+    while len(_WORKER_FRAMES) > _WORKER_FRAMES_MAX:
+        _WORKER_FRAMES.popitem(last=False)
+    return df
+
+
+def call_with_shared_frame(frame: FrameRef, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Tâche de pool de processus : `fn(df, *args, **kwargs)` sur le frame partagé."""
+    return fn(load_shared_frame(frame), *args, **kwargs)
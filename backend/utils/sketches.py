@@ -0,0 +1,368 @@
+# backend/utils/sketches.py
+import logging
+import math
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Résumés de données fusionnables : calculés bloc par bloc (ou par worker) puis combinés,
+# en mémoire bornée quel que soit le nombre de lignes.
+HLL_PRECISION = 12           # 2^12 registres : erreur relative ~1,6 %
+TDIGEST_COMPRESSION = 200    # au plus ~compression / 2 centroïdes
+HISTOGRAM_BINS = 64
+TOP_VALUES = 1000            # valeurs distinctes suivies exactement par colonne catégorielle
+
+
+class RunningMoments:
+    """
+    Effectif, moyenne et moments centrés d'ordre 2 à 4, min et max, mis à jour par blocs
+    et fusionnables (formules de Chan / Pébay) : résultat identique à un calcul en une fois.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values: np.ndarray) -> None:
+        """Ajoute un bloc de valeurs finies."""
+        if len(values) == 0:
+            return
+        block = RunningMoments()
+        block.count = len(values)
+        block.mean = float(values.mean())
+        delta = values - block.mean
+        sq = delta * delta
+        block.m2, block.m3, block.m4 = float(sq.sum()), float((sq * delta).sum()), float((sq * sq).sum())
+        block.min, block.max = float(values.min()), float(values.max())
+        self.merge(block)
+
+    def merge(self, other: "RunningMoments") -> None:
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.__dict__.update(other.__dict__)
+            return
+        na, nb = self.count, other.count
+        n = na + nb
+        delta = other.mean - self.mean
+        d_n = delta / n
+        m2 = self.m2 + other.m2 + delta * d_n * na * nb
+        m3 = (self.m3 + other.m3 + delta * d_n * d_n * na * nb * (na - nb)
+              + 3 * d_n * (na * other.m2 - nb * self.m2))
+        m4 = (self.m4 + other.m4 + delta * d_n ** 3 * na * nb * (na * na - na * nb + nb * nb)
+              + 6 * d_n * d_n * (na * na * other.m2 + nb * nb * self.m2)
+              + 4 * d_n * (na * other.m3 - nb * self.m3))
+        self.count, self.mean, self.m2, self.m3, self.m4 = n, self.mean + d_n * nb, m2, m3, m4
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance) if self.count > 1 else math.nan
+
+    @property
+    def skewness(self) -> float:
+        """Asymétrie corrigée du biais (comme pandas.Series.skew)."""
+        n = self.count
+        if n < 3 or self.m2 == 0:
+            return math.nan
+        g1 = math.sqrt(n) * self.m3 / self.m2 ** 1.5
+        return g1 * math.sqrt(n * (n - 1)) / (n - 2)
+
+    @property
+    def kurtosis(self) -> float:
+        """Kurtosis en excès corrigée du biais (comme pandas.Series.kurt)."""
+        n = self.count
+        if n < 4 or self.m2 == 0:
+            return math.nan
+        g2 = n * self.m4 / (self.m2 * self.m2) - 3
+        return ((n + 1) * g2 + 6) * (n - 1) / ((n - 2) * (n - 3))
+
+
+def hash_values(values: pd.Series) -> np.ndarray:
+    """Empreintes 64 bits stables entre blocs (une catégorie et la même chaîne ont la même empreinte)."""
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        # 1 et 1.0 confondus même si le dtype change d'un bloc CSV à l'autre
+        return pd.util.hash_array(values.to_numpy(dtype=float))
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+class HyperLogLog:
+    """Nombre de valeurs distinctes approché (HyperLogLog), fusion par maximum des registres."""
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        if not 4 <= precision <= 16:
+            raise ValueError("Précision HyperLogLog attendue entre 4 et 16")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, values: pd.Series) -> None:
+        """Ajoute un bloc de valeurs non manquantes."""
+        if len(values) == 0:
+            return
+        hashes = hash_values(values)
+        rest_bits = 64 - self.precision
+        index = (hashes >> np.uint64(rest_bits)).astype(np.intp)
+        rest = hashes & np.uint64((1 << rest_bits) - 1)
+        # Rang du premier bit à 1 : frexp donne la longueur binaire (exacte, rest < 2^52)
+        _, bit_length = np.frexp(rest.astype(float))
+        rank = (rest_bits - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("Fusion de HyperLogLog de précisions différentes")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.exp2(-self.registers.astype(float)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            raw = m * math.log(m / zeros)  # petites cardinalités : comptage linéaire
+        return int(round(raw))
+
+
+class CoMoments:
+    """
+    Co-moments de toutes les paires de colonnes (matrices k × k, float64), calculés sur les
+    lignes où les deux colonnes sont présentes comme DataFrame.corr : effectifs, moyennes,
+    sommes des carrés des écarts et co-moments. Chaque bloc est centré puis réduit en quatre
+    produits matriciels ; la fusion (Chan) est exacte, d'où la corrélation de Pearson exacte.
+    """
+
+    def __init__(self, size: int):
+        self.n = np.zeros((size, size))
+        self.mean = np.zeros((size, size))  # [i, j] : moyenne de la colonne i sur les lignes de la paire
+        self.m2 = np.zeros((size, size))
+        self.c = np.zeros((size, size))
+
+    def update(self, values: np.ndarray) -> None:
+        """Ajoute un bloc lignes × colonnes (NaN : valeur manquante)."""
+        if len(values) == 0:
+            return
+        present = ~np.isnan(values)
+        mask = present.astype(float)
+        counts = mask.sum(axis=0)
+        center = np.divide(np.where(present, values, 0.0).sum(axis=0), counts,
+                           out=np.zeros(values.shape[1]), where=counts > 0)
+        centered = np.where(present, values - center, 0.0)
+        block = CoMoments(values.shape[1])
+        block.n = mask.T @ mask
+        inverse = np.divide(1.0, block.n, out=np.zeros_like(block.n), where=block.n > 0)
+        s1 = centered.T @ mask
+        block.mean = center[:, None] + s1 * inverse
+        block.m2 = (centered * centered).T @ mask - s1 * s1 * inverse
+        block.c = centered.T @ centered - s1 * s1.T * inverse
+        self.merge(block)
+
+    def merge(self, other: "CoMoments") -> None:
+        n = self.n + other.n
+        inverse = np.divide(1.0, n, out=np.zeros_like(n), where=n > 0)
+        dx = other.mean - self.mean
+        weight = self.n * other.n * inverse
+        self.c = self.c + other.c + dx * dx.T * weight
+        self.m2 = self.m2 + other.m2 + dx * dx * weight
+        self.mean = self.mean + dx * other.n * inverse
+        self.n = n
+
+    def correlation(self) -> np.ndarray:
+        """Corrélations de Pearson (NaN si une variance est nulle sur la paire)."""
+        denominator = np.sqrt(self.m2 * self.m2.T)
+        r = np.divide(self.c, denominator, out=np.full_like(self.c, np.nan), where=denominator > 0)
+        r = np.clip(r, -1.0, 1.0)
+        np.fill_diagonal(r, np.where(np.diag(self.m2) > 0, 1.0, np.nan))
+        return r
+
+
+class TDigest:
+    """
+    Quantiles approchés (t-digest fusionnant, échelle k1) : centroïdes fins aux extrémités,
+    plus gros au centre. Chaque bloc est trié et regroupé en une passe vectorisée.
+    """
+
+    def __init__(self, compression: float = TDIGEST_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = math.inf
+        self.max = -math.inf
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def update(self, values: np.ndarray) -> None:
+        """Ajoute un bloc de valeurs finies."""
+        if len(values) == 0:
+            return
+        self.min, self.max = min(self.min, float(values.min())), max(self.max, float(values.max()))
+        self._compress(np.concatenate([self.means, values]), np.concatenate([self.weights, np.ones(len(values))]))
+
+    def merge(self, other: "TDigest") -> None:
+        if len(other.means) == 0:
+            return
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        self._compress(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray) -> None:
+        order = np.argsort(means)
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        q = (np.cumsum(weights) - weights / 2) / total
+        # Un centroïde par unité de k = compression / 2π · asin(2q - 1)
+        k = np.floor(self.compression / (2 * math.pi) * np.arcsin(np.clip(2 * q - 1, -1, 1)))
+        starts = np.flatnonzero(np.r_[True, k[1:] != k[:-1]])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def cdf(self, values: np.ndarray) -> np.ndarray:
+        """Rang relatif approché (0 à 1) de chaque valeur, réciproque de quantiles()."""
+        if len(self.means) == 0:
+            return np.full(len(values), np.nan)
+        total = self.count
+        centers = np.cumsum(self.weights) - self.weights / 2
+        xs = np.r_[self.min, self.means, self.max]
+        ranks = np.r_[0.5, centers, total - 0.5]
+        return np.interp(values, xs, ranks) / total
+
+    def quantiles(self, qs: List[float]) -> List[float]:
+        """Quantiles par interpolation linéaire (exacts tant que chaque centroïde est une valeur)."""
+        if len(self.means) == 0:
+            return [math.nan] * len(qs)
+        total = self.count
+        centers = np.cumsum(self.weights) - self.weights / 2
+        xs = np.r_[0.5, centers, total - 0.5]
+        ys = np.r_[self.min, self.means, self.max]
+        # Rang q·(n - 1) des valeurs triées, comme pandas (centre de la i-ème valeur : i + 0,5)
+        return [float(v) for v in np.interp(np.asarray(qs) * (total - 1) + 0.5, xs, ys)]
+
+
+class StreamingHistogram:
+    """
+    Histogramme à classes de largeur puissance de 2 alignées sur une grille commune : quand
+    les valeurs débordent, les classes voisines sont regroupées deux à deux. Deux histogrammes
+    se fusionnent exactement après alignement sur la plus grande largeur.
+    """
+
+    def __init__(self, bins: int = HISTOGRAM_BINS):
+        self.bins = bins
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.width: Optional[float] = None
+        self.origin = 0.0
+
+    def _rebin(self, origin: float, width: float) -> None:
+        left_edges = self.origin + np.arange(self.bins) * self.width
+        index = np.floor((left_edges - origin) / width).astype(np.intp)
+        nonzero = self.counts > 0
+        counts = np.zeros(self.bins, dtype=np.int64)
+        np.add.at(counts, index[nonzero], self.counts[nonzero])
+        self.counts, self.origin, self.width = counts, origin, width
+
+    def _cover(self, lo: float, hi: float) -> None:
+        """Élargit (en regroupant des classes si besoin) pour couvrir [lo, hi]."""
+        if self.width is None:
+            span = (hi - lo) or max(abs(lo), 1.0)
+            self.width = float(2.0 ** math.ceil(math.log2(span / self.bins)))
+            self.origin = math.floor(lo / self.width) * self.width
+        elif self.counts.any():
+            occupied = np.flatnonzero(self.counts)
+            lo = min(lo, self.origin + occupied[0] * self.width)
+            hi = max(hi, self.origin + occupied[-1] * self.width)
+        width = self.width
+        while True:
+            origin = math.floor(lo / width) * width
+            if hi < origin + self.bins * width:
+                break
+            width *= 2
+        if origin != self.origin or width != self.width:
+            self._rebin(origin, width)
+
+    def update(self, values: np.ndarray) -> None:
+        """Ajoute un bloc de valeurs finies."""
+        if len(values) == 0:
+            return
+        self._cover(float(values.min()), float(values.max()))
+        index = np.clip(np.floor((values - self.origin) / self.width).astype(np.intp), 0, self.bins - 1)
+        self.counts += np.bincount(index, minlength=self.bins)
+
+    def merge(self, other: "StreamingHistogram") -> None:
+        if other.width is None or not other.counts.any():
+            return
+        if self.width is None:
+            self.counts, self.origin, self.width = other.counts.copy(), other.origin, other.width
+            return
+        other = other.copy()
+        while self.width < other.width:
+            self._rebin(math.floor(self.origin / (2 * self.width)) * 2 * self.width, 2 * self.width)
+        occupied = np.flatnonzero(other.counts)
+        self._cover(other.origin + occupied[0] * other.width, other.origin + occupied[-1] * other.width)
+        other._rebin(self.origin, self.width)
+        self.counts += other.counts
+
+    def copy(self) -> "StreamingHistogram":
+        clone = StreamingHistogram(self.bins)
+        clone.counts, clone.origin, clone.width = self.counts.copy(), self.origin, self.width
+        return clone
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Bornes et effectifs des classes, sans les classes vides aux extrémités."""
+        if self.width is None or not self.counts.any():
+            return {"edges": [], "counts": []}
+        occupied = np.flatnonzero(self.counts)
+        first, last = occupied[0], occupied[-1] + 1
+        edges = self.origin + np.arange(first, last + 1) * self.width
+        return {"edges": [float(e) for e in edges], "counts": [int(c) for c in self.counts[first:last]]}
+
+
+class TopValues:
+    """
+    Effectifs des valeurs d'une colonne catégorielle : exacts tant que la colonne a au plus
+    `capacity` valeurs distinctes, sinon seules les plus fréquentes sont gardées (approché).
+    """
+
+    def __init__(self, capacity: int = TOP_VALUES):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype="int64")
+        self.truncated = False
+
+    def update(self, values: pd.Series) -> None:
+        """Ajoute un bloc de valeurs non manquantes."""
+        counts = values.value_counts(sort=False)
+        self._add(counts[counts > 0])
+
+    def merge(self, other: "TopValues") -> None:
+        self.truncated |= other.truncated
+        self._add(other.counts)
+
+    def _add(self, counts: pd.Series) -> None:
+        if counts.empty:
+            return
+        if len(counts) > self.capacity:
+            # Bloc déjà au-delà de la capacité : seules ses valeurs les plus fréquentes comptent
+            counts = counts.nlargest(self.capacity)
+            self.truncated = True
+        counts = counts.set_axis(counts.index.astype(object))
+        self.counts = counts.astype("int64") if self.counts.empty else self.counts.add(counts, fill_value=0).astype("int64")
+        if len(self.counts) > self.capacity:
+            self.counts = self.counts.nlargest(self.capacity)
+            self.truncated = True
+
+    def distinct(self) -> Optional[int]:
+        """Nombre exact de valeurs distinctes, None si la capacité a été dépassée."""
+        return None if self.truncated else len(self.counts)
+
+    def top(self, n: int) -> Dict[Any, int]:
+        return {k: int(v) for k, v in self.counts.sort_values(ascending=False, kind="stable").head(n).items()}
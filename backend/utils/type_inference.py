@@ -0,0 +1,124 @@
+# backend/utils/type_inference.py
+import logging
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from backend.utils.datetime_parser import infer_datetime_format, parse_datetime
+
+logger = logging.getLogger(__name__)
+
+# Valeurs examinées par colonne texte pour choisir la conversion à tenter
+SAMPLE_SIZE = 1000
+# Part minimale de l'échantillon convertible en dates pour classer la colonne en datetime
+DATETIME_MIN_RATIO = 0.9
+
+
+@dataclass
+class InferredSchema:
+    """
+    Types des colonnes (mêmes clés que IntelligentEDAService.detect_variable_types) et
+    conversions à appliquer aux colonnes texte : {"colonne": "numeric" | "datetime"}, avec
+    le format déduit pour les dates (cf. datetime_parser).
+    """
+    numerical: List[str] = field(default_factory=list)
+    categorical: List[str] = field(default_factory=list)
+    datetime: List[str] = field(default_factory=list)
+    text: List[str] = field(default_factory=list)
+    conversions: Dict[str, str] = field(default_factory=dict)
+    datetime_formats: Dict[str, str] = field(default_factory=dict)
+
+    def variable_types(self) -> Dict[str, list]:
+        return {"numerical": list(self.numerical), "categorical": list(self.categorical),
+                "datetime": list(self.datetime), "text": list(self.text)}
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Conversions en paires : les noms de colonnes non textuels survivent au JSON
+        return {**asdict(self), "conversions": [[col, kind] for col, kind in self.conversions.items()],
+                "datetime_formats": [[col, fmt] for col, fmt in self.datetime_formats.items()]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "InferredSchema":
+        return cls(**{**data, "conversions": dict(data.get("conversions", [])),
+                      "datetime_formats": dict(data.get("datetime_formats", []))})
+
+
+def _sample(values: pd.Series, size: int) -> pd.Series:
+    """Échantillon borné et réparti sur toute la colonne (pas seulement les premières lignes)."""
+    values = values.dropna()
+    if len(values) <= size:
+        return values
+    return values.iloc[:: len(values) // size][:size]
+
+
+def _to_numeric(values: pd.Series) -> pd.Series:
+    return pd.to_numeric(values.astype(str).str.replace(",", "", regex=False), errors="coerce")
+
+
+def infer_text_column(values: pd.Series, sample_size: int = SAMPLE_SIZE) -> Tuple[str, Optional[str]]:
+    """
+    Conversion à tenter pour une colonne texte, décidée sur un échantillon : "numeric" si
+    toutes les valeurs sont des nombres (séparateur de milliers "," toléré), "datetime" si
+    au moins DATETIME_MIN_RATIO sont des dates d'un même format, sinon "text".
+    Retourne (conversion, format de date éventuel).
+    """
+    sample = _sample(values, sample_size)
+    if sample.empty:
+        return "text", None
+    if _to_numeric(sample).notna().all():
+        return "numeric", None
+    fmt, ratio = infer_datetime_format(sample, sample_size)
+    if fmt is not None and ratio >= DATETIME_MIN_RATIO:
+        return "datetime", fmt
+    return "text", None
+
+
+def infer_schema(df: pd.DataFrame, sample_size: int = SAMPLE_SIZE) -> InferredSchema:
+    """Types de toutes les colonnes en une passe, sans copier ni convertir le DataFrame."""
+    schema = InferredSchema()
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_bool_dtype(series):
+            schema.categorical.append(col)  # pas de quantiles ni de corrélations sur des booléens
+        elif pd.api.types.is_numeric_dtype(series):
+            schema.numerical.append(col)
+        elif pd.api.types.is_datetime64_any_dtype(series):
+            schema.datetime.append(col)
+        elif pd.api.types.infer_dtype(_sample(series, sample_size), skipna=True) in ("string", "unicode"):
+            kind, fmt = infer_text_column(series, sample_size)
+            if kind == "numeric":
+                schema.numerical.append(col)
+            elif kind == "datetime":
+                schema.datetime.append(col)
+            else:
+                schema.text.append(col)
+            if kind != "text":
+                schema.conversions[col] = kind
+            if fmt is not None:
+                schema.datetime_formats[col] = fmt
+        else:
+            schema.categorical.append(col)
+    return schema
+
+
+def apply_schema(df: pd.DataFrame, schema: InferredSchema) -> Tuple[pd.DataFrame, Dict[str, Dict[str, Any]]]:
+    """
+    DataFrame typé : une conversion vectorisée par colonne texte convertible (dates au format
+    déduit), autres colonnes partagées. Retourne aussi, par colonne de dates convertie,
+    le format utilisé et la part des valeurs lues.
+    """
+    if not schema.conversions:
+        return df, {}
+    typed = df.copy(deep=False)
+    reports = {}
+    for col, kind in schema.conversions.items():
+        if col not in typed.columns:
+            continue
+        if kind == "numeric":
+            typed[col] = _to_numeric(df[col])
+        else:
+            parsed = parse_datetime(df[col], schema.datetime_formats.get(col))
+            typed[col] = parsed.values
+            reports[col] = parsed.report()
+    return typed, reports